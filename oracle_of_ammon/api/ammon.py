@@ -1,39 +1,273 @@
 #!/usr/bin/env python
 
+import asyncio
+import json
 import logging
 import os
-from typing import List, Union
+import tarfile
+import tempfile
+import threading
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    List,
+    Literal,
+    Optional,
+    Type,
+    Union,
+)
 
 import uvicorn
-from fastapi import FastAPI, File, HTTPException, Query, UploadFile, status
-from fastapi.responses import HTMLResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    FastAPI,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
 from oracle_of_ammon.__version__ import __version__
+from oracle_of_ammon.api.config import OracleConfig
 from oracle_of_ammon.api.health import get_health_status
+from oracle_of_ammon.api.jobs import JobQueue
 from oracle_of_ammon.api.models import (
+    AllocationDiffs,
+    AllocationSnapshot,
+    AllocationSnapshots,
+    AskResponse,
+    DeduplicationResponse,
     DocumentIDs,
+    DocumentQuery,
     Documents,
     HealthResponse,
     HTTPError,
     Index,
+    IndexImport,
+    Job,
+    Jobs,
+    MemoryResponse,
+    MetricsResponse,
+    ProfilesResponse,
+    ReadyResponse,
+    Rebalance,
+    Reindex,
+    ReindexResponse,
+    SchedulerResponse,
     Search,
     SearchResponse,
     SearchSummary,
     Summary,
     UploadDelete,
+    UploadJob,
 )
-from oracle_of_ammon.api.oracle import Oracle
+from oracle_of_ammon.api.utils.cache import ResponseCache
+from oracle_of_ammon.api.utils.deadline import (
+    Deadline,
+    RequestCancelled,
+    watch_disconnect,
+)
+from oracle_of_ammon.api.utils.memory import profiler
+from oracle_of_ammon.api.utils.pagination import stream_json, stream_ndjson
+from oracle_of_ammon.api.utils.scheduler import Scheduler
+from oracle_of_ammon.api.utils.serialization import FastJSONResponse, dumps, shape
 from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from oracle_of_ammon.api.oracle import Oracle
 
 logger: logging.Logger = configure_logger()
 
+router = APIRouter()
+
+# Callers may move a request to a lower priority class, e.g. "bulk" for batch scripts.
+PRIORITY_CLASS_HEADER: str = "X-Priority-Class"
+
+RESPONSE_CACHE_SIZE: int = int(os.environ.get("RESPONSE_CACHE_SIZE", 1024))
+RESPONSE_CACHE_BYTES: int = int(os.environ.get("RESPONSE_CACHE_BYTES", 64 * 1024**2))
+# Keeps cached responses on local disk, in a subdirectory of this one, when set.
+RESPONSE_CACHE_DIR: str = os.environ.get("RESPONSE_CACHE_DIR", "")
+
+REQUEST_TIMEOUT_HEADER = Header(
+    None,
+    alias="X-Request-Timeout",
+    gt=0,
+    description="Time budget in seconds. Results are degraded rather than late.",
+)
+
+
+async def run_scheduled(request: Request, workload: str, function: Callable, **kwargs):
+    """Waits for the scheduler to admit ``workload``, then runs ``function`` in the threadpool."""
+    async with get_scheduler(request).aslot(
+        workload, requested=request.headers.get(PRIORITY_CLASS_HEADER)
+    ):
+        return await run_in_threadpool(function, **kwargs)
+
+
+async def run_with_deadline(
+    request: Request,
+    timeout: Optional[float],
+    workload: str,
+    function: Callable,
+    **kwargs,
+):
+    """Runs ``function`` once scheduled and stops its inference if the client disconnects.
+
+    Time spent queued counts against the deadline.
+    """
+    deadline = Deadline(timeout=timeout)
+    watcher = asyncio.create_task(watch_disconnect(request=request, deadline=deadline))
+    try:
+        return await run_scheduled(
+            request, workload, function, deadline=deadline, **kwargs
+        )
+    except RequestCancelled:
+        metrics.increment("requests.cancelled")
+        logger.debug(f"Client disconnected, cancelled {request.url.path}")
+        return Response(status_code=499)
+    finally:
+        watcher.cancel()
+
+
+def respond(result, model: Type[BaseModel]):
+    """Encodes pipeline output without re-validating it against ``model``.
+
+    ``response_model`` still documents the schema. Results that do not fit it, such
+    as errors, are returned unchanged so FastAPI handles them as before.
+    """
+    if not isinstance(result, dict) or any(
+        field.required and name not in result
+        for name, field in model.__fields__.items()
+    ):
+        return result
+    return FastJSONResponse(content=shape(result, model))
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+
+    def opaque(tag: str) -> str:
+        # Weak comparison, as If-None-Match calls for.
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(tag) == opaque(etag) for tag in header.split(","))
+
+
+async def respond_cached(
+    request: Request,
+    endpoint: str,
+    input: Search,
+    model: Type[BaseModel],
+    compute: Callable[[], Awaitable],
+):
+    """Serves repeated searches from the response cache, or a 304 for a matching ETag.
+
+    The key covers the generation of every index read, so any upload or deletion
+    changes it, and the cache's epoch, so it also changes across restarts and
+    replicas. ETags are weak since cached answers echo the query as first asked.
+    """
+    cache: ResponseCache = request.app.state.response_cache
+    generation = get_oracle(request).response_generation(endpoint, input.params)
+    key: str = cache.key(
+        endpoint, input.query, input.params, generation, epoch=cache.epoch
+    )
+    etag: str = f'W/"{key}"'
+    headers = {"ETag": etag}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        metrics.increment(f"response_cache.{endpoint}.not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.increment(f"response_cache.{endpoint}.hits")
+        query, body = cached
+        if query != input.query:
+            body = dumps({**json.loads(body), "query": input.query})
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    metrics.increment(f"response_cache.{endpoint}.misses")
+    result = await compute()
+    response = respond(result, model)
+    if isinstance(response, FastJSONResponse) and not result.get("degraded"):
+        cache.put(key, input.query, response.body)
+        response.headers.update(headers)
+    return response
+
+
+def get_oracle(request: Request) -> "Oracle":
+    return request.app.state.oracle
 
-app = FastAPI(title=os.environ.get("API_TITLE", "Oracle of Ammon"), version=__version__)
 
-oracle = Oracle()
+def get_jobs(request: Request) -> JobQueue:
+    return request.app.state.jobs
+
+
+def get_scheduler(request: Request) -> Scheduler:
+    return request.app.state.scheduler
+
+
+def build_oracle(config: OracleConfig) -> "Oracle":
+    if config.oracle is not None:
+        return config.oracle(config)
+
+    # Imported here so that importing the API does not pull in torch and the models.
+    from oracle_of_ammon.api.oracle import Oracle
+
+    return Oracle(
+        index=config.index,
+        retriever=config.retriever,
+        reader=config.reader,
+        summarizer=config.summarizer,
+        profiles=config.profiles,
+    )
 
 
-@app.get(path="/", include_in_schema=False)
+def create_app(config: Optional[OracleConfig] = None) -> FastAPI:
+    """Builds the API; the Oracle and job queue are created when the app starts up."""
+    config = config or OracleConfig()
+    app = FastAPI(title=config.title, version=__version__)
+    app.state.config = config
+    app.include_router(router)
+
+    @app.on_event("startup")
+    def start_oracle() -> None:
+        oracle = build_oracle(config)
+        app.state.oracle = oracle
+        app.state.scheduler = Scheduler()
+        app.state.response_cache = ResponseCache(
+            max_entries=RESPONSE_CACHE_SIZE,
+            max_bytes=RESPONSE_CACHE_BYTES,
+            directory=RESPONSE_CACHE_DIR or None,
+        )
+        app.state.jobs = JobQueue(
+            index_file=partial(
+                app.state.scheduler.call, "ingestion", oracle.index_documents
+            ),
+            **({"directory": config.jobs_directory} if config.jobs_directory else {}),
+        )
+        if config.warm_up:
+            threading.Thread(target=oracle.warm_up, name="warm-up", daemon=True).start()
+        else:
+            oracle.ready.set()
+
+    return app
+
+
+@router.get(path="/", include_in_schema=False)
 async def root():
     content = """
         <style>
@@ -100,40 +334,115 @@ async def root():
     return HTMLResponse(content=content)
 
 
-@app.post(
+@router.post(
     path="/faq-search",
     status_code=status.HTTP_200_OK,
     tags=["search"],
     response_model=SearchResponse,
 )
-def faq_search(input: Search):
+async def faq_search(input: Search, request: Request, oracle=Depends(get_oracle)):
     """Perform FAQ information retrieval. System expects full sentence questions."""
-    return oracle.faq_search(query=input.query, params=input.params)
+    return await respond_cached(
+        request,
+        "faq-search",
+        input,
+        SearchResponse,
+        partial(
+            run_scheduled,
+            request,
+            "faq-search",
+            oracle.faq_search,
+            query=input.query,
+            params=input.params,
+        ),
+    )
 
 
-@app.post(
+@router.post(
     path="/extractive-search",
     status_code=status.HTTP_200_OK,
     tags=["search"],
     response_model=SearchResponse,
 )
-def extractive_search(input: Search):
+async def extractive_search(
+    input: Search,
+    request: Request,
+    timeout: Optional[float] = REQUEST_TIMEOUT_HEADER,
+    oracle=Depends(get_oracle),
+):
     """Perform extractive, semantic search. System expects full sentence questions."""
-    return oracle.extractive_search(query=input.query, params=input.params)
+    return await respond_cached(
+        request,
+        "extractive-search",
+        input,
+        SearchResponse,
+        partial(
+            run_with_deadline,
+            request,
+            timeout,
+            "extractive-search",
+            oracle.extractive_search,
+            query=input.query,
+            params=input.params,
+        ),
+    )
 
 
-@app.post(
+@router.post(
+    path="/ask",
+    status_code=status.HTTP_200_OK,
+    tags=["search"],
+    response_model=AskResponse,
+)
+async def ask(
+    input: Search,
+    request: Request,
+    timeout: Optional[float] = REQUEST_TIMEOUT_HEADER,
+    oracle=Depends(get_oracle),
+):
+    """Answers from the FAQ store when confident, otherwise falls back to extractive search."""
+    return await respond_cached(
+        request,
+        "ask",
+        input,
+        AskResponse,
+        partial(
+            run_with_deadline,
+            request,
+            timeout,
+            "ask",
+            oracle.ask,
+            query=input.query,
+            params=input.params,
+        ),
+    )
+
+
+@router.post(
     path="/document-search",
     status_code=status.HTTP_200_OK,
     tags=["search"],
     response_model=Documents,
 )
-def document_search(input: Search):
+async def document_search(input: Search, request: Request, oracle=Depends(get_oracle)):
     """Returns full documents related to user query."""
-    return oracle.document_search(query=input.query, params=input.params)
+    return await respond_cached(
+        request,
+        "document-search",
+        input,
+        Documents,
+        partial(
+            run_scheduled,
+            request,
+            "document-search",
+            oracle.document_search,
+            query=input.query,
+            params=input.params,
+        ),
+    )
 
 
-@app.get(
+@router.get(
     path="/health",
     status_code=status.HTTP_200_OK,
     tags=["health"],
@@ -144,33 +453,197 @@ def health():
     return get_health_status()
 
 
-@app.post(
+@router.get(
+    path="/ready",
+    status_code=status.HTTP_200_OK,
+    tags=["health"],
+    responses={
+        200: {"model": ReadyResponse},
+        503: {
+            "model": HTTPError,
+            "description": "Returned until the models are warmed up.",
+        },
+    },
+)
+def ready(oracle=Depends(get_oracle)):
+    """Readiness check that only succeeds once every model has been warmed up."""
+    if not oracle.ready.is_set():
+        raise HTTPException(status_code=503, detail="Models are warming up.")
+    return {"ready": True, "startup_seconds": oracle.startup_seconds}
+
+
+@router.get(
+    path="/scheduler",
+    status_code=status.HTTP_200_OK,
+    tags=["health"],
+    response_model=SchedulerResponse,
+)
+def scheduler_status(scheduler=Depends(get_scheduler)):
+    """Queue length, running requests and queue wait time per priority class."""
+    return {"classes": scheduler.snapshot()}
+
+
+@router.get(
+    path="/profiles",
+    status_code=status.HTTP_200_OK,
+    tags=["health"],
+    response_model=ProfilesResponse,
+)
+def profiles(oracle=Depends(get_oracle)):
+    """Loaded model profiles with their models, weight memory and latency per endpoint."""
+    return oracle.profiles()
+
+
+@router.get(
+    path="/deduplication",
+    status_code=status.HTTP_200_OK,
+    tags=["documents"],
+    response_model=DeduplicationResponse,
+)
+def deduplication(oracle=Depends(get_oracle)):
+    """Near-duplicate chunks found while indexing, and the index size and embedding time saved."""
+    return oracle.deduplication()
+
+
+@router.get(
+    path="/metrics",
+    status_code=status.HTTP_200_OK,
+    tags=["health"],
+    response_model=MetricsResponse,
+)
+def get_metrics():
+    """Returns in-process counters, gauges and summaries such as /ask tier hit rates."""
+    return metrics.snapshot()
+
+
+@router.get(
+    path="/admin/memory",
+    status_code=status.HTTP_200_OK,
+    tags=["admin"],
+    response_model=MemoryResponse,
+)
+def memory(oracle=Depends(get_oracle)):
+    """Reports resident bytes per document store, index and model. Scans every document."""
+    return oracle.memory_usage()
+
+
+@router.get(
+    path="/admin/allocations",
+    status_code=status.HTTP_200_OK,
+    tags=["admin"],
+    response_model=AllocationSnapshots,
+)
+def list_allocation_snapshots():
+    """Lists the tracemalloc snapshots that can be diffed."""
+    return {"tracing": profiler.tracing, "snapshots": profiler.snapshots()}
+
+
+@router.post(
+    path="/admin/allocations",
+    status_code=status.HTTP_201_CREATED,
+    tags=["admin"],
+    response_model=AllocationSnapshot,
+)
+def take_allocation_snapshot(
+    frames: int = Query(
+        25, ge=1, description="Frames kept per allocation if tracing starts now."
+    ),
+):
+    """Takes a tracemalloc snapshot, starting tracing first if needed. Tracing slows the API down."""
+    profiler.start(frames=frames)
+    return profiler.snapshot()
+
+
+@router.get(
+    path="/admin/allocations/diff",
+    status_code=status.HTTP_200_OK,
+    tags=["admin"],
+    responses={
+        200: {"model": AllocationDiffs},
+        404: {"model": HTTPError, "description": "Returned for unknown snapshots."},
+    },
+)
+def diff_allocations(
+    start: str = Query(..., description="ID of the earlier snapshot."),
+    end: str = Query(..., description="ID of the later snapshot."),
+    limit: int = Query(20, ge=1, description="Number of allocation sites to return."),
+    path: Optional[str] = Query(
+        "*oracle_of_ammon*",
+        description="Only count allocations with a frame in a matching file.",
+    ),
+    group_by: Literal["lineno", "filename", "traceback"] = Query(
+        "lineno", description="Group by line, file or whole call path."
+    ),
+):
+    """Top allocation growth between two snapshots, e.g. before and after an ingestion job."""
+    try:
+        allocations = profiler.diff(
+            start=start, end=end, limit=limit, path=path, group_by=group_by
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Selected snapshot does not exist.")
+    return {"allocations": allocations}
+
+
+@router.delete(
+    path="/admin/allocations",
+    status_code=status.HTTP_200_OK,
+    tags=["admin"],
+    response_model=UploadDelete,
+)
+def stop_allocation_tracing():
+    """Stops tracemalloc and drops all snapshots."""
+    profiler.stop()
+    return {"message": "Stopped allocation tracing."}
+
+
+@router.post(
     path="/get-documents",
     status_code=status.HTTP_200_OK,
     tags=["documents"],
     response_model=Documents,
+    responses={
+        400: {
+            "model": HTTPError,
+            "description": "Returned when the cursor is invalid.",
+        },
+    },
 )
-def get_documents(input: Index):
-    """Returns all documents in the selected index/document store."""
-    if input.is_faq:
-        return {
-            "documents": oracle.faq_document_store.get_all_documents(
-                index=input.index, return_embedding=False
-            )
-        }
-    else:
-        return {
-            "documents": oracle.semantic_document_store.get_all_documents(
-                index=input.index, return_embedding=False
-            )
-        }
+def get_documents(input: DocumentQuery, oracle=Depends(get_oracle)):
+    """Streams documents in the selected index/document store, optionally one page at a time."""
+    try:
+        documents, next_cursor = oracle.get_documents(
+            index=input.index,
+            is_faq=input.is_faq,
+            filters=input.filters,
+            cursor=input.cursor,
+            page_size=input.page_size,
+            return_embedding=input.return_embedding,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if input.format == "ndjson":
+        return StreamingResponse(
+            content=stream_ndjson(documents=documents, fields=input.fields),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+    return StreamingResponse(
+        content=stream_json(
+            documents=documents, fields=input.fields, next_cursor=next_cursor
+        ),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
-@app.post(
+@router.post(
     path="/upload-documents",
     status_code=status.HTTP_201_CREATED,
     tags=["documents"],
-    response_model=UploadDelete,
+    response_model=UploadJob,
 )
 def upload_documents(
     files: List[UploadFile] = File(..., description="List of files to be indexed."),
@@ -186,13 +659,76 @@ def upload_documents(
         False,
         description="Which document store to access.",
     ),
+    priority: int = Query(0, description="Jobs with higher priority are run first."),
+    jobs=Depends(get_jobs),
 ):
-    return oracle.upload_documents(
-        files=files, index=index, **{"sheet_name": sheet_name, "is_faq": is_faq}
-    )
+    """Queues files for indexing and returns the ID of the ingestion job."""
+    try:
+        job = jobs.submit(
+            files=[(file.filename, file.file) for file in files],
+            index=index,
+            priority=priority,
+            **{"sheet_name": sheet_name, "is_faq": is_faq},
+        )
+    finally:
+        for file in files:
+            file.file.close()
 
+    return {
+        "message": f"Queued {[file.filename for file in files]} for indexing.",
+        "job_id": job["id"],
+    }
 
-@app.post(
+
+@router.get(
+    path="/jobs",
+    status_code=status.HTTP_200_OK,
+    tags=["jobs"],
+    response_model=Jobs,
+)
+def list_jobs(
+    limit: int = Query(20, ge=1, description="Number of recent jobs to return."),
+    jobs=Depends(get_jobs),
+):
+    """Lists the most recently submitted ingestion jobs."""
+    return {"jobs": jobs.list(limit=limit)}
+
+
+@router.get(
+    path="/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    tags=["jobs"],
+    responses={
+        200: {"model": Job},
+        404: {"model": HTTPError, "description": "Returned when the job is unknown."},
+    },
+)
+def get_job(job_id: str, jobs=Depends(get_jobs)):
+    """Returns the status and per-file progress of an ingestion job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Selected job does not exist.")
+    return job
+
+
+@router.delete(
+    path="/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    tags=["jobs"],
+    responses={
+        200: {"model": Job},
+        404: {"model": HTTPError, "description": "Returned when the job is unknown."},
+    },
+)
+def cancel_job(job_id: str, jobs=Depends(get_jobs)):
+    """Cancels a queued job, or stops a running job after its current phase."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Selected job does not exist.")
+    return job
+
+
+@router.post(
     path="/summary",
     status_code=status.HTTP_200_OK,
     tags=["documents"],
@@ -204,49 +740,36 @@ def upload_documents(
         },
     },
 )
-def summary(input: Index):
-    """Returns basic summary statistics for a given index."""
+def summary(input: Index, oracle=Depends(get_oracle)):
+    """Returns summary statistics for a given index, maintained as documents are written and deleted."""
     if input.is_faq:
-        if input.index not in oracle.faq_document_store.indexes.keys():
+        if not oracle.faq_document_store.has_index(input.index):
             raise HTTPException(
                 status_code=404, detail="Selected index does not exist."
             )
         return oracle.faq_document_store.describe_documents(index=input.index)
     if not input.is_faq:
-        if input.index not in oracle.semantic_document_store.indexes.keys():
+        if not oracle.semantic_document_store.has_index(input.index):
             raise HTTPException(
                 status_code=404, detail="Selected index does not exist."
             )
         return oracle.semantic_document_store.describe_documents(index=input.index)
 
 
-@app.delete(
+@router.delete(
     path="/delete-documents",
     status_code=status.HTTP_200_OK,
     tags=["documents"],
     response_model=UploadDelete,
 )
-def delete_documents(input: DocumentIDs):
+def delete_documents(input: DocumentIDs, oracle=Depends(get_oracle)):
     """Deletes selected documents from an index. Expects comma-separated list of document id's."""
-    if input.is_faq:
-        oracle.faq_document_store.delete_documents(index=input.index, ids=input.ids)
-        oracle.faq_document_store.update_embeddings(
-            retriever=oracle.faq_retriever,
-            index=input.index,
-            update_existing_embeddings=False,
-        )
-        return {"message": f"Successfully deleted: {input.ids}"}
-    if not input.is_faq:
-        oracle.semantic_document_store.delete_documents(
-            index=input.index, ids=input.ids
-        )
-        oracle.semantic_document_store.update_embeddings(
-            retriever=oracle.semantic_retriever, index=input.index
-        )
-        return {"message": f"Successfully deleted: {input.ids}"}
+    return oracle.delete_documents(
+        ids=input.ids, index=input.index, is_faq=input.is_faq
+    )
 
 
-@app.delete(
+@router.delete(
     path="/delete-index",
     status_code=status.HTTP_200_OK,
     tags=["documents"],
@@ -258,57 +781,224 @@ def delete_documents(input: DocumentIDs):
         },
     },
 )
-def delete_index(input: Index):
+def delete_index(input: Index, oracle=Depends(get_oracle)):
     """Deletes entire index."""
     if input.is_faq:
-        if input.index not in oracle.faq_document_store.indexes.keys():
+        if not oracle.faq_document_store.has_index(input.index):
             raise HTTPException(
                 status_code=404, detail="Selected index does not exist."
             )
-        oracle.faq_document_store.delete_index(index=input.index)
-        return {"message": f"Successfully deleted '{input.index}' index."}
     if not input.is_faq:
-        if input.index not in oracle.semantic_document_store.indexes.keys():
+        if not oracle.semantic_document_store.has_index(input.index):
             raise HTTPException(
                 status_code=404, detail="Selected index does not exist."
             )
-        oracle.semantic_document_store.delete_index(index=input.index)
-        return {"message": f"Successfully deleted '{input.index}' index."}
+    return oracle.delete_index(index=input.index, is_faq=input.is_faq)
+
+
+@router.post(
+    path="/rebalance-index",
+    status_code=status.HTTP_200_OK,
+    tags=["documents"],
+    responses={
+        200: {"model": UploadDelete},
+        404: {
+            "model": HTTPError,
+            "description": "Returned when document store is empty.",
+        },
+    },
+)
+def rebalance_index(input: Rebalance, oracle=Depends(get_oracle)):
+    """Redistributes an index across a new number of shards. Take the index out of rotation first."""
+    store = (
+        oracle.faq_document_store if input.is_faq else oracle.semantic_document_store
+    )
+    if not store.has_index(input.index):
+        raise HTTPException(status_code=404, detail="Selected index does not exist.")
+    return oracle.rebalance_index(
+        shards=input.shards, index=input.index, is_faq=input.is_faq
+    )
 
 
-@app.post(
+@router.post(
+    path="/reindex",
+    status_code=status.HTTP_200_OK,
+    tags=["documents"],
+    response_model=ReindexResponse,
+    responses={
+        404: {
+            "model": HTTPError,
+            "description": "Returned when the index or profile does not exist.",
+        },
+    },
+)
+async def reindex(input: Reindex, request: Request, oracle=Depends(get_oracle)):
+    """Re-embeds an index across worker processes, resuming an interrupted reindex."""
+    try:
+        return await run_scheduled(
+            request,
+            "ingestion",
+            oracle.reindex,
+            index=input.index,
+            is_faq=input.is_faq,
+            profile=input.profile,
+            resume=input.resume,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get(
+    path="/indexes/{name}/export",
+    status_code=status.HTTP_200_OK,
+    tags=["documents"],
+    response_class=FileResponse,
+    responses={
+        404: {
+            "model": HTTPError,
+            "description": "Returned when the index does not exist.",
+        },
+    },
+)
+def export_index(
+    name: str,
+    is_faq: bool = Query(False, description="Which document store to access."),
+    oracle=Depends(get_oracle),
+):
+    """Downloads an index with its embeddings as a tar archive for import on another node."""
+    store = oracle.faq_document_store if is_faq else oracle.semantic_document_store
+    if not store.has_index(name):
+        raise HTTPException(status_code=404, detail="Selected index does not exist.")
+
+    descriptor, path = tempfile.mkstemp(suffix=".tar")
+    try:
+        with os.fdopen(descriptor, "wb") as archive:
+            oracle.export_index(fileobj=archive, index=name, is_faq=is_faq)
+    except Exception:
+        os.remove(path)
+        raise
+    return FileResponse(
+        path=path,
+        media_type="application/x-tar",
+        filename=f"{name}.tar",
+        background=BackgroundTask(os.remove, path),
+    )
+
+
+@router.post(
+    path="/indexes/{name}/import",
+    status_code=status.HTTP_201_CREATED,
+    tags=["documents"],
+    responses={
+        201: {"model": IndexImport},
+        400: {
+            "model": HTTPError,
+            "description": "Returned when the archive is invalid or was built with another model.",
+        },
+    },
+)
+def import_index(
+    name: str,
+    file: UploadFile = File(..., description="Archive from /indexes/{name}/export."),
+    is_faq: bool = Query(False, description="Which document store to access."),
+    duplicate_documents: Literal["skip", "overwrite", "fail"] = Query(
+        "skip", description="How to handle documents already in the index."
+    ),
+    oracle=Depends(get_oracle),
+):
+    """Bulk-loads an exported index without embedding anything again."""
+    try:
+        return oracle.import_index(
+            fileobj=file.file,
+            index=name,
+            is_faq=is_faq,
+            duplicate_documents=duplicate_documents,
+        )
+    except (ValueError, KeyError, tarfile.TarError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid archive: {e}")
+    finally:
+        file.file.close()
+
+
+@router.post(
     path="/search-summarization",
     status_code=status.HTTP_200_OK,
     tags=["search"],
     response_model=SearchSummary,
 )
-def search_summarization(input: Search):
+async def search_summarization(
+    input: Search,
+    request: Request,
+    timeout: Optional[float] = REQUEST_TIMEOUT_HEADER,
+    oracle=Depends(get_oracle),
+):
     """Extends document search. Finds the most relevant documents and then returns a summary for each one."""
-    return oracle.search_summarization(query=input.query, params=input.params)
+    return await respond_cached(
+        request,
+        "search-summarization",
+        input,
+        SearchSummary,
+        partial(
+            run_with_deadline,
+            request,
+            timeout,
+            "search-summarization",
+            oracle.search_summarization,
+            query=input.query,
+            params=input.params,
+        ),
+    )
 
 
-@app.post(
+@router.post(
     path="/document-summarization",
     status_code=status.HTTP_200_OK,
     tags=["search"],
     response_model=Documents,
 )
-def document_summarization(
-    file: UploadFile = File(..., description="File to be summarized.")
+async def document_summarization(
+    request: Request,
+    file: UploadFile = File(..., description="File to be summarized."),
+    oracle=Depends(get_oracle),
 ):
     """Skips indexing and returns a document summary."""
-    return oracle.document_summarization(file=file)
+    result = await run_scheduled(
+        request, "document-summarization", oracle.document_summarization, file=file
+    )
+    return respond(result, Documents)
 
 
-@app.post(
+@router.post(
     path="/search-span-summarization",
     status_code=status.HTTP_200_OK,
     tags=["search"],
     response_model=Documents,
 )
-def search_span_summarization(input: Search):
+async def search_span_summarization(
+    input: Search,
+    request: Request,
+    timeout: Optional[float] = REQUEST_TIMEOUT_HEADER,
+    oracle=Depends(get_oracle),
+):
     """Extends document search. Finds the most relevant documents and returns a single, combined summary."""
-    return oracle.search_span_summarization(query=input.query, params=input.params)
+    return await respond_cached(
+        request,
+        "search-span-summarization",
+        input,
+        SearchSummary,
+        partial(
+            run_with_deadline,
+            request,
+            timeout,
+            "search-span-summarization",
+            oracle.search_span_summarization,
+            query=input.query,
+            params=input.params,
+        ),
+    )
+
+
+app: FastAPI = create_app()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class OracleConfig:
+    """Settings for ``create_app``.
+
+    ``retriever``, ``reader`` and ``summarizer`` replace the matching ``Oracle.create_*``
+    method; each receives the Oracle being built. ``profiles`` names the model
+    profiles to load, the default first. ``oracle`` replaces the Oracle altogether,
+    e.g. with a lightweight stand-in for tests.
+    """
+
+    index: str = field(default_factory=lambda: os.environ.get("INDEX", "document"))
+    title: str = field(
+        default_factory=lambda: os.environ.get("API_TITLE", "Oracle of Ammon")
+    )
+    warm_up: bool = True
+    jobs_directory: Optional[str] = None
+    retriever: Optional[Callable[[Any], Any]] = None
+    reader: Optional[Callable[[Any], Any]] = None
+    summarizer: Optional[Callable[[Any], Any]] = None
+    profiles: Optional[str] = None
+    oracle: Optional[Callable[["OracleConfig"], Any]] = None
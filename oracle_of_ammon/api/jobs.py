@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+logger: logging.Logger = configure_logger()
+
+QUEUED: str = "queued"
+RUNNING: str = "running"
+COMPLETED: str = "completed"
+FAILED: str = "failed"
+CANCELLED: str = "cancelled"
+FINISHED: Tuple[str, ...] = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueue:
+    """Persistent queue of ingestion jobs processed by a pool of worker threads.
+
+    Job metadata lives in a SQLite database and uploaded files are spooled next to
+    it, so queued and interrupted jobs are picked up again after a restart. Files
+    that finished indexing before the restart are not indexed twice.
+    """
+
+    def __init__(
+        self,
+        index_file: Callable[..., None],
+        directory: str = os.environ.get(
+            "JOBS_DIR",
+            os.path.join(os.path.expanduser("~"), ".oracle_of_ammon", "jobs"),
+        ),
+        workers: int = int(os.environ.get("INGEST_WORKERS", 1)),
+    ):
+        self.index_file = index_file
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._cancelled: set = set()
+        self._queue: "queue.PriorityQueue[Tuple[int, float, str]]" = (
+            queue.PriorityQueue()
+        )
+        self._connection = sqlite3.connect(
+            os.path.join(self.directory, "jobs.sqlite3"), check_same_thread=False
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+                """
+            )
+        self._recover()
+
+        self._workers: List[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"ingest-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _recover(self) -> None:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, priority, created FROM jobs WHERE status IN (?, ?)",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        for job_id, priority, created in rows:
+            logger.debug(f"Resuming ingestion job {job_id}")
+            self._update(job_id, status=QUEUED)
+            self._queue.put((-priority, created, job_id))
+
+    def _save(self, job: dict) -> None:
+        job["updated"] = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    job["id"],
+                    job["status"],
+                    job["priority"],
+                    job["created"],
+                    job["updated"],
+                    json.dumps(job),
+                ),
+            )
+
+    def _update(self, job_id: str, **fields) -> dict:
+        job = self.get(job_id)
+        job.update(fields)
+        self._save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT payload FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, limit: int = 20) -> List[dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT payload FROM jobs ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def submit(
+        self,
+        files: List[Tuple[str, BinaryIO]],
+        index: str,
+        priority: int = 0,
+        **kwargs,
+    ) -> dict:
+        """Spools ``(filename, file)`` pairs to disk and queues them for indexing."""
+        job_id: str = uuid.uuid4().hex
+        job_directory = os.path.join(self.directory, job_id)
+        os.makedirs(job_directory, exist_ok=True)
+
+        file_progress: List[dict] = []
+        for position, (filename, file) in enumerate(files):
+            path = os.path.join(
+                job_directory, f"{position}-{os.path.basename(filename)}"
+            )
+            with open(path, mode="wb") as f:
+                shutil.copyfileobj(file, f)
+            file_progress.append(
+                {
+                    "filename": filename,
+                    "path": path,
+                    "bytes": os.path.getsize(path),
+                    "phase": QUEUED,
+                    "chunks_embedded": 0,
+                    "error": None,
+                }
+            )
+
+        job: dict = {
+            "id": job_id,
+            "status": QUEUED,
+            "priority": priority,
+            "created": time.time(),
+            "updated": time.time(),
+            "started": None,
+            "finished": None,
+            "index": index,
+            "kwargs": kwargs,
+            "files": file_progress,
+            "chunks_embedded": 0,
+            "throughput": None,
+            "eta_seconds": None,
+        }
+        self._save(job)
+        self._queue.put((-priority, job["created"], job_id))
+        metrics.increment("jobs.submitted")
+        return job
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        job = self.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        self._cancelled.add(job_id)
+        if job["status"] == QUEUED:
+            # Workers skip jobs that are no longer queued, so nothing else removes
+            # the spooled files.
+            job = self._update(job_id, status=CANCELLED, finished=time.time())
+            self._clean_up(job)
+            metrics.increment("jobs.cancelled")
+        return job
+
+    def _work(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            try:
+                job = self.get(job_id)
+                if job is None or job["status"] != QUEUED:
+                    continue
+                if job_id in self._cancelled:
+                    self._update(job_id, status=CANCELLED, finished=time.time())
+                    continue
+                self._run(job)
+            except Exception as e:
+                logger.error(f"Ingestion job {job_id} failed: {e}")
+            finally:
+                self._cancelled.discard(job_id)
+                self._queue.task_done()
+
+    def _run(self, job: dict) -> None:
+        job.update(status=RUNNING, started=job["started"] or time.time())
+        self._save(job)
+        total_bytes: int = sum(file["bytes"] for file in job["files"])
+        started: float = time.time()
+        processed_bytes: int = 0
+
+        for file in job["files"]:
+            if file["phase"] == COMPLETED:
+                continue
+
+            def progress(phase: str, chunks: int = 0, file: Dict = file) -> None:
+                if job["id"] in self._cancelled:
+                    raise JobCancelled()
+                file["phase"] = phase
+                file["chunks_embedded"] += chunks
+                job["chunks_embedded"] += chunks
+                elapsed = max(time.time() - started, 1e-6)
+                job["throughput"] = job["chunks_embedded"] / elapsed
+                self._save(job)
+
+            try:
+                progress("indexing")
+                self.index_file(
+                    filepath_or_buffer=file["path"],
+                    filename=file["filename"],
+                    index=job["index"],
+                    progress=progress,
+                    **job["kwargs"],
+                )
+                file["phase"] = COMPLETED
+            except JobCancelled:
+                job.update(status=CANCELLED, finished=time.time())
+                self._save(job)
+                self._clean_up(job)
+                metrics.increment("jobs.cancelled")
+                return
+            except Exception as e:
+                logger.error(f"Unable to index {file['filename']}: {e}")
+                file.update(phase=FAILED, error=str(e))
+
+            processed_bytes += file["bytes"]
+            elapsed = time.time() - started
+            remaining = total_bytes - processed_bytes
+            job["eta_seconds"] = (
+                elapsed / processed_bytes * remaining if processed_bytes else None
+            )
+            self._save(job)
+
+        failed = any(file["phase"] == FAILED for file in job["files"])
+        job.update(
+            status=FAILED if failed else COMPLETED,
+            finished=time.time(),
+            eta_seconds=0,
+        )
+        self._save(job)
+        self._clean_up(job)
+        metrics.increment(f"jobs.{job['status']}")
+
+    def _clean_up(self, job: dict) -> None:
+        shutil.rmtree(os.path.join(self.directory, job["id"]), ignore_errors=True)
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from haystack import Answer, Document
 from pydantic import BaseModel, Field, validator
@@ -13,11 +13,33 @@ class Index(BaseModel):
     is_faq: bool = Field(default=False, description="Which document store to access.")
 
 
+class DocumentQuery(Index):
+    page_size: Optional[int] = Field(
+        None, ge=1, description="Documents per page. Omit to stream the whole index."
+    )
+    cursor: Optional[str] = Field(
+        None, description="Opaque cursor returned by the previous page."
+    )
+    fields: Literal["all", "content", "ids"] = Field(
+        "all", description="Return full documents, content without meta, or ids only."
+    )
+    filters: Optional[dict] = Field(None, description="Haystack metadata filters.")
+    return_embedding: bool = Field(
+        False, description="Include embeddings when returning full documents."
+    )
+    format: Literal["json", "ndjson"] = Field(
+        "json", description="A single JSON object or newline-delimited documents."
+    )
+
+
 class Search(BaseModel):
     query: str = Field(..., description="Natural language question in sentence form.")
     params: dict = Field(
         {"Retriever": {"top_k": 3, "index": os.environ.get("INDEX", "document")}},
-        description="Search Engine node component parameters.",
+        description=(
+            "Search Engine node component parameters. "
+            '{"Profile": {"name": "fast"}} selects a loaded model profile.'
+        ),
     )
 
 
@@ -26,6 +48,88 @@ class SearchResponse(BaseModel):
     answers: List[Answer] = Field(
         ..., description="List of answers in descending order by relevance score."
     )
+    degraded: bool = Field(
+        False, description="Whether passages were dropped to meet the time budget."
+    )
+
+
+class AskResponse(SearchResponse):
+    tier: str = Field(
+        ..., description="Tier that answered the query: 'faq' or 'extractive'."
+    )
+    faq_score: float = Field(..., description="Score of the best FAQ match.")
+
+
+class PriorityClassStatus(BaseModel):
+    weight: float = Field(..., description="Share of the workers under contention.")
+    concurrency: int = Field(..., description="Maximum requests running at once.")
+    queued: int = Field(..., description="Requests waiting for a worker.")
+    running: int = Field(..., description="Requests currently running.")
+    dispatched: int = Field(..., description="Requests admitted since startup.")
+    wait_p50_seconds: float = Field(..., description="Median queue wait.")
+    wait_p99_seconds: float = Field(..., description="99th percentile queue wait.")
+
+
+class SchedulerResponse(BaseModel):
+    classes: Dict[str, PriorityClassStatus]
+
+
+class EndpointLatency(BaseModel):
+    requests: int = Field(..., description="Requests served since startup.")
+    latency_p50_seconds: float = Field(..., description="Median latency.")
+    latency_p99_seconds: float = Field(..., description="99th percentile latency.")
+
+
+class ProfileStatus(BaseModel):
+    models: Dict[str, object] = Field(
+        ..., description="Models and embedding dimensions of the profile."
+    )
+    model_bytes: int = Field(
+        ..., description="Bytes held by the profile's models, shared or not."
+    )
+    endpoints: Dict[str, EndpointLatency] = Field(
+        default_factory=dict, description="Usage and latency per endpoint."
+    )
+
+
+class ProfilesResponse(BaseModel):
+    default: str = Field(..., description="Profile of requests that name none.")
+    budget_bytes: int = Field(
+        0, description="Model memory all profiles may share; 0 for no limit."
+    )
+    model_bytes: int = Field(
+        ..., description="Bytes held by the models of all profiles together."
+    )
+    profiles: Dict[str, ProfileStatus]
+
+
+class IndexDeduplication(BaseModel):
+    chunks: int = Field(..., description="Chunks checked since startup.")
+    duplicates: int = Field(..., description="Chunks found to be near-duplicates.")
+    duplicate_ratio: float = Field(..., description="Share of chunks that were.")
+    bytes_saved: int = Field(
+        ..., description="Content and embedding bytes the index did not grow by."
+    )
+    embedding_seconds_saved: float = Field(
+        ..., description="Embedding time saved at the observed embedding throughput."
+    )
+
+
+class DeduplicationResponse(BaseModel):
+    mode: Literal["skip", "link", "off"] = Field(
+        ..., description="Whether near-duplicates are dropped or linked to kept chunks."
+    )
+    threshold: float = Field(..., description="Estimated Jaccard similarity cut-off.")
+    indexes: Dict[str, IndexDeduplication]
+
+
+class MetricsResponse(BaseModel):
+    counters: dict = Field(default_factory=dict, description="Monotonic counters.")
+    gauges: dict = Field(default_factory=dict, description="Point-in-time values.")
+    summaries: dict = Field(
+        default_factory=dict,
+        description="Count, sum, min, max and mean of observed values.",
+    )
 
 
 class Documents(BaseModel):
@@ -39,16 +143,89 @@ class SearchSummary(Documents):
     )
     query: str = Field(..., description="Query posed by the user.")
     node_id: str = Field(..., description="Name of the responding node.")
+    degraded: bool = Field(
+        False,
+        description="Whether summarization was skipped for some documents to meet the time budget.",
+    )
 
 
 class UploadDelete(BaseModel):
     message: str = Field(..., description="Status of upload or deletion of documents.")
 
 
+class IndexImport(UploadDelete):
+    documents: int = Field(
+        ..., description="Number of documents read from the archive."
+    )
+
+
+class UploadJob(UploadDelete):
+    job_id: str = Field(..., description="ID of the ingestion job.")
+
+
+class FileProgress(BaseModel):
+    filename: str = Field(..., description="Name of the uploaded file.")
+    bytes: int = Field(..., description="Size of the uploaded file in bytes.")
+    phase: str = Field(..., description="Current ingestion phase of the file.")
+    chunks_embedded: int = Field(..., description="Number of chunks embedded so far.")
+    error: Optional[str] = Field(None, description="Reason the file failed.")
+
+
+class Job(BaseModel):
+    id: str = Field(..., description="ID of the ingestion job.")
+    status: str = Field(
+        ..., description="One of queued, running, completed, failed or cancelled."
+    )
+    priority: int = Field(..., description="Higher priority jobs run first.")
+    index: str = Field(..., description="Index the files are written to.")
+    created: float = Field(..., description="Submission time as a UNIX timestamp.")
+    started: Optional[float] = Field(None, description="Start time.")
+    finished: Optional[float] = Field(None, description="Completion time.")
+    files: List[FileProgress] = Field(..., description="Per-file progress.")
+    chunks_embedded: int = Field(..., description="Chunks embedded across all files.")
+    throughput: Optional[float] = Field(None, description="Chunks embedded per second.")
+    eta_seconds: Optional[float] = Field(
+        None, description="Estimated seconds until the job finishes."
+    )
+
+
+class Jobs(BaseModel):
+    jobs: List[Job]
+
+
 class DocumentIDs(Index):
     ids: List[str] = Field(..., description="List of document IDs to be selected.`")
 
 
+class Rebalance(Index):
+    shards: int = Field(
+        ..., ge=1, description="Number of shards to split the index into."
+    )
+
+
+class Reindex(Index):
+    profile: Optional[str] = Field(
+        None,
+        description="Profile whose retriever re-embeds the index; the default if unset.",
+    )
+    resume: bool = Field(
+        True, description="Continue an interrupted reindex instead of starting over."
+    )
+
+
+class ReindexResponse(UploadDelete):
+    workers: int = Field(..., description="Processes the documents were embedded in.")
+    threads_per_worker: Optional[int] = Field(
+        None, description="Cores, and torch threads, each worker was pinned to."
+    )
+    chunks: int = Field(..., description="Chunks embedded.")
+    seconds: float = Field(..., description="Time spent embedding.")
+    chunks_per_second: float = Field(..., description="Embedding throughput.")
+    core_utilization: Optional[float] = Field(
+        None, description="Mean busy fraction of the workers' cores while embedding."
+    )
+
+
 class Summary(BaseModel):
     count: int = Field(..., description="Count of documents in an index.")
     chars_mean: float = Field(
@@ -63,6 +240,12 @@ class Summary(BaseModel):
     chars_median: int = Field(
         ..., description="Median characters across all documents in an index."
     )
+    files: int = Field(0, description="Number of source files the documents came from.")
+    embeddings: int = Field(0, description="Number of documents with an embedding.")
+    embedding_bytes: int = Field(0, description="Memory used by embeddings in bytes.")
+    last_write: Optional[float] = Field(
+        None, description="Time of the last change to the index as a UNIX timestamp."
+    )
 
 
 class HTTPError(BaseModel):
@@ -110,6 +293,62 @@ class GPUInfo(BaseModel):
     usage: GPUUsage = Field(..., description="GPU usage details.")
 
 
+class ReadyResponse(BaseModel):
+    ready: bool = Field(..., description="Whether models are loaded and warmed up.")
+    startup_seconds: dict = Field(
+        default_factory=dict,
+        description="Seconds spent loading and warming up each component.",
+    )
+
+
+class IndexMemory(BaseModel):
+    documents: int = Field(..., description="Number of documents in the index.")
+    text_bytes: int = Field(..., description="Bytes held by document content.")
+    meta_bytes: int = Field(..., description="Bytes held by document meta.")
+    embedding_bytes: int = Field(..., description="Bytes held by embeddings.")
+    total_bytes: int = Field(..., description="Sum of the above.")
+
+
+class ModelMemory(BaseModel):
+    parameters: int = Field(0, description="Number of parameters.")
+    parameter_bytes: int = Field(0, description="Bytes held by parameters.")
+    buffer_bytes: int = Field(0, description="Bytes held by buffers.")
+    total_bytes: int = Field(0, description="Sum of parameter and buffer bytes.")
+    device: Optional[str] = Field(None, description="Device the weights live on.")
+
+
+class MemoryResponse(BaseModel):
+    rss_bytes: int = Field(..., description="Resident set size of the API process.")
+    stores: Dict[str, Dict[str, IndexMemory]] = Field(
+        ..., description="Memory per document store and index."
+    )
+    models: Dict[str, ModelMemory] = Field(..., description="Memory per loaded model.")
+
+
+class AllocationSnapshot(BaseModel):
+    id: str = Field(..., description="ID used to diff this snapshot.")
+    taken: float = Field(..., description="Time taken as a UNIX timestamp.")
+    traced_bytes: int = Field(..., description="Memory traced when taken.")
+    peak_bytes: int = Field(..., description="Peak traced memory when taken.")
+
+
+class AllocationSnapshots(BaseModel):
+    tracing: bool = Field(..., description="Whether tracemalloc is running.")
+    snapshots: List[AllocationSnapshot]
+
+
+class AllocationDiff(BaseModel):
+    size_diff: int = Field(..., description="Change in allocated bytes.")
+    count_diff: int = Field(..., description="Change in number of allocations.")
+    size: int = Field(..., description="Allocated bytes at the end.")
+    count: int = Field(..., description="Number of allocations at the end.")
+    traceback: List[str] = Field(..., description="Allocating file:line frames.")
+
+
+class AllocationDiffs(BaseModel):
+    allocations: List[AllocationDiff]
+
+
 class HealthResponse(BaseModel):
     version: str = Field(..., description="Haystack version.")
     cpu: CPUUsage = Field(..., description="CPU usage details.")
@@ -1,13 +1,22 @@
+import copy
+import json
 import logging
 import os
 import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from tempfile import SpooledTemporaryFile
-from typing import List, Union
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import pandas as pd
+import psutil
 from fastapi import UploadFile
-from haystack import Answer
-from haystack.document_stores import InMemoryDocumentStore
+from haystack import Answer, Document
 from haystack.nodes import (
     DocumentMerger,
     DocxToTextConverter,
@@ -22,39 +31,300 @@ from haystack.nodes import (
 )
 from haystack.pipelines import (
     DocumentSearchPipeline,
-    ExtractiveQAPipeline,
     FAQPipeline,
     Pipeline,
-    SearchSummarizationPipeline,
 )
 from torch.cuda import is_available
 
+from oracle_of_ammon.api.store import ShardedDocumentStore
+from oracle_of_ammon.api.utils.archive import export_archive, read_archive
+from oracle_of_ammon.api.utils.batching import bucket_by_length, padding_ratio
+from oracle_of_ammon.api.utils.cache import SemanticCache
+from oracle_of_ammon.api.utils.columnar import (
+    EMBEDDING_COLUMN,
+    is_columnar,
+    precomputed_embeddings,
+    read_table,
+)
+from oracle_of_ammon.api.utils.deadline import Deadline, RequestCancelled
+from oracle_of_ammon.api.utils.dedup import Deduplicator, NearDuplicateFilter
+from oracle_of_ammon.api.utils.embedding import (
+    EMBEDDING_BATCH,
+    EMBEDDING_CHECKPOINT_DIR,
+    EMBEDDING_WORKERS,
+    MIN_PARALLEL_EMBEDDING,
+    BulkEmbedder,
+    ReindexCheckpoint,
+    batched,
+    retriever_settings,
+)
 from oracle_of_ammon.api.utils.filehandler import FileHandler
+from oracle_of_ammon.api.utils.memory import module_memory
+from oracle_of_ammon.api.utils.pagination import decode_cursor, paginate
+from oracle_of_ammon.api.utils.passages import PassageCache
+from oracle_of_ammon.api.utils.pdf import iter_page_batches, remove_header_footer
+from oracle_of_ammon.api.utils.preprocessor import FastPreProcessor
+from oracle_of_ammon.api.utils.profiles import (
+    MODEL_MEMORY_BUDGET,
+    MODEL_PROFILES,
+    MODEL_PROFILES_FILE,
+    ModelProfile,
+    directory_name,
+    read_profiles,
+    requested_profile,
+    select_profiles,
+)
+from oracle_of_ammon.api.utils.stats import QuantileSketch
+from oracle_of_ammon.api.utils.xlsx import iter_sheets
 from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
 
 logger: logging.Logger = configure_logger()
 
+FAQ_CONFIDENCE_THRESHOLD: float = float(
+    os.environ.get("FAQ_CONFIDENCE_THRESHOLD", 0.75)
+)
+ASK_MIN_PASSAGES: int = int(os.environ.get("ASK_MIN_PASSAGES", 2))
+ASK_MAX_PASSAGES: int = int(os.environ.get("ASK_MAX_PASSAGES", 10))
+ASK_TIERS: tuple = ("faq", "extractive")
+FAQ_EMBEDDING_BATCH: int = int(os.environ.get("FAQ_EMBEDDING_BATCH", 512))
+SEMANTIC_CACHE_SIZE: int = int(os.environ.get("SEMANTIC_CACHE_SIZE", 1024))
+SEMANTIC_CACHE_DISTANCE: float = float(os.environ.get("SEMANTIC_CACHE_DISTANCE", 0.05))
+REQUEST_TIMEOUT: Optional[float] = (
+    float(os.environ["REQUEST_TIMEOUT"]) if os.environ.get("REQUEST_TIMEOUT") else None
+)
+# Tokenized reader passages kept between requests; 0 disables the cache.
+PASSAGE_CACHE_SIZE: int = int(os.environ.get("PASSAGE_CACHE_SIZE", 4096))
+READER_BATCH_TOKENS: int = int(os.environ.get("READER_BATCH_TOKENS", 1536))
+SUMMARIZER_BATCH_TOKENS: int = int(os.environ.get("SUMMARIZER_BATCH_TOKENS", 4096))
+BUCKET_BY_LENGTH: bool = os.environ.get("BUCKET_BY_LENGTH", "true").lower() == "true"
+# Mutations are logged here and replayed on startup; unset, nothing is logged.
+WAL_DIR: str = os.environ.get("WAL_DIR", "")
+STARTUP_WORKERS: int = int(os.environ.get("STARTUP_WORKERS", 3))
+WARMUP_ROUNDS: int = int(os.environ.get("WARMUP_ROUNDS", 1))
+WARMUP_QUERY: str = os.environ.get("WARMUP_QUERY", "Where is the Oracle of Ammon?")
+WARMUP_TEXT: str = (
+    "The Oracle of Ammon was located in the Siwa Oasis in the Western Desert of "
+    "Egypt. Pilgrims crossed the desert to consult the oracle, and Alexander the "
+    "Great visited it in 331 BC on his way back from the Mediterranean coast."
+)
+# Reader state that tiers sharing a reader model share with it.
+READER_FIELDS: Tuple[str, ...] = (
+    "reader",
+    "sized_readers",
+    "sized_readers_lock",
+    "reader_max_seq_len",
+    "reader_doc_stride",
+    "reader_metrics",
+    "passage_cache",
+)
+
+
+@dataclass
+class ModelTier:
+    """A loaded model profile: its models, the stores its retrievers search, and
+    per-endpoint latency. Tiers sharing a model share the objects built for it."""
+
+    profile: ModelProfile
+    faq_document_store: ShardedDocumentStore
+    semantic_document_store: ShardedDocumentStore
+    faq_retriever: EmbeddingRetriever
+    semantic_retriever: EmbeddingRetriever
+    reader: FARMReader
+    summarizer: TransformersSummarizer
+    faq_pipeline: FAQPipeline
+    document_search_pipeline: DocumentSearchPipeline
+    passage_cache: PassageCache
+    # Batches are read with a sequence length fitted to their passages, by copies of
+    # the reader that share its model but have their own processor.
+    sized_readers: Dict[int, FARMReader]
+    sized_readers_lock: threading.Lock
+    reader_max_seq_len: int
+    reader_doc_stride: int
+    # Prefixes of the throughput metrics the time budgets are planned with.
+    reader_metrics: str = "reader"
+    summarizer_metrics: str = "summarizer"
+    latency: Dict[str, QuantileSketch] = field(
+        default_factory=lambda: defaultdict(QuantileSketch)
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self.latency[endpoint].add(seconds)
+
+    def sized_reader(self, max_seq_len: int) -> FARMReader:
+        """The reader windowing passages at ``max_seq_len``, built on first use."""
+        if max_seq_len == self.reader_max_seq_len:
+            return self.reader
+        with self.sized_readers_lock:
+            if max_seq_len not in self.sized_readers:
+                processor = self.reader.inferencer.processor
+                self.sized_readers[max_seq_len] = resized_reader(
+                    self.reader,
+                    max_seq_len=max_seq_len,
+                    doc_stride=min(
+                        self.reader_doc_stride,
+                        max_seq_len - processor.max_query_length - 1,
+                    ),
+                    passage_cache=self.passage_cache
+                    if PASSAGE_CACHE_SIZE > 0
+                    else None,
+                )
+            return self.sized_readers[max_seq_len]
+
+    def components(self) -> Dict[str, object]:
+        return {
+            "faq_retriever": self.faq_retriever,
+            "semantic_retriever": self.semantic_retriever,
+            "reader": self.reader,
+            "summarizer": self.summarizer,
+        }
+
+    def modules(self) -> Dict[str, object]:
+        """Torch modules behind each model of the tier."""
+        modules: Dict[str, object] = {
+            name: getattr(retriever.embedding_encoder, "embedding_model", None)
+            for name, retriever in (
+                ("faq_retriever", self.faq_retriever),
+                ("semantic_retriever", self.semantic_retriever),
+            )
+        }
+        modules["reader"] = self.reader.inferencer.model
+        modules["summarizer"] = self.summarizer.summarizer.model
+        return modules
+
+    def describe(self) -> dict:
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    "requests": sketch.count,
+                    "latency_p50_seconds": sketch.quantile(0.5),
+                    "latency_p99_seconds": sketch.quantile(0.99),
+                }
+                for endpoint, sketch in self.latency.items()
+            }
+        return {
+            "models": {
+                name: value
+                for name, value in asdict(self.profile).items()
+                if name != "name"
+            },
+            "model_bytes": model_bytes(self.modules().values()),
+            "endpoints": endpoints,
+        }
+
+
+def resized_reader(
+    reader: FARMReader,
+    max_seq_len: int,
+    doc_stride: int,
+    passage_cache: Optional[PassageCache] = None,
+) -> FARMReader:
+    """A copy of ``reader`` with its own inferencer and processor but the same model.
+
+    ``update_parameters`` on the copy leaves the original untouched, so requests
+    reading at different sequence lengths do not have to take turns.
+    """
+    resized: FARMReader = copy.copy(reader)
+    resized.inferencer = copy.copy(reader.inferencer)
+    processor = copy.copy(reader.inferencer.processor)
+    # An installed passage cache is bound to the processor it was installed on.
+    vars(processor).pop("dataset_from_dicts", None)
+    if passage_cache is not None:
+        passage_cache.install(processor)
+    resized.inferencer.processor = processor
+    resized.update_parameters(max_seq_len=max_seq_len, doc_stride=doc_stride)
+    return resized
+
+
+def model_bytes(modules) -> int:
+    """Parameter and buffer bytes of ``modules``, counting shared modules once."""
+    unique = {id(module): module for module in modules if module is not None}
+    return sum(
+        module_memory(module).get("total_bytes", 0) for module in unique.values()
+    )
+
+
+def ask_budget(
+    faq_score: float,
+    threshold: float,
+    max_passages: int = ASK_MAX_PASSAGES,
+    max_answers: int = 3,
+) -> Tuple[int, int]:
+    """Passages to retrieve and answers to read when the FAQ tier is not confident.
+
+    The further the FAQ score falls below the threshold, the less likely the answer
+    is a near-paraphrase, so the reader gets more passages to work with.
+    """
+    gap: float = min(1.0, (threshold - faq_score) / max(threshold, 1e-6))
+    passages: int = round(ASK_MIN_PASSAGES + gap * (max_passages - ASK_MIN_PASSAGES))
+    return passages, min(1 + round(gap * 2), max_answers)
+
 
 class Oracle:
-    def __init__(self, index: str = os.environ.get("INDEX", "document")):
+    def __init__(
+        self,
+        index: str = os.environ.get("INDEX", "document"),
+        retriever: Optional[Callable[["Oracle"], tuple]] = None,
+        reader: Optional[Callable[["Oracle"], FARMReader]] = None,
+        summarizer: Optional[Callable[["Oracle"], TransformersSummarizer]] = None,
+        profiles: Optional[str] = None,
+    ):
+        """``retriever``, ``reader`` and ``summarizer`` override the ``create_*`` methods
+        of the default profile. ``profiles`` names the model profiles to load, the
+        default first, and defaults to ``MODEL_PROFILES``."""
         self.index = index
+        self.ready: threading.Event = threading.Event()
+        self.startup_seconds: Dict[str, float] = {}
+        self._started: float = time.perf_counter()
         self.use_gpu: bool = is_available()
         if not self.use_gpu:
             logger.debug("No CUDA-compatible GPU found.")
+        selected: List[ModelProfile] = select_profiles(
+            profiles if profiles is not None else MODEL_PROFILES,
+            read_profiles(MODEL_PROFILES_FILE),
+        )
+        self.profile: ModelProfile = selected[0]
 
         self.preprocessor: PreProcessor = self.create_preprocessor()
-        self.faq_document_store: InMemoryDocumentStore
-        self.semantic_document_store: InMemoryDocumentStore
+        self.faq_document_store: ShardedDocumentStore
+        self.semantic_document_store: ShardedDocumentStore
         (
             self.faq_document_store,
             self.semantic_document_store,
         ) = self.create_document_store()
+        self.deduplicator: Deduplicator = Deduplicator(
+            document_store=self.semantic_document_store
+        )
 
-        self.faq_retriever: EmbeddingRetriever
-        self.semantic_retriever: EmbeddingRetriever
-        self.faq_retriever, self.semantic_retriever = self.create_retriever()
-        self.reader: FARMReader = self.create_reader()
-        self.summarizer: TransformersSummarizer = self.create_summarizer()
+        # Models load concurrently; reading weights from disk releases the GIL.
+        with ThreadPoolExecutor(
+            max_workers=STARTUP_WORKERS, thread_name_prefix="startup"
+        ) as executor:
+            retrievers = executor.submit(
+                self._timed,
+                "retrievers",
+                partial(retriever, self) if retriever else self.create_retriever,
+            )
+            readers = executor.submit(
+                self._timed,
+                "reader",
+                partial(reader, self) if reader else self.create_reader,
+            )
+            summarizers = executor.submit(
+                self._timed,
+                "summarizer",
+                partial(summarizer, self) if summarizer else self.create_summarizer,
+            )
+            self.faq_retriever: EmbeddingRetriever
+            self.semantic_retriever: EmbeddingRetriever
+            self.faq_retriever, self.semantic_retriever = retrievers.result()
+            self.reader: FARMReader = readers.result()
+            self.summarizer: TransformersSummarizer = summarizers.result()
+        self.passage_cache: PassageCache = PassageCache(max_entries=PASSAGE_CACHE_SIZE)
+        if PASSAGE_CACHE_SIZE > 0:
+            self.passage_cache.install(self.reader.inferencer.processor)
         self.document_merger: DocumentMerger = self.create_document_merger()
         self.text_converter: TextConverter = self.create_text_converter()
         self.file_type_classifier: FileTypeClassifier = (
@@ -65,78 +335,173 @@ class Oracle:
         self.docx_converter: DocxToTextConverter = self.create_docx_converter()
 
         self.faq_pipeline: FAQPipeline = FAQPipeline(retriever=self.faq_retriever)
-        self.extractive_pipeline: ExtractiveQAPipeline = ExtractiveQAPipeline(
-            reader=self.reader, retriever=self.semantic_retriever
-        )
         self.document_search_pipeline: DocumentSearchPipeline = DocumentSearchPipeline(
             retriever=self.semantic_retriever
         )
-        self.search_summarization_pipeline: SearchSummarizationPipeline = (
-            SearchSummarizationPipeline(
+        self.indexing_pipeline: Pipeline = self.create_indexing_pipeline()
+
+        self.semantic_cache: SemanticCache = SemanticCache(
+            max_entries=SEMANTIC_CACHE_SIZE, max_distance=SEMANTIC_CACHE_DISTANCE
+        )
+        self._listen(self.semantic_document_store)
+
+        self.tiers: Dict[str, ModelTier] = {
+            self.profile.name: ModelTier(
+                profile=self.profile,
+                faq_document_store=self.faq_document_store,
+                semantic_document_store=self.semantic_document_store,
+                faq_retriever=self.faq_retriever,
+                semantic_retriever=self.semantic_retriever,
+                reader=self.reader,
                 summarizer=self.summarizer,
-                retriever=self.semantic_retriever,
-                generate_single_summary=False,
+                faq_pipeline=self.faq_pipeline,
+                document_search_pipeline=self.document_search_pipeline,
+                passage_cache=self.passage_cache,
+                sized_readers={},
+                sized_readers_lock=threading.Lock(),
+                reader_max_seq_len=self.reader.max_seq_len,
+                reader_doc_stride=self.reader.inferencer.processor.doc_stride,
+            )
+        }
+        for profile in selected[1:]:
+            self._timed(f"profile {profile.name}", partial(self.load_profile, profile))
+        if len(self.tiers) > 1:
+            self._timed("profile indexes", self.sync_profiles)
+
+        self._timed("sample data", self.index_documents)
+
+    def _listen(self, store: ShardedDocumentStore) -> None:
+        store.listeners.append(
+            lambda index: self.semantic_cache.invalidate(
+                lambda key: index in store.resolve_indexes(key[2])
             )
         )
-        self.span_summarizer_pipeline: Pipeline = self.create_span_summarizer_pipeline()
-        self.indexing_pipeline: Pipeline = self.create_indexing_pipeline()
 
-        self.index_documents()
+    def _timed(self, name: str, create: Callable):
+        started: float = time.perf_counter()
+        result = create()
+        self.startup_seconds[name] = time.perf_counter() - started
+        metrics.set(f"startup.{name}.seconds", self.startup_seconds[name])
+        logger.info(f"Loaded {name} in {self.startup_seconds[name]:.1f}s")
+        return result
+
+    def warm_up(self, rounds: int = WARMUP_ROUNDS) -> None:
+        """Runs dummy inputs through every model so the first request skips lazy initialization."""
+        document = Document(content=WARMUP_TEXT)
+        steps: Dict[str, Callable] = {}
+        warmed: set = set()
+        for tier in self.tiers.values():
+            for name, model, step in (
+                (
+                    "faq_retriever",
+                    tier.faq_retriever,
+                    partial(tier.faq_retriever.embed_queries, [WARMUP_QUERY]),
+                ),
+                (
+                    "semantic_retriever",
+                    tier.semantic_retriever,
+                    partial(tier.semantic_retriever.embed_queries, [WARMUP_QUERY]),
+                ),
+                (
+                    "reader",
+                    tier.reader,
+                    lambda reader=tier.reader: reader.predict(
+                        query=WARMUP_QUERY, documents=[copy.copy(document)], top_k=1
+                    ),
+                ),
+                (
+                    "summarizer",
+                    tier.summarizer,
+                    lambda summarizer=tier.summarizer: summarizer.predict(
+                        documents=[copy.deepcopy(document)]
+                    ),
+                ),
+            ):
+                if id(model) not in warmed:
+                    warmed.add(id(model))
+                    steps[self._prefix(tier) + name] = step
+        for name, step in steps.items():
+            try:
+                for _ in range(rounds):
+                    self._timed(f"warm-up {name}", step)
+            except Exception as e:
+                logger.warning(f"Unable to warm up {name}: {e}")
+
+        self.startup_seconds["ready"] = time.perf_counter() - self._started
+        metrics.set("startup.ready.seconds", self.startup_seconds["ready"])
+        logger.info(f"Ready in {self.startup_seconds['ready']:.1f}s")
+        self.ready.set()
 
-    def create_document_store(self) -> InMemoryDocumentStore:
+    def create_document_store(
+        self, profile: Optional[ModelProfile] = None
+    ) -> ShardedDocumentStore:
+        """Stores for the embeddings of ``profile``, the default profile if omitted.
+
+        Only the default profile's stores open their mutation logs here; other
+        profiles open theirs once they fit the memory budget.
+        """
+        profile = profile or self.profile
         try:
-            faq: InMemoryDocumentStore = InMemoryDocumentStore(
+            faq: ShardedDocumentStore = ShardedDocumentStore(
                 index=self.index,
                 use_gpu=self.use_gpu,
                 embedding_field="question_emb",
-                embedding_dim=384,
+                embedding_dim=profile.faq_embedding_dim,
                 duplicate_documents="skip",
                 similarity="cosine",
                 progress_bar=True,
             )
-            semantic: InMemoryDocumentStore = InMemoryDocumentStore(
+            semantic: ShardedDocumentStore = ShardedDocumentStore(
                 index=self.index,
                 use_gpu=self.use_gpu,
-                embedding_dim=768,
+                embedding_dim=profile.semantic_embedding_dim,
                 duplicate_documents="skip",
                 similarity="dot_product",
                 progress_bar=True,
             )
+            if WAL_DIR and profile is self.profile:
+                for kind, store in (("faq", faq), ("semantic", semantic)):
+                    model: str = getattr(profile, f"{kind}_retriever")
+                    store.open_log(
+                        directory=os.path.join(WAL_DIR, directory_name(kind, model)),
+                        model=model,
+                    )
             return faq, semantic
 
         except Exception as e:
             logger.critical(f"Unable to create document store: {e}")
             sys.exit(1)
 
-    def create_retriever(self) -> EmbeddingRetriever:
+    def create_embedding_retriever(
+        self, model: str, document_store: ShardedDocumentStore
+    ) -> EmbeddingRetriever:
         try:
-            faq: EmbeddingRetriever = EmbeddingRetriever(
-                embedding_model="sentence-transformers/all-MiniLM-L6-v2",
-                model_format="sentence_transformers",
-                document_store=self.faq_document_store,
-                use_gpu=self.use_gpu,
-                scale_score=False,
-                progress_bar=True,
-            )
-            semantic: EmbeddingRetriever = EmbeddingRetriever(
-                embedding_model="sentence-transformers/multi-qa-mpnet-base-dot-v1",
+            return EmbeddingRetriever(
+                embedding_model=model,
                 model_format="sentence_transformers",
-                document_store=self.semantic_document_store,
+                document_store=document_store,
                 use_gpu=self.use_gpu,
                 scale_score=False,
                 progress_bar=True,
             )
-
-            return faq, semantic
-
         except Exception as e:
             logger.critical(f"Unable to create retriever: {e}")
             sys.exit(1)
 
-    def create_reader(self) -> FARMReader:
+    def create_retriever(self) -> EmbeddingRetriever:
+        faq: EmbeddingRetriever = self.create_embedding_retriever(
+            model=self.profile.faq_retriever, document_store=self.faq_document_store
+        )
+        semantic: EmbeddingRetriever = self.create_embedding_retriever(
+            model=self.profile.semantic_retriever,
+            document_store=self.semantic_document_store,
+        )
+        return faq, semantic
+
+    def create_reader(self, profile: Optional[ModelProfile] = None) -> FARMReader:
         try:
             return FARMReader(
-                model_name_or_path="deepset/roberta-base-squad2",
+                model_name_or_path=(profile or self.profile).reader,
                 use_gpu=self.use_gpu,
                 max_seq_len=386,
                 doc_stride=128,
@@ -146,11 +511,14 @@ class Oracle:
             logger.critical(f"Unable to create reader: {e}")
             sys.exit(1)
 
-    def create_summarizer(self) -> TransformersSummarizer:
+    def create_summarizer(
+        self, profile: Optional[ModelProfile] = None
+    ) -> TransformersSummarizer:
+        model: str = (profile or self.profile).summarizer
         try:
             return TransformersSummarizer(
-                model_name_or_path="facebook/bart-large-cnn",
-                tokenizer="facebook/bart-large-cnn",
+                model_name_or_path=model,
+                tokenizer=model,
                 max_length=250,
                 min_length=30,
                 use_gpu=self.use_gpu,
@@ -160,36 +528,260 @@ class Oracle:
             logger.critical(f"Unable to create summarizer: {e}")
             sys.exit(1)
 
-    def create_document_merger(self) -> DocumentMerger:
-        try:
-            return DocumentMerger(separator=" ")
-        except Exception as e:
-            logger.critical(f"Unable to create document merger: {e}")
-            sys.exit(1)
+    def load_profile(self, profile: ModelProfile) -> Optional[ModelTier]:
+        """Loads the models of ``profile`` that no loaded tier has yet.
 
-    def create_span_summarizer_pipeline(self) -> Pipeline:
-        try:
-            pipeline: Pipeline = Pipeline()
-            pipeline.add_node(
-                component=self.semantic_retriever, name="Retriever", inputs=["Query"]
+        A profile whose retriever is new gets its own stores, which hold copies of the
+        default profile's documents embedded with that retriever. The profile is
+        dropped if the models of all tiers would exceed ``MODEL_MEMORY_BUDGET``.
+        """
+        tiers: List[ModelTier] = list(self.tiers.values())
+
+        def sharing(model: str) -> Optional[ModelTier]:
+            return next(
+                (
+                    tier
+                    for tier in tiers
+                    if getattr(tier.profile, model) == getattr(profile, model)
+                ),
+                None,
             )
-            pipeline.add_node(
-                component=self.document_merger,
-                name="DocumentMerger",
-                inputs=["Retriever"],
+
+        faq, semantic = sharing("faq_retriever"), sharing("semantic_retriever")
+        reader, summarizer = sharing("reader"), sharing("summarizer")
+        stores: Optional[Tuple[ShardedDocumentStore, ShardedDocumentStore]] = None
+        if faq is None or semantic is None:
+            stores = self.create_document_store(profile=profile)
+
+        faq_store = faq.faq_document_store if faq else stores[0]
+        faq_retriever = (
+            faq.faq_retriever
+            if faq
+            else self.create_embedding_retriever(profile.faq_retriever, faq_store)
+        )
+        semantic_store = semantic.semantic_document_store if semantic else stores[1]
+        semantic_retriever = (
+            semantic.semantic_retriever
+            if semantic
+            else self.create_embedding_retriever(
+                profile.semantic_retriever, semantic_store
             )
-            pipeline.add_node(
-                component=self.summarizer, name="Summarizer", inputs=["DocumentMerger"]
+        )
+        if reader:
+            reader_fields: dict = {
+                name: getattr(reader, name) for name in READER_FIELDS
+            }
+        else:
+            model: FARMReader = self.create_reader(profile=profile)
+            reader_fields = {
+                "reader": model,
+                "sized_readers": {},
+                "sized_readers_lock": threading.Lock(),
+                "reader_max_seq_len": model.max_seq_len,
+                "reader_doc_stride": model.inferencer.processor.doc_stride,
+                "reader_metrics": f"reader.{profile.name}",
+                "passage_cache": PassageCache(max_entries=PASSAGE_CACHE_SIZE),
+            }
+            if PASSAGE_CACHE_SIZE > 0:
+                reader_fields["passage_cache"].install(model.inferencer.processor)
+
+        tier = ModelTier(
+            profile=profile,
+            faq_document_store=faq_store,
+            semantic_document_store=semantic_store,
+            faq_retriever=faq_retriever,
+            semantic_retriever=semantic_retriever,
+            summarizer=(
+                summarizer.summarizer
+                if summarizer
+                else self.create_summarizer(profile=profile)
+            ),
+            summarizer_metrics=(
+                summarizer.summarizer_metrics
+                if summarizer
+                else f"summarizer.{profile.name}"
+            ),
+            faq_pipeline=FAQPipeline(retriever=faq_retriever),
+            document_search_pipeline=DocumentSearchPipeline(
+                retriever=semantic_retriever
+            ),
+            **reader_fields,
+        )
+
+        total: int = model_bytes(
+            module for loaded in tiers + [tier] for module in loaded.modules().values()
+        )
+        if MODEL_MEMORY_BUDGET and total > MODEL_MEMORY_BUDGET:
+            logger.error(
+                f"Not loading profile '{profile.name}': its models would bring the "
+                f"total to {total} bytes, over the {MODEL_MEMORY_BUDGET} byte budget."
             )
+            return None
 
-            return pipeline
+        for kind, store, shared in (
+            ("faq", faq_store, faq),
+            ("semantic", semantic_store, semantic),
+        ):
+            if shared:
+                continue
+            if WAL_DIR:
+                model: str = getattr(profile, f"{kind}_retriever")
+                store.open_log(
+                    directory=os.path.join(WAL_DIR, directory_name(kind, model)),
+                    model=model,
+                )
+            if kind == "semantic":
+                self._listen(store)
+        self.tiers[profile.name] = tier
+        metrics.set(f"profile.{profile.name}.model_bytes", total)
+        return tier
+
+    def _mirrors(
+        self, is_faq: bool
+    ) -> List[Tuple[ShardedDocumentStore, EmbeddingRetriever]]:
+        """Stores of other profiles' retrievers, with the retriever that embeds them."""
+        source = self.faq_document_store if is_faq else self.semantic_document_store
+        mirrors: Dict[int, Tuple[ShardedDocumentStore, EmbeddingRetriever]] = {}
+        for tier in self.tiers.values():
+            store = tier.faq_document_store if is_faq else tier.semantic_document_store
+            if store is not source:
+                mirrors[id(store)] = (
+                    store,
+                    tier.faq_retriever if is_faq else tier.semantic_retriever,
+                )
+        return list(mirrors.values())
+
+    def sync_profiles(
+        self, index: Optional[str] = None, is_faq: Optional[bool] = None
+    ) -> int:
+        """Copies documents of the default profile's stores that other profiles' stores
+        lack, and embeds them with those profiles' retrievers.
+
+        ``index`` and ``is_faq`` default to every index of both stores.
+        """
+        count: int = 0
+        for faq in (True, False) if is_faq is None else (is_faq,):
+            source = self.faq_document_store if faq else self.semantic_document_store
+            for store, retriever in self._mirrors(is_faq=faq):
+                for name in [index] if index else source.logical_indexes():
+                    documents: List[Document] = source.get_all_documents(
+                        index=name, return_embedding=False
+                    )
+                    present = {
+                        document.id
+                        for document in store.get_documents_by_id(
+                            ids=[document.id for document in documents], index=name
+                        )
+                    }
+                    missing = [d for d in documents if d.id not in present]
+                    if not missing:
+                        continue
+                    store.write_documents(
+                        missing, index=name, duplicate_documents="skip"
+                    )
+                    self.embed_documents(store=store, retriever=retriever, index=name)
+                    count += len(missing)
+        return count
+
+    def embed_documents(
+        self,
+        store: ShardedDocumentStore,
+        retriever: EmbeddingRetriever,
+        index: str,
+        update_existing_embeddings: bool = False,
+        resume: bool = False,
+        progress: Callable[..., None] = lambda phase, chunks=0: None,
+    ) -> dict:
+        """Embeds the documents of ``index`` that lack embeddings, or all of them.
+
+        At least ``MIN_PARALLEL_EMBEDDING`` pending chunks on CPU are split across
+        ``EMBEDDING_WORKERS`` processes; either way batches are written back as they
+        are embedded, in id order. With ``resume`` a reindex skips the batches an
+        interrupted run already wrote. Linked near-duplicates are never embedded.
+        """
+        documents: List[Document] = [
+            document
+            for document in store.get_all_documents(index=index, return_embedding=True)
+            if (update_existing_embeddings or document.embedding is None)
+            and not document.meta.get("duplicate_of")
+        ]
+        kind: str = "faq" if store is self.faq_document_store else "semantic"
+        checkpoint = ReindexCheckpoint(
+            directory=EMBEDDING_CHECKPOINT_DIR if update_existing_embeddings else None,
+            name=f"{directory_name(kind, retriever.embedding_model)}-{index}",
+            model=retriever.embedding_model,
+        )
+        documents.sort(key=lambda document: document.id)
+        after: Optional[str] = checkpoint.load() if resume else None
+        if after is not None:
+            documents = [document for document in documents if document.id > after]
+            logger.info(f"Resuming reindex of '{index}' after document {after}")
+
+        embedder: Optional[BulkEmbedder] = (
+            BulkEmbedder(
+                settings=retriever_settings(retriever), workers=EMBEDDING_WORKERS
+            )
+            if EMBEDDING_WORKERS > 1
+            and not is_available()
+            and len(documents) >= MIN_PARALLEL_EMBEDDING
+            else None
+        )
+        started: float = time.perf_counter()
+        try:
+            batches = (
+                embedder.embed(documents)
+                if embedder is not None
+                else (
+                    (batch, retriever.embed_documents(batch))
+                    for batch in batched(documents, EMBEDDING_BATCH)
+                )
+            )
+            for batch, embeddings in batches:
+                store.write_embeddings(
+                    index=index,
+                    ids=[document.id for document in batch],
+                    embeddings=embeddings,
+                )
+                checkpoint.save(after=batch[-1].id)
+                progress("embedded", len(batch))
+        finally:
+            if embedder is not None:
+                embedder.close()
+        checkpoint.clear()
+
+        seconds: float = time.perf_counter() - started
+        report: dict = (
+            embedder.report()
+            if embedder is not None
+            else {
+                "workers": 1,
+                "threads_per_worker": None,
+                "chunks": len(documents),
+                "seconds": seconds,
+                "chunks_per_second": len(documents) / seconds if seconds else 0.0,
+                "core_utilization": None,
+            }
+        )
+        if store is self.semantic_document_store:
+            self.deduplicator.observe_embedding(report["chunks"], report["seconds"])
+        if documents:
+            logger.debug(
+                f"Embedded {report['chunks']} chunks of '{index}' at "
+                f"{report['chunks_per_second']:.1f} chunks/s on {report['workers']} "
+                f"worker(s)"
+            )
+        return report
+
+    def create_document_merger(self) -> DocumentMerger:
+        try:
+            return DocumentMerger(separator=" ")
         except Exception as e:
-            logger.critical(f"Unable to create span summarizer pipeline: {e}")
+            logger.critical(f"Unable to create document merger: {e}")
             sys.exit(1)
 
     def create_preprocessor(self) -> PreProcessor:
         try:
-            return PreProcessor(
+            return FastPreProcessor(
                 clean_empty_lines=True,
                 clean_whitespace=True,
                 clean_header_footer=True,
@@ -286,10 +878,15 @@ class Oracle:
     def create_indexing_pipeline(self) -> Pipeline:
         try:
             pipeline: Pipeline = self.create_base_document_pipeline()
+            pipeline.add_node(
+                component=NearDuplicateFilter(deduplicator=self.deduplicator),
+                name="NearDuplicateFilter",
+                inputs=["PreProcessor"],
+            )
             pipeline.add_node(
                 component=self.semantic_document_store,
                 name="DocumentStore",
-                inputs=["PreProcessor"],
+                inputs=["NearDuplicateFilter"],
             )
             return pipeline
         except Exception as e:
@@ -320,6 +917,32 @@ class Oracle:
         ),
         filename: Union[str, None] = None,
         index: str = os.environ.get("INDEX", "document"),
+        progress: Callable[..., None] = lambda phase, chunks=0: None,
+        **kwargs,
+    ) -> None:
+        """Indexes one file. ``progress(phase, chunks)`` is called as each phase starts
+        and with the number of chunks embedded; it may raise to abort indexing.
+
+        The new documents are then embedded for every profile with its own retriever.
+        """
+        self._index_file(
+            filepath_or_buffer=filepath_or_buffer,
+            filename=filename,
+            index=index,
+            progress=progress,
+            **kwargs,
+        )
+        is_faq: bool = kwargs.get("is_faq", os.environ.get("IS_FAQ") == "True")
+        if filepath_or_buffer and self._mirrors(is_faq=is_faq):
+            progress("mirroring")
+            self.sync_profiles(index=index, is_faq=is_faq)
+
+    def _index_file(
+        self,
+        filepath_or_buffer: Union[SpooledTemporaryFile, str],
+        filename: Union[str, None],
+        index: str,
+        progress: Callable[..., None],
         **kwargs,
     ) -> None:
         is_faq = os.environ.get("IS_FAQ") == "True"
@@ -340,18 +963,44 @@ class Oracle:
             kwargs["sheet_name"] = SHEET_NAME
 
             if filepath_or_buffer is not None:
+                progress("reading")
+                path, _ = FileHandler.read_documents(
+                    filepath_or_buffer=filepath_or_buffer, filename=filename
+                )
+                if path.lower().endswith(".xlsx"):
+                    try:
+                        self.index_faq_xlsx(
+                            path=path,
+                            sheet_name=SHEET_NAME,
+                            index=index,
+                            progress=progress,
+                        )
+                    finally:
+                        FileHandler.file_clean_up(path=path)
+                    return
+                if is_columnar(path):
+                    try:
+                        self.index_faq_columnar(
+                            path=path, index=index, progress=progress
+                        )
+                    finally:
+                        FileHandler.file_clean_up(path=path)
+                    return
+
                 df: pd.DataFrame = FileHandler.read_faq(
-                    filepath_or_buffer=filepath_or_buffer, filename=filename, **kwargs
+                    filepath_or_buffer=path, filename=filename, **kwargs
                 )
 
                 logger.debug("Indexing documents...")
 
+                progress("embedding")
                 questions = list(df["question"].values)
                 df["question_emb"] = self.faq_retriever.embed_queries(
                     queries=questions
                 ).tolist()
                 df = df.rename(columns={"question": "content"})
 
+                progress("writing", len(questions))
                 try:
                     docs_to_index = df.to_dict(orient="records")
                     self.faq_document_store.write_documents(
@@ -361,44 +1010,482 @@ class Oracle:
                 except Exception as e:
                     logger.warning(f"Unable to write documents to document store: {e}")
         elif not kwargs.get("is_faq", is_faq) and filepath_or_buffer:
+            progress("converting")
             path, meta = FileHandler.read_documents(
                 filepath_or_buffer=filepath_or_buffer,
                 filename=filename,
             )
-            self.indexing_pipeline.run(file_paths=[path], meta=[meta])
+            if path.lower().endswith(".pdf"):
+                try:
+                    self.index_pdf(path=path, meta=meta, index=index, progress=progress)
+                finally:
+                    FileHandler.file_clean_up(path=path)
+                return
+
+            self.indexing_pipeline.run(
+                file_paths=[path],
+                meta=[meta],
+                params={
+                    "NearDuplicateFilter": {"index": index},
+                    "DocumentStore": {"index": index},
+                },
+            )
 
             FileHandler.file_clean_up(path=path)
 
-            self.semantic_document_store.update_embeddings(
+            progress("embedding")
+            self.embed_documents(
+                store=self.semantic_document_store,
                 retriever=self.semantic_retriever,
                 index=index,
-                update_existing_embeddings=False,
+                progress=progress,
             )
 
-    def upload_documents(
+    def index_faq_xlsx(
         self,
-        files: List[UploadFile],
+        path: str,
+        sheet_name: Optional[List[str]] = None,
         index: str = os.environ.get("INDEX", "document"),
-        **kwargs,
-    ) -> dict:
-        for file in files:
+        progress: Callable[..., None] = lambda phase, chunks=0: None,
+    ) -> None:
+        """Indexes the question/answer columns of a workbook sheet by sheet, in chunks.
+
+        Sheets are parsed in worker processes while earlier ones are embedded, so
+        memory depends on the sheet and chunk size rather than the workbook size.
+        """
+        for sheet, records in iter_sheets(path=path, sheet_name=sheet_name):
+            records = [record for record in records if record["question"] is not None]
+            for start in range(0, len(records), FAQ_EMBEDDING_BATCH):
+                chunk = records[start : start + FAQ_EMBEDDING_BATCH]
+                progress("embedding")
+                questions: List[str] = [str(record["question"]) for record in chunk]
+                embeddings = self.faq_retriever.embed_queries(queries=questions)
+
+                progress("writing", len(chunk))
+                try:
+                    self.faq_document_store.write_documents(
+                        [
+                            {
+                                "content": question,
+                                "answer": record["answer"],
+                                "sheet": sheet,
+                                "question_emb": embedding,
+                            }
+                            for question, record, embedding in zip(
+                                questions, chunk, embeddings
+                            )
+                        ],
+                        duplicate_documents="skip",
+                        index=index,
+                    )
+                except Exception as e:
+                    logger.warning(f"Unable to write documents to document store: {e}")
+            logger.debug(f"Indexed {len(records)} questions from sheet '{sheet}'")
+
+    def index_faq_columnar(
+        self,
+        path: str,
+        index: str = os.environ.get("INDEX", "document"),
+        progress: Callable[..., None] = lambda phase, chunks=0: None,
+    ) -> None:
+        """Indexes a Parquet or Arrow file with ``question``, ``answer`` and meta columns.
+
+        A fixed-size-list ``question_emb`` column tagged with the FAQ retriever's model
+        is stored as is, straight from the memory-mapped file; otherwise the questions
+        are embedded in chunks.
+        """
+        table = read_table(path)
+        if "question" not in table.column_names:
+            raise ValueError(f"{path} has no 'question' column.")
+        embeddings = precomputed_embeddings(
+            table,
+            dimension=self.faq_document_store.embedding_dim,
+            model=self.faq_retriever.embedding_model,
+        )
+        if embeddings is not None:
+            logger.debug(f"Reusing precomputed embeddings from {path}")
+        meta_columns: List[str] = [
+            name
+            for name in table.column_names
+            if name not in ("question", EMBEDDING_COLUMN)
+        ]
+
+        for start in range(0, table.num_rows, FAQ_EMBEDDING_BATCH):
+            batch = table.slice(start, FAQ_EMBEDDING_BATCH)
+            questions: List[str] = batch.column("question").to_pylist()
+            records: List[dict] = (
+                batch.select(meta_columns).to_pylist()
+                if meta_columns
+                else [{} for _ in questions]
+            )
+            if embeddings is None:
+                progress("embedding")
+                batch_embeddings = self.faq_retriever.embed_queries(queries=questions)
+            else:
+                batch_embeddings = embeddings[start : start + len(questions)]
+
+            progress("writing", len(questions))
             try:
-                self.index_documents(
-                    filepath_or_buffer=file.file,
-                    filename=file.filename,
+                self.faq_document_store.write_documents(
+                    [
+                        {**record, "content": question, "question_emb": embedding}
+                        for question, record, embedding in zip(
+                            questions, records, batch_embeddings
+                        )
+                        if question is not None
+                    ],
+                    duplicate_documents="skip",
                     index=index,
-                    **kwargs,
                 )
+            except Exception as e:
+                logger.warning(f"Unable to write documents to document store: {e}")
+
+    def index_pdf(
+        self,
+        path: str,
+        meta: dict,
+        index: str = os.environ.get("INDEX", "document"),
+        progress: Callable[..., None] = lambda phase, chunks=0: None,
+    ) -> None:
+        """Extracts page batches in parallel and preprocesses, embeds and writes each
+        batch as soon as it is ready, keeping page numbers in ``meta["page"]``."""
+        meta = {key: value for key, value in meta.items() if isinstance(value, str)}
+        for first_page, pages in iter_page_batches(path=path):
+            progress("preprocessing")
+            # Headers and footers are only detectable across pages, so they are
+            # removed per batch before the pages are split up.
+            pages = remove_header_footer(pages)
+
+            documents: List[Document] = [
+                Document(content=text, meta={**meta, "page": first_page + offset})
+                for offset, text in enumerate(pages)
+                if text.strip()
+            ]
+            if not documents:
+                continue
+            chunks: List[Document] = self.deduplicator.filter(
+                self.preprocessor.process(documents, clean_header_footer=False),
+                index=index,
+            )
+            distinct: List[Document] = [
+                chunk for chunk in chunks if not chunk.meta.get("duplicate_of")
+            ]
+
+            progress("embedding")
+            if distinct:
+                embeddings = self.semantic_retriever.embed_documents(documents=distinct)
+                for chunk, embedding in zip(distinct, embeddings):
+                    chunk.embedding = embedding
+            self.semantic_document_store.write_documents(
+                documents=chunks, index=index, duplicate_documents="skip"
+            )
+            progress("embedded", len(distinct))
+
+    def get_documents(
+        self,
+        index: str = os.environ.get("INDEX", "document"),
+        is_faq: bool = False,
+        filters: Optional[dict] = None,
+        cursor: Optional[str] = None,
+        page_size: Optional[int] = None,
+        return_embedding: bool = False,
+    ) -> Tuple[Iterator[Document], Optional[str]]:
+        """Returns a lazy page of documents and the cursor of the next page."""
+        store: ShardedDocumentStore = (
+            self.faq_document_store if is_faq else self.semantic_document_store
+        )
+        documents = store.get_documents_after(
+            index=index,
+            filters=filters,
+            return_embedding=return_embedding,
+            after=decode_cursor(cursor),
+        )
+        return paginate(documents=documents, page_size=page_size)
+
+    def delete_documents(
+        self,
+        ids: List[str],
+        index: str = os.environ.get("INDEX", "document"),
+        is_faq: bool = False,
+    ) -> dict:
+        if is_faq:
+            self.faq_document_store.delete_documents(index=index, ids=ids)
+            self.embed_documents(
+                store=self.faq_document_store, retriever=self.faq_retriever, index=index
+            )
+        else:
+            self.semantic_document_store.delete_documents(index=index, ids=ids)
+            self.deduplicator.forget(index)
+            self.deduplicator.promote(
+                document_store=self.semantic_document_store, index=index, ids=ids
+            )
+            self.embed_documents(
+                store=self.semantic_document_store,
+                retriever=self.semantic_retriever,
+                index=index,
+            )
+        for store, retriever in self._mirrors(is_faq=is_faq):
+            store.delete_documents(index=index, ids=ids)
+            if not is_faq:
+                self.deduplicator.promote(document_store=store, index=index, ids=ids)
+                self.embed_documents(store=store, retriever=retriever, index=index)
+        return {"message": f"Successfully deleted: {ids}"}
+
+    def delete_index(
+        self, index: str = os.environ.get("INDEX", "document"), is_faq: bool = False
+    ) -> dict:
+        if is_faq:
+            self.faq_document_store.delete_index(index=index)
+        else:
+            self.semantic_document_store.delete_index(index=index)
+            self.deduplicator.forget(index)
+        for store, _ in self._mirrors(is_faq=is_faq):
+            store.delete_index(index=index)
+        return {"message": f"Successfully deleted '{index}' index."}
+
+    def rebalance_index(
+        self,
+        shards: int,
+        index: str = os.environ.get("INDEX", "document"),
+        is_faq: bool = False,
+    ) -> dict:
+        store: ShardedDocumentStore = (
+            self.faq_document_store if is_faq else self.semantic_document_store
+        )
+        count: int = store.rebalance(index=index, shards=shards)
+        for mirror, _ in self._mirrors(is_faq=is_faq):
+            mirror.rebalance(index=index, shards=shards)
+        return {
+            "message": f"Rebalanced {count} documents in '{index}' across {shards} shard(s)."
+        }
+
+    def reindex(
+        self,
+        index: str = os.environ.get("INDEX", "document"),
+        is_faq: bool = False,
+        profile: Optional[str] = None,
+        resume: bool = True,
+    ) -> dict:
+        """Re-embeds every document of ``index`` with a profile's retriever.
+
+        An interrupted reindex resumes where it stopped unless ``resume`` is off.
+        """
+        tier: ModelTier = self.tiers.get(profile or self.profile.name)
+        if tier is None:
+            raise ValueError(f"Unknown model profile: {profile}")
+        store: ShardedDocumentStore = (
+            tier.faq_document_store if is_faq else tier.semantic_document_store
+        )
+        if not store.has_index(index):
+            raise ValueError(f"Index '{index}' does not exist.")
+        report: dict = self.embed_documents(
+            store=store,
+            retriever=tier.faq_retriever if is_faq else tier.semantic_retriever,
+            index=index,
+            update_existing_embeddings=True,
+            resume=resume,
+        )
+        return {
+            "message": f"Re-embedded {report['chunks']} documents in '{index}'.",
+            **report,
+        }
+
+    def export_index(
+        self,
+        fileobj: IO[bytes],
+        index: str = os.environ.get("INDEX", "document"),
+        is_faq: bool = False,
+    ) -> int:
+        """Writes an index and its embeddings to ``fileobj`` as an archive."""
+        store: ShardedDocumentStore = (
+            self.faq_document_store if is_faq else self.semantic_document_store
+        )
+        retriever: EmbeddingRetriever = (
+            self.faq_retriever if is_faq else self.semantic_retriever
+        )
+        count: int = export_archive(
+            documents=store.get_all_documents(index=index, return_embedding=True),
+            fileobj=fileobj,
+            index=index,
+            dimension=store.embedding_dim,
+            model=retriever.embedding_model,
+            similarity=store.similarity,
+        )
+        logger.debug(f"Exported {count} documents from '{index}'")
+        return count
+
+    def import_index(
+        self,
+        fileobj: IO[bytes],
+        index: str = os.environ.get("INDEX", "document"),
+        is_faq: bool = False,
+        duplicate_documents: str = "skip",
+    ) -> dict:
+        """Bulk-loads an archive written by ``export_index`` without calling the default
+        profile's models; only profiles with their own retriever embed the documents."""
+        store: ShardedDocumentStore = (
+            self.faq_document_store if is_faq else self.semantic_document_store
+        )
+        retriever: EmbeddingRetriever = (
+            self.faq_retriever if is_faq else self.semantic_retriever
+        )
+        count: int = 0
+        for batch in read_archive(
+            fileobj=fileobj,
+            dimension=store.embedding_dim,
+            model=retriever.embedding_model,
+            similarity=store.similarity,
+        ):
+            store.write_documents(
+                batch, index=index, duplicate_documents=duplicate_documents
+            )
+            count += len(batch)
+        if not is_faq:
+            self.deduplicator.forget(index)
+        if self._mirrors(is_faq=is_faq):
+            self.sync_profiles(index=index, is_faq=is_faq)
+        logger.debug(f"Imported {count} documents into '{index}'")
+        return {
+            "message": f"Imported {count} documents into '{index}'.",
+            "documents": count,
+        }
+
+    def deduplication(self) -> dict:
+        """Near-duplicate chunks found per index and what leaving them out saved."""
+        return self.deduplicator.report()
+
+    def _prefix(self, tier: ModelTier) -> str:
+        return "" if tier.profile is self.profile else f"{tier.profile.name}."
+
+    def models(self) -> Dict[str, object]:
+        """Torch modules behind each loaded model, for memory accounting.
+
+        Models of other profiles are prefixed with the profile name; models shared
+        between profiles are listed once.
+        """
+        modules: Dict[str, object] = {}
+        listed: set = set()
+        for tier in self.tiers.values():
+            components: Dict[str, object] = tier.components()
+            for name, module in tier.modules().items():
+                if id(components[name]) not in listed:
+                    listed.add(id(components[name]))
+                    modules[self._prefix(tier) + name] = module
+        return modules
+
+    def memory_usage(self) -> dict:
+        """Resident bytes of the process, each store and index, and each model."""
+        stores: Dict[str, dict] = {}
+        listed: set = set()
+        for tier in self.tiers.values():
+            for kind, store in (
+                ("faq", tier.faq_document_store),
+                ("semantic", tier.semantic_document_store),
+            ):
+                if id(store) not in listed:
+                    listed.add(id(store))
+                    name: str = (
+                        kind
+                        if tier.profile is self.profile
+                        else f"{kind}.{tier.profile.name}"
+                    )
+                    stores[name] = store.memory_usage()
+        return {
+            "rss_bytes": psutil.Process().memory_info().rss,
+            "stores": stores,
+            "models": {
+                name: module_memory(module) for name, module in self.models().items()
+            },
+        }
+
+    def profiles(self) -> dict:
+        """Models, memory and per-endpoint latency of every loaded profile."""
+        return {
+            "default": self.profile.name,
+            "budget_bytes": MODEL_MEMORY_BUDGET,
+            "model_bytes": model_bytes(self.models().values()),
+            "profiles": {name: tier.describe() for name, tier in self.tiers.items()},
+        }
+
+    def resolve_tier(self, params: dict) -> ModelTier:
+        """Tier of the profile ``params`` names, or of the default profile."""
+        return self.tiers.get(requested_profile(params), self.tiers[self.profile.name])
+
+    def _tier(self, params: dict) -> ModelTier:
+        """Pops the ``Profile`` parameters and returns the tier they select."""
+        name: Optional[str] = requested_profile(params)
+        params.pop("Profile", None)
+        if name is not None and name not in self.tiers:
+            logger.warning(
+                f"Model profile '{name}' is not loaded, using '{self.profile.name}'."
+            )
+            metrics.increment("profile.unavailable")
+        return self.tiers.get(name, self.tiers[self.profile.name])
+
+    @contextmanager
+    def _profiled(self, tier: ModelTier, endpoint: str) -> Iterator[None]:
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - started
+            tier.observe(endpoint, elapsed)
+            metrics.observe(f"profile.{tier.profile.name}.{endpoint}.seconds", elapsed)
 
-            except Exception as exc:
-                logger.error(f"Unable to upload {file.filename}: {exc}")
-                return {"message": f"Unable to upload {file.filename}"}
+    def generation(self, index: Union[str, List[str]], is_faq: bool = False) -> int:
+        store: ShardedDocumentStore = (
+            self.faq_document_store if is_faq else self.semantic_document_store
+        )
+        return store.generation(index=index)
+
+    def response_generation(self, endpoint: str, params: dict) -> List[int]:
+        """Generations of every index a response of ``endpoint`` is read from."""
+        index = params.get("Retriever", {}).get("index", self.index)
+        tier: ModelTier = self.resolve_tier(params)
+        stores: Tuple[ShardedDocumentStore, ...] = {
+            "faq-search": (tier.faq_document_store,),
+            "ask": (tier.faq_document_store, tier.semantic_document_store),
+        }.get(endpoint, (tier.semantic_document_store,))
+        return [store.generation(index=index) for store in stores]
+
+    def _semantic_cached(
+        self,
+        endpoint: str,
+        query: str,
+        params: dict,
+        run: Callable[[], dict],
+        tier: ModelTier,
+    ) -> dict:
+        """Serves ``run`` from the semantic cache when a paraphrase was already answered."""
+        if self.semantic_cache.max_entries <= 0:
+            return run()
+
+        store: ShardedDocumentStore = tier.semantic_document_store
+        index: str = params.get("Retriever", {}).get("index", store.index)
+        key: tuple = (
+            endpoint,
+            tier.profile.name,
+            index,
+            json.dumps(params, sort_keys=True, default=str),
+        )
+        generation: int = store.generation(index=index)
+        try:
+            embedding = self.faq_retriever.embed_queries(queries=[query])[0]
+        except Exception as e:
+            logger.warning(f"Unable to embed query for semantic cache: {e}")
+            return run()
 
-            finally:
-                file.file.close()
+        cached = self.semantic_cache.get(key, generation, embedding)
+        if cached is not None:
+            metrics.increment(f"semantic_cache.{endpoint}.hits")
+            cached["query"] = query
+            return cached
 
-        logger.debug(f"Successfully uploaded {[file.filename for file in files]}")
-        return {"message": f"Successfully uploaded {[file.filename for file in files]}"}
+        metrics.increment(f"semantic_cache.{endpoint}.misses")
+        result = run()
+        if result and not result.get("degraded"):
+            self.semantic_cache.put(key, generation, embedding, result)
+        return result
 
     def faq_search(
         self,
@@ -407,11 +1494,150 @@ class Oracle:
             "Retriever": {"top_k": 3, "index": os.environ.get("INDEX", "document")}
         },
     ) -> Answer:
+        params = copy.deepcopy(params)
+        tier: ModelTier = self._tier(params)
         try:
-            return self.faq_pipeline.run(query=query, params=params, debug=False)
+            with self._profiled(tier, "faq_search"):
+                return tier.faq_pipeline.run(query=query, params=params, debug=False)
         except Exception as e:
             logger.error(f"Unable to perform faq searc: {e}")
 
+    @staticmethod
+    def _deadline(params: dict, deadline: Optional[Deadline]) -> Deadline:
+        """Pops the ``Deadline`` parameters and applies the tighter of the request budgets."""
+        timeout: Optional[float] = params.pop("Deadline", {}).get(
+            "timeout", REQUEST_TIMEOUT
+        )
+        return (deadline or Deadline()).shorten(timeout)
+
+    def _retrieve(
+        self, query: str, params: dict, deadline: Deadline, tier: ModelTier
+    ) -> List[Document]:
+        deadline.check()
+        return tier.semantic_retriever.retrieve(
+            query=query, **params.get("Retriever", {})
+        )
+
+    def _read(
+        self,
+        query: str,
+        documents: List[Document],
+        top_k: int,
+        deadline: Deadline,
+        tier: ModelTier,
+    ) -> List[Answer]:
+        """Runs the reader batch by batch, shrinking the passages to what the budget allows."""
+        seconds_per_passage: Optional[float] = metrics.mean(
+            f"{tier.reader_metrics}.seconds_per_passage"
+        )
+        if seconds_per_passage and documents:
+            affordable: int = int(deadline.remaining() / seconds_per_passage)
+            if affordable < len(documents):
+                documents = documents[: max(1, affordable)]
+                deadline.degraded = True
+
+        processor = tier.reader.inferencer.processor
+        # Question, passage and four special tokens; longer passages are windowed.
+        question_tokens: int = len(processor.tokenizer.tokenize(query)) + 4
+        lengths: List[int] = [
+            min(question_tokens + passage_tokens, tier.reader_max_seq_len)
+            for passage_tokens in tier.passage_cache.token_counts(
+                processor.tokenizer, documents
+            )
+        ]
+
+        answers: List[Answer] = []
+        batches = bucket_by_length(lengths, READER_BATCH_TOKENS, sort=BUCKET_BY_LENGTH)
+        for position, batch in enumerate(batches):
+            deadline.check()
+            if position and deadline.expired:
+                deadline.degraded = True
+                break
+            batch_lengths: List[int] = [lengths[i] for i in batch]
+            max_seq_len: int = min(
+                tier.reader_max_seq_len,
+                max(-(-max(batch_lengths) // 32) * 32, processor.max_query_length + 32),
+            )
+            started: float = time.perf_counter()
+            result = tier.sized_reader(max_seq_len).predict(
+                query=query, documents=[documents[i] for i in batch], top_k=top_k
+            )
+            elapsed: float = time.perf_counter() - started
+            answers.extend(result["answers"])
+            metrics.observe(
+                f"{tier.reader_metrics}.seconds_per_passage", elapsed / len(batch)
+            )
+            metrics.observe(
+                f"{tier.reader_metrics}.tokens_per_second",
+                sum(batch_lengths) / elapsed,
+            )
+            metrics.observe(
+                f"{tier.reader_metrics}.padding_ratio",
+                padding_ratio(batch_lengths, max_seq_len),
+            )
+        # Answers from every batch are ranked together, whatever order they ran in.
+        return sorted(answers, key=lambda answer: answer.score or 0.0, reverse=True)[
+            :top_k
+        ]
+
+    def _summarize(
+        self, documents: List[Document], deadline: Deadline, tier: ModelTier
+    ) -> List[Document]:
+        """Summarizes batch by batch; documents the budget does not cover stay unsummarized.
+
+        Documents are batched by token length and summaries are written back to each
+        document's meta, so the returned list keeps the retrieval order.
+        """
+        summarizer: TransformersSummarizer = tier.summarizer
+        pipeline = summarizer.summarizer
+        lengths: List[int] = [
+            min(
+                len(pipeline.tokenizer(document.content)["input_ids"]),
+                pipeline.tokenizer.model_max_length,
+            )
+            for document in documents
+        ]
+        batches = bucket_by_length(
+            lengths, SUMMARIZER_BATCH_TOKENS, sort=BUCKET_BY_LENGTH
+        )
+        for batch in batches:
+            deadline.check()
+            seconds_per_document: Optional[float] = metrics.mean(
+                f"{tier.summarizer_metrics}.seconds_per_document"
+            )
+            if not deadline.allows(
+                seconds_per_document and seconds_per_document * len(batch)
+            ):
+                deadline.degraded = True
+                break
+            batch_lengths: List[int] = [lengths[i] for i in batch]
+            started: float = time.perf_counter()
+            summaries = pipeline(
+                [documents[i].content for i in batch],
+                batch_size=len(batch),
+                min_length=summarizer.min_length,
+                max_length=summarizer.max_length,
+                return_text=True,
+                clean_up_tokenization_spaces=summarizer.clean_up_tokenization_spaces,
+                truncation=True,
+            )
+            elapsed: float = time.perf_counter() - started
+            for i, summary in zip(batch, summaries):
+                documents[i].meta["summary"] = summary["summary_text"]
+            metrics.observe(
+                f"{tier.summarizer_metrics}.seconds_per_document",
+                elapsed / len(batch),
+            )
+            metrics.observe(
+                f"{tier.summarizer_metrics}.tokens_per_second",
+                sum(batch_lengths) / elapsed,
+            )
+            metrics.observe(
+                f"{tier.summarizer_metrics}.padding_ratio",
+                padding_ratio(batch_lengths, max(batch_lengths)),
+            )
+        return documents
+
     def extractive_search(
         self,
         query: str,
@@ -419,12 +1645,123 @@ class Oracle:
             "Retriever": {"top_k": 3, "index": os.environ.get("INDEX", "document")},
             "Reader": {"top_k": 3},
         },
+        deadline: Optional[Deadline] = None,
     ) -> Answer:
+        params = copy.deepcopy(params)
+        deadline = self._deadline(params, deadline)
+        tier: ModelTier = self._tier(params)
+
+        def run() -> dict:
+            documents = self._retrieve(
+                query=query, params=params, deadline=deadline, tier=tier
+            )
+            answers = self._read(
+                query=query,
+                documents=documents,
+                top_k=params.get("Reader", {}).get("top_k", tier.reader.top_k),
+                deadline=deadline,
+                tier=tier,
+            )
+            return {"query": query, "answers": answers, "degraded": deadline.degraded}
+
         try:
-            return self.extractive_pipeline.run(query=query, params=params, debug=False)
+            with self._profiled(tier, "extractive_search"):
+                return self._semantic_cached(
+                    endpoint="extractive_search",
+                    query=query,
+                    params=params,
+                    run=run,
+                    tier=tier,
+                )
+        except RequestCancelled:
+            raise
         except Exception as e:
             logger.error(f"Unable to perform extractive search: {e}")
 
+    def ask(
+        self,
+        query: str,
+        params: dict = {
+            "Retriever": {"top_k": 3, "index": os.environ.get("INDEX", "document")}
+        },
+        deadline: Optional[Deadline] = None,
+    ) -> dict:
+        """Answer from the FAQ store when it is confident, otherwise fall back to extractive QA."""
+        params = copy.deepcopy(params)
+        deadline = self._deadline(params, deadline)
+        tier: ModelTier = self._tier(params)
+        with self._profiled(tier, "ask"):
+            return self._ask(query=query, params=params, deadline=deadline, tier=tier)
+
+    def _ask(
+        self, query: str, params: dict, deadline: Deadline, tier: ModelTier
+    ) -> dict:
+        profile: dict = {"name": tier.profile.name}
+        cascade: dict = params.pop("Cascade", {})
+        threshold: float = cascade.get("threshold", FAQ_CONFIDENCE_THRESHOLD)
+        retriever_params: dict = params.get("Retriever", {})
+        reader_params: dict = params.get("Reader", {})
+        metrics.increment("ask.requests")
+
+        faq_result = self.faq_search(
+            query=query, params={"Retriever": retriever_params, "Profile": profile}
+        )
+        faq_answers: List[Answer] = faq_result.get("answers", []) if faq_result else []
+        faq_score: float = faq_answers[0].score if faq_answers else -1.0
+
+        if faq_score >= threshold:
+            return self._record_tier(
+                tier="faq", query=query, answers=faq_answers, faq_score=faq_score
+            )
+
+        # Retriever.top_k sizes the FAQ lookup; Cascade.max_passages caps the
+        # extractive tier's passages.
+        passages, answers = ask_budget(
+            faq_score=faq_score,
+            threshold=threshold,
+            max_passages=cascade.get("max_passages", ASK_MAX_PASSAGES),
+            max_answers=reader_params.get("top_k", 3),
+        )
+
+        extractive_result = self.extractive_search(
+            query=query,
+            params={
+                "Retriever": {**retriever_params, "top_k": passages},
+                "Reader": {**reader_params, "top_k": answers},
+                "Profile": profile,
+            },
+            deadline=deadline,
+        )
+        return self._record_tier(
+            tier="extractive",
+            query=query,
+            answers=extractive_result.get("answers", []) if extractive_result else [],
+            faq_score=faq_score,
+            degraded=bool(extractive_result and extractive_result.get("degraded")),
+        )
+
+    @staticmethod
+    def _record_tier(
+        tier: str,
+        query: str,
+        answers: List[Answer],
+        faq_score: float,
+        degraded: bool = False,
+    ) -> dict:
+        hits = metrics.increment(f"ask.tier.{tier}")
+        requests = metrics.counter("ask.requests")
+        for name in ASK_TIERS:
+            count = hits if name == tier else metrics.counter(f"ask.tier.{name}")
+            metrics.set(f"ask.tier.{name}.hit_rate", count / requests)
+
+        return {
+            "query": query,
+            "answers": answers,
+            "tier": tier,
+            "faq_score": faq_score,
+            "degraded": degraded,
+        }
+
     def document_search(
         self,
         query: str,
@@ -432,10 +1769,13 @@ class Oracle:
             "Retriever": {"top_k": 3, "index": os.environ.get("INDEX", "document")}
         },
     ) -> Answer:
+        params = copy.deepcopy(params)
+        tier: ModelTier = self._tier(params)
         try:
-            return self.document_search_pipeline.run(
-                query=query, params=params, debug=False
-            )
+            with self._profiled(tier, "document_search"):
+                return tier.document_search_pipeline.run(
+                    query=query, params=params, debug=False
+                )
         except Exception as e:
             logger.error(f"Unable to perform query: {e}")
 
@@ -445,11 +1785,37 @@ class Oracle:
         params: dict = {
             "Retriever": {"top_k": 5, "index": os.environ.get("INDEX", "document")}
         },
+        deadline: Optional[Deadline] = None,
     ):
-        try:
-            return self.search_summarization_pipeline.run(
-                query=query, params=params, debug=False
+        params = copy.deepcopy(params)
+        deadline = self._deadline(params, deadline)
+        tier: ModelTier = self._tier(params)
+
+        def run() -> dict:
+            documents = self._retrieve(
+                query=query, params=params, deadline=deadline, tier=tier
             )
+            return {
+                "query": query,
+                "documents": self._summarize(
+                    documents=documents, deadline=deadline, tier=tier
+                ),
+                "params": params,
+                "node_id": "Summarizer",
+                "degraded": deadline.degraded,
+            }
+
+        try:
+            with self._profiled(tier, "search_summarization"):
+                return self._semantic_cached(
+                    endpoint="search_summarization",
+                    query=query,
+                    params=params,
+                    run=run,
+                    tier=tier,
+                )
+        except RequestCancelled:
+            raise
         except Exception as e:
             logger.error(f"Unable to perform query: {e}")
 
@@ -459,11 +1825,29 @@ class Oracle:
         params: dict = {
             "Retriever": {"top_k": 5, "index": os.environ.get("INDEX", "document")}
         },
+        deadline: Optional[Deadline] = None,
     ):
+        params = copy.deepcopy(params)
+        deadline = self._deadline(params, deadline)
+        tier: ModelTier = self._tier(params)
         try:
-            return self.span_summarizer_pipeline.run(
-                query=query, params=params, debug=False
-            )
+            with self._profiled(tier, "search_span_summarization"):
+                documents = self._retrieve(
+                    query=query, params=params, deadline=deadline, tier=tier
+                )
+                if documents:
+                    documents = self.document_merger.merge(documents=documents)
+                return {
+                    "query": query,
+                    "documents": self._summarize(
+                        documents=documents, deadline=deadline, tier=tier
+                    ),
+                    "params": params,
+                    "node_id": "Summarizer",
+                    "degraded": deadline.degraded,
+                }
+        except RequestCancelled:
+            raise
         except Exception as e:
             logger.error(f"Unable to perform query: {e}")
 
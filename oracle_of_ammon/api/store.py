@@ -0,0 +1,919 @@
+import bisect
+import copy
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores import InMemoryDocumentStore
+from haystack.document_stores.filter_utils import LogicalFilterClause
+from haystack.errors import DuplicateDocumentError
+
+from oracle_of_ammon.api.utils.memory import documents_memory
+from oracle_of_ammon.api.utils.metaindex import (
+    METADATA_INDEX_FIELDS,
+    MetadataIndex,
+    parse_fields,
+    scale_scores,
+)
+from oracle_of_ammon.api.utils.stats import IndexStatistics
+from oracle_of_ammon.api.utils.wal import MutationLog, write_record, written_documents
+from oracle_of_ammon.utils.logger import configure_logger
+
+logger: logging.Logger = configure_logger()
+
+SHARD_SEPARATOR: str = "#"
+WAL_COMPACT_BYTES: int = int(os.environ.get("WAL_COMPACT_BYTES", 256 * 1024 * 1024))
+WAL_COMPACT_INTERVAL: float = float(os.environ.get("WAL_COMPACT_INTERVAL", 60))
+
+
+def parse_shard_counts(value: Union[str, None]) -> Dict[str, int]:
+    """Parses ``"index:shards,other:shards"`` into a mapping."""
+    shard_counts: Dict[str, int] = {}
+    if not value:
+        return shard_counts
+    for item in value.split(","):
+        try:
+            name, count = item.split(":")
+            shard_counts[name.strip()] = int(count)
+        except ValueError:
+            logger.warning(f"Ignoring malformed shard count: {item}")
+    return shard_counts
+
+
+class ShardedDocumentStore(InMemoryDocumentStore):
+    """In-memory document store that splits each index into shards by document id.
+
+    Shards are stored as ordinary indexes named ``<index>#<shard>`` and searched in
+    parallel; the per-shard top-k lists are merged into the global top-k. Every
+    ``index`` argument also accepts a list or comma-separated string of indexes so a
+    single query can fan out across several of them.
+
+    Each shard keeps a ``MetadataIndex``: filters are evaluated against inverted lists
+    of ``metadata_fields`` (``"*"`` for all) and scoring is one matrix product over the
+    matching rows.
+    """
+
+    def __init__(
+        self,
+        shards: int = int(os.environ.get("SHARDS", 1)),
+        shard_counts: Optional[Dict[str, int]] = None,
+        max_workers: Optional[int] = None,
+        metadata_fields: Union[str, Iterable[str], None] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.default_shards: int = max(1, shards)
+        self.shard_counts: Dict[str, int] = (
+            shard_counts
+            if shard_counts is not None
+            else parse_shard_counts(os.environ.get("INDEX_SHARDS"))
+        )
+        if metadata_fields is None or isinstance(metadata_fields, str):
+            self.metadata_fields: Optional[FrozenSet[str]] = parse_fields(
+                metadata_fields
+                if metadata_fields is not None
+                else METADATA_INDEX_FIELDS
+            )
+        else:
+            self.metadata_fields = frozenset(metadata_fields)
+        self.metadata: Dict[str, MetadataIndex] = {}
+        self.generations: Dict[str, int] = defaultdict(int)
+        # Sorted ids of each shard, all or matching a filter, and the generation
+        # they were sorted at. Only the latest filter of a shard is kept.
+        self._sorted_ids: Dict[Tuple[str, str], Tuple[int, List[str]]] = {}
+        self.statistics: Dict[str, IndexStatistics] = defaultdict(IndexStatistics)
+        self.listeners: List[Callable[[str], None]] = []
+        self.log: Optional[MutationLog] = None
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), thread_name_prefix="shard"
+        )
+
+    def resolve_indexes(self, index: Union[str, List[str], None]) -> List[str]:
+        if index is None:
+            return [self.index]
+        if isinstance(index, str):
+            return [name.strip() for name in index.split(",") if name.strip()]
+        return list(index)
+
+    def shard_count(self, index: str) -> int:
+        # Inherited methods call back into this class with physical shard names.
+        if SHARD_SEPARATOR in index:
+            return 1
+        return self.shard_counts.get(index, self.default_shards)
+
+    def shard_names(self, index: str) -> List[str]:
+        count = self.shard_count(index)
+        if count == 1:
+            return [index]
+        return [f"{index}{SHARD_SEPARATOR}{shard}" for shard in range(count)]
+
+    def shard_of(self, id: str, index: str) -> str:
+        return self.shard_names(index)[
+            zlib.crc32(id.encode("utf-8")) % self.shard_count(index)
+        ]
+
+    def _existing_shards(self, index: Union[str, List[str], None]) -> List[str]:
+        with self._lock:
+            return [
+                shard
+                for name in self.resolve_indexes(index)
+                for shard in self.shard_names(name)
+                if shard in self.indexes
+            ]
+
+    def _single_index(self, index: Union[str, List[str], None]) -> str:
+        indexes = self.resolve_indexes(index)
+        if len(indexes) != 1:
+            raise ValueError("Write operations expect exactly one index.")
+        return indexes[0]
+
+    def _metadata(self, shard: str) -> MetadataIndex:
+        if shard not in self.metadata:
+            self.metadata[shard] = MetadataIndex(fields=self.metadata_fields)
+        return self.metadata[shard]
+
+    def _invalidate_embeddings(self, index: str) -> None:
+        for shard in self.shard_names(index):
+            if shard in self.metadata:
+                self.metadata[shard].invalidate()
+
+    def has_index(self, index: str) -> bool:
+        return bool(self._existing_shards(index))
+
+    def generation(self, index: Union[str, List[str], None] = None) -> int:
+        """Monotonic counter bumped on every change; summed across multiple indexes."""
+        return sum(self.generations[name] for name in self.resolve_indexes(index))
+
+    def _changed(self, index: str) -> None:
+        self.generations[index] += 1
+        for listener in self.listeners:
+            try:
+                listener(index)
+            except Exception as e:
+                logger.warning(f"Document store listener failed: {e}")
+
+    def write_documents(
+        self,
+        documents: Union[List[dict], List[Document]],
+        index: Optional[str] = None,
+        batch_size: int = 10_000,
+        duplicate_documents: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        if headers:
+            raise NotImplementedError("InMemoryDocumentStore does not support headers.")
+        index = self._single_index(index)
+        duplicate_documents = duplicate_documents or self.duplicate_documents
+        field_map = self._create_document_field_map()
+        # Documents built from dicts are new objects and keep their embedding arrays
+        # as given, e.g. views of a memory-mapped file. Document objects are copied
+        # like InMemoryDocumentStore does.
+        document_objects = [
+            Document.from_dict(d, field_map=field_map)
+            if isinstance(d, dict)
+            else copy.deepcopy(d)
+            for d in documents
+        ]
+        by_shard: Dict[str, List[Document]] = defaultdict(list)
+        for document in document_objects:
+            by_shard[self.shard_of(document.id, index)].append(document)
+
+        with self._lock:
+            # Fail before anything is written, so a failed write is never logged.
+            if duplicate_documents == "fail":
+                for shard, shard_documents in by_shard.items():
+                    for document in shard_documents:
+                        if document.id in self.indexes.get(shard, {}):
+                            raise DuplicateDocumentError(
+                                f"Document with id '{document.id}' already exists in index '{index}'"
+                            )
+
+            # Only documents that will be stored are logged, ahead of storing them, so
+            # a record the log cannot encode leaves the store unchanged.
+            pending: Dict[str, List[Document]] = {}
+            for shard, shard_documents in by_shard.items():
+                stored: Dict[str, Document] = self.indexes.get(shard, {})
+                pending[shard] = [
+                    document
+                    for document in self._drop_duplicate_documents(
+                        documents=shard_documents
+                    )
+                    if duplicate_documents != "skip" or document.id not in stored
+                ]
+            written: List[Document] = [
+                document
+                for shard_documents in pending.values()
+                for document in shard_documents
+            ]
+            sequence = (
+                self._log(
+                    *write_record(
+                        written, index=index, duplicate_documents=duplicate_documents
+                    )
+                )
+                if written
+                else None
+            )
+
+            statistics = self.statistics[index]
+            for shard, shard_documents in pending.items():
+                before = {
+                    document.id: self.indexes.get(shard, {}).get(document.id)
+                    for document in shard_documents
+                }
+                self._write_shard(
+                    documents=shard_documents,
+                    shard=shard,
+                    duplicate_documents=duplicate_documents,
+                )
+                statistics.remove(old for old in before.values() if old is not None)
+                statistics.add(shard_documents)
+            self._changed(index)
+        self._wait(sequence)
+
+    def _write_shard(
+        self, documents: List[Document], shard: str, duplicate_documents: str
+    ) -> None:
+        stored: Dict[str, Document] = self.indexes[shard]
+        written: List[Document] = []
+        for document in self._drop_duplicate_documents(documents=documents):
+            if document.id in stored:
+                if duplicate_documents == "fail":
+                    raise DuplicateDocumentError(
+                        f"Document with id '{document.id}' already exists in index '{shard}'"
+                    )
+                if duplicate_documents == "skip":
+                    continue
+            stored[document.id] = document
+            written.append(document)
+        self._metadata(shard).add(written)
+        if self.use_bm25 and written:
+            self.update_bm25(index=shard)
+
+    def query_by_embedding(
+        self,
+        query_emb: np.ndarray,
+        filters: Optional[dict] = None,
+        top_k: int = 10,
+        index: Union[str, List[str], None] = None,
+        return_embedding: Optional[bool] = None,
+        headers: Optional[Dict[str, str]] = None,
+        scale_score: bool = True,
+    ) -> List[Document]:
+        if headers:
+            raise NotImplementedError("InMemoryDocumentStore does not support headers.")
+        if query_emb is None:
+            return []
+        shards = self._existing_shards(index)
+        query = partial(
+            self._query_shard,
+            query_emb=np.asarray(query_emb, dtype=np.float32).reshape(-1),
+            clause=LogicalFilterClause.parse(filters) if filters else None,
+            top_k=top_k,
+            return_embedding=(
+                self.return_embedding if return_embedding is None else return_embedding
+            ),
+            scale_score=scale_score,
+        )
+        if len(shards) <= 1:
+            return query(shard=shards[0]) if shards else []
+
+        futures = [self._executor.submit(query, shard=shard) for shard in shards]
+        return heapq.nlargest(
+            top_k,
+            itertools.chain.from_iterable(future.result() for future in futures),
+            key=lambda doc: doc.score if doc.score is not None else 0.0,
+        )
+
+    def _query_shard(
+        self,
+        shard: str,
+        query_emb: np.ndarray,
+        clause,
+        top_k: int,
+        return_embedding: bool,
+        scale_score: bool,
+    ) -> List[Document]:
+        """Scores the rows of ``shard`` that match ``clause`` as a single matrix product."""
+        with self._lock:
+            if shard not in self.metadata:
+                return []
+            metadata = self.metadata[shard]
+            documents, matrix, norms, mask = metadata.matrix()
+            if clause is not None:
+                mask = mask & metadata.mask(clause)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return []
+        if query_emb.shape[0] != matrix.shape[1]:
+            logger.warning(
+                f"Query embedding of size {query_emb.shape[0]} does not match the "
+                f"{matrix.shape[1]} dimensions of '{shard}'"
+            )
+            return []
+
+        # Selective filters score only their rows; broad ones skip the row copy.
+        if len(rows) == len(documents):
+            scores = matrix @ query_emb
+        elif len(rows) < len(documents) // 2:
+            scores = matrix[rows] @ query_emb
+        else:
+            scores = (matrix @ query_emb)[rows]
+        if self.similarity == "cosine":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = np.nan_to_num(
+                    scores / (norms[rows] * np.linalg.norm(query_emb))
+                )
+        if scale_score:
+            scores = scale_scores(scores, self.similarity)
+
+        if top_k < len(rows):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        results: List[Document] = []
+        for position in best:
+            document = copy.copy(documents[rows[position]])
+            document.meta = dict(document.meta)
+            document.score = float(scores[position])
+            if not return_embedding:
+                document.embedding = None
+            results.append(document)
+        return results
+
+    def get_all_documents_generator(
+        self,
+        index: Union[str, List[str], None] = None,
+        filters: Optional[dict] = None,
+        return_embedding: Optional[bool] = None,
+        batch_size: int = 10_000,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Generator[Document, None, None]:
+        """Lazily yields copies of the stored documents.
+
+        Unlike InMemoryDocumentStore, which deep-copies a whole index before yielding
+        the first document, memory use here does not grow with the index size.
+        """
+        if headers:
+            raise NotImplementedError("InMemoryDocumentStore does not support headers.")
+        if return_embedding is None:
+            return_embedding = self.return_embedding
+        clause = LogicalFilterClause.parse(filters) if filters else None
+
+        for shard in self._existing_shards(index):
+            documents: Iterable[Optional[Document]]
+            if clause is None:
+                stored: Dict[str, Document] = self.indexes[shard]
+                documents = (stored.get(id) for id in list(stored.keys()))
+            else:
+                with self._lock:
+                    metadata = self._metadata(shard)
+                    documents = [
+                        metadata.documents[row]
+                        for row in np.flatnonzero(metadata.mask(clause))
+                    ]
+            for document in documents:
+                if not isinstance(document, Document):
+                    continue
+                document = copy.copy(document)
+                document.meta = dict(document.meta)
+                if not return_embedding:
+                    document.embedding = None
+                yield document
+
+    def _ids_in_order(
+        self, shard: str, index: str, filters: Optional[dict] = None
+    ) -> List[str]:
+        # Called under the store lock; ids are sorted again only after a change.
+        key = (
+            shard,
+            json.dumps(filters, sort_keys=True, default=str) if filters else "",
+        )
+        generation: int = self.generations[index]
+        cached = self._sorted_ids.get(key)
+        if cached is None or cached[0] != generation:
+            if filters:
+                self._forget_sorted_ids(shard, filtered_only=True)
+                metadata = self._metadata(shard)
+                rows = np.flatnonzero(metadata.mask(LogicalFilterClause.parse(filters)))
+                ids = sorted(metadata.documents[row].id for row in rows)
+            else:
+                ids = sorted(self.indexes[shard].keys())
+            cached = (generation, ids)
+            self._sorted_ids[key] = cached
+        return cached[1]
+
+    def _forget_sorted_ids(self, shard: str, filtered_only: bool = False) -> None:
+        for key in [key for key in self._sorted_ids if key[0] == shard]:
+            if key[1] or not filtered_only:
+                del self._sorted_ids[key]
+
+    def get_documents_after(
+        self,
+        index: Union[str, List[str], None] = None,
+        filters: Optional[dict] = None,
+        return_embedding: Optional[bool] = None,
+        after: Optional[Tuple[str, str]] = None,
+        batch_size: int = 1_000,
+    ) -> Iterator[Tuple[str, Document]]:
+        """Lazily yields ``(shard, document)`` ordered by shard and id.
+
+        Iteration resumes after the ``(shard, id)`` of ``after``, which need not still
+        exist, so documents written or deleted between calls are neither repeated nor
+        skipped. Raises ValueError if the shard of ``after`` is gone.
+        """
+        if return_embedding is None:
+            return_embedding = self.return_embedding
+        shards: List[Tuple[str, str]] = [
+            (name, shard)
+            for name in self.resolve_indexes(index)
+            for shard in self.shard_names(name)
+        ]
+        start: int = 0
+        if after is not None:
+            positions = [
+                position
+                for position, (_, shard) in enumerate(shards)
+                if shard == after[0]
+            ]
+            if not positions:
+                raise ValueError("Invalid cursor.")
+            start = positions[0]
+
+        def documents() -> Iterator[Tuple[str, Document]]:
+            for position, (name, shard) in enumerate(shards[start:], start):
+                last: Optional[str] = after[1] if after and position == start else None
+                while True:
+                    with self._lock:
+                        if shard not in self.indexes:
+                            break
+                        # Filtered ids are matched once per change of the index, so
+                        # each page only costs a bisect into them.
+                        ids = self._ids_in_order(shard, name, filters)
+                        begin = 0 if last is None else bisect.bisect_right(ids, last)
+                        stored: Dict[str, Document] = self.indexes[shard]
+                        batch = [stored[id] for id in ids[begin : begin + batch_size]]
+                    if not batch:
+                        break
+                    for document in batch:
+                        document = copy.copy(document)
+                        document.meta = dict(document.meta)
+                        if not return_embedding:
+                            document.embedding = None
+                        yield shard, document
+                    last = batch[-1].id
+
+        return documents()
+
+    def get_all_documents(
+        self,
+        index: Union[str, List[str], None] = None,
+        filters: Optional[dict] = None,
+        return_embedding: Optional[bool] = None,
+        batch_size: int = 10_000,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> List[Document]:
+        return list(
+            self.get_all_documents_generator(
+                index=index,
+                filters=filters,
+                return_embedding=return_embedding,
+                batch_size=batch_size,
+                headers=headers,
+            )
+        )
+
+    def get_document_by_id(
+        self,
+        id: str,
+        index: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[Document]:
+        documents = self.get_documents_by_id(ids=[id], index=index, headers=headers)
+        return documents[0] if documents else None
+
+    def get_documents_by_id(
+        self,
+        ids: List[str],
+        index: Optional[str] = None,
+        batch_size: int = 10_000,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> List[Document]:
+        """Copies of the stored documents ``ids``; unknown ids are left out."""
+        documents: List[Document] = []
+        for document in self._stored_documents(ids=ids, index=index):
+            document = copy.copy(document)
+            document.meta = dict(document.meta)
+            documents.append(document)
+        return documents
+
+    def _stored_documents(
+        self, ids: List[str], index: Union[str, List[str], None]
+    ) -> List[Document]:
+        index = self._single_index(index)
+        by_shard: Dict[str, List[str]] = defaultdict(list)
+        for id in ids:
+            by_shard[self.shard_of(id, index)].append(id)
+
+        # InMemoryDocumentStore raises on unknown ids, so look them up directly.
+        return [
+            self.indexes[shard][id]
+            for shard, shard_ids in by_shard.items()
+            if shard in self.indexes
+            for id in shard_ids
+            if id in self.indexes[shard]
+        ]
+
+    def get_document_count(
+        self,
+        filters: Optional[dict] = None,
+        index: Union[str, List[str], None] = None,
+        only_documents_without_embedding: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> int:
+        return sum(
+            super(ShardedDocumentStore, self).get_document_count(
+                filters=filters,
+                index=shard,
+                only_documents_without_embedding=only_documents_without_embedding,
+                headers=headers,
+            )
+            for shard in self._existing_shards(index)
+        )
+
+    def get_embedding_count(
+        self,
+        index: Union[str, List[str], None] = None,
+        filters: Optional[dict] = None,
+    ) -> int:
+        return sum(
+            super(ShardedDocumentStore, self).get_embedding_count(
+                index=shard, filters=filters
+            )
+            for shard in self._existing_shards(index)
+        )
+
+    def update_embeddings(
+        self,
+        retriever,
+        index: Optional[str] = None,
+        filters: Optional[dict] = None,
+        update_existing_embeddings: bool = True,
+        batch_size: int = 10_000,
+    ):
+        index = self._single_index(index)
+        with self._lock:
+            before: Dict[str, Optional[np.ndarray]] = {
+                document.id: document.embedding
+                for shard in self._existing_shards(index)
+                for document in self.indexes[shard].values()
+            }
+            for shard in self._existing_shards(index):
+                super().update_embeddings(
+                    retriever=retriever,
+                    index=shard,
+                    filters=filters,
+                    update_existing_embeddings=update_existing_embeddings,
+                    batch_size=batch_size,
+                )
+            documents: List[Document] = [
+                document
+                for shard in self._existing_shards(index)
+                for document in self.indexes[shard].values()
+            ]
+            self._invalidate_embeddings(index)
+            self.statistics[index].set_embeddings(documents)
+            # Only embeddings whose values changed are logged.
+            changed: List[Document] = [
+                document
+                for document in documents
+                if document.embedding is not None
+                and document.embedding is not before.get(document.id)
+                and (
+                    before.get(document.id) is None
+                    or not np.array_equal(document.embedding, before[document.id])
+                )
+            ]
+            sequence = (
+                self._log(
+                    {
+                        "op": "embed",
+                        "index": index,
+                        "ids": [document.id for document in changed],
+                    },
+                    np.stack([document.embedding for document in changed]),
+                )
+                if changed
+                else None
+            )
+            self._changed(index)
+        self._wait(sequence)
+
+    def write_embeddings(
+        self, index: Optional[str], ids: List[str], embeddings: np.ndarray
+    ) -> int:
+        """Sets the embeddings of the documents ``ids``, e.g. from a bulk embedder.
+
+        Ids that are no longer stored are skipped; returns how many were set.
+        """
+        index = self._single_index(index)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape != (len(ids), self.embedding_dim):
+            raise ValueError(
+                f"Expected embeddings of shape {(len(ids), self.embedding_dim)}, "
+                f"got {embeddings.shape}."
+            )
+        with self._lock:
+            documents: List[Document] = self._stored_documents(ids=ids, index=index)
+            rows: Dict[str, np.ndarray] = dict(zip(ids, embeddings))
+            changes = []
+            for document in documents:
+                changes.append((document.embedding, rows[document.id]))
+                document.embedding = rows[document.id]
+            self._invalidate_embeddings(index)
+            self.statistics[index].replace_embeddings(changes)
+            sequence = (
+                self._log(
+                    {
+                        "op": "embed",
+                        "index": index,
+                        "ids": [document.id for document in documents],
+                    },
+                    np.stack([document.embedding for document in documents]),
+                )
+                if documents
+                else None
+            )
+            self._changed(index)
+        self._wait(sequence)
+        return len(documents)
+
+    def delete_documents(
+        self,
+        index: Optional[str] = None,
+        ids: Optional[List[str]] = None,
+        filters: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        index = self._single_index(index)
+        if ids is None:
+            targets = {shard: None for shard in self._existing_shards(index)}
+        else:
+            targets = defaultdict(list)
+            for id in ids:
+                targets[self.shard_of(id, index)].append(id)
+
+        deleted: List[str] = []
+        with self._lock:
+            for shard, shard_ids in targets.items():
+                if shard not in self.indexes:
+                    continue
+                stored: Dict[str, Document] = self.indexes[shard]
+                before = {
+                    id: stored[id]
+                    for id in (stored.keys() if shard_ids is None else shard_ids)
+                    if id in stored
+                }
+                super().delete_documents(
+                    index=shard, ids=shard_ids, filters=filters, headers=headers
+                )
+                # Deleting everything replaces the shard's dict rather than emptying it.
+                remaining: Dict[str, Document] = self.indexes.get(shard, {})
+                removed = [
+                    document for id, document in before.items() if id not in remaining
+                ]
+                self._metadata(shard).remove(document.id for document in removed)
+                self.statistics[index].remove(removed)
+                deleted.extend(document.id for document in removed)
+            # The ids actually removed are logged, so replay never evaluates filters.
+            sequence = (
+                self._log(
+                    {
+                        "op": "delete",
+                        "index": index,
+                        "ids": None if ids is None and not filters else deleted,
+                    }
+                )
+                if deleted
+                else None
+            )
+            self._changed(index)
+        self._wait(sequence)
+
+    def delete_index(self, index: str):
+        with self._lock:
+            for shard in self._existing_shards(index):
+                super().delete_index(index=shard)
+                self.metadata.pop(shard, None)
+                self._forget_sorted_ids(shard)
+            self.statistics.pop(index, None)
+            sequence = self._log({"op": "delete_index", "index": index})
+            self._changed(index)
+        self._wait(sequence)
+
+    def describe_documents(self, index: Optional[str] = None) -> Dict:
+        """Returns statistics maintained on write, so the cost does not grow with the index."""
+        index = self._single_index(index)
+        if index not in self.statistics:
+            return IndexStatistics().describe()
+        return self.statistics[index].describe()
+
+    def memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """Bytes held by each index for text, meta and embeddings; scans every document."""
+        usage: Dict[str, Dict[str, int]] = {}
+        for index in self.logical_indexes():
+            with self._lock:
+                documents: List[Document] = [
+                    document
+                    for shard in self._existing_shards(index)
+                    for document in self.indexes[shard].values()
+                ]
+            usage[index] = documents_memory(documents)
+        return usage
+
+    def rebalance(self, index: str, shards: int) -> int:
+        """Redistributes an index over ``shards`` shards without copying documents.
+
+        The index is swapped atomically under the store lock, but callers should take
+        it out of rotation while this runs: documents written concurrently may be lost.
+        """
+        shards = max(1, shards)
+        with self._lock:
+            old_shards = self._existing_shards(index)
+            documents = [
+                document
+                for shard in old_shards
+                for document in self.indexes[shard].values()
+            ]
+            self.shard_counts[index] = shards
+            new_shards: Dict[str, Dict[str, Document]] = {
+                name: {} for name in self.shard_names(index)
+            }
+            for document in documents:
+                new_shards[self.shard_of(document.id, index)][document.id] = document
+
+            for shard in old_shards:
+                del self.indexes[shard]
+                self.metadata.pop(shard, None)
+                self._forget_sorted_ids(shard)
+            self.indexes.update(new_shards)
+            for shard, shard_documents in new_shards.items():
+                self._metadata(shard).add(shard_documents.values())
+            sequence = self._log({"op": "rebalance", "index": index, "shards": shards})
+        self._wait(sequence)
+
+        logger.debug(
+            f"Rebalanced '{index}' from {len(old_shards)} to {shards} shard(s)."
+        )
+        return len(documents)
+
+    def logical_indexes(self) -> List[str]:
+        with self._lock:
+            return sorted(
+                {shard.split(SHARD_SEPARATOR)[0] for shard in self.indexes.keys()}
+            )
+
+    def _log(
+        self, header: dict, embeddings: Optional[np.ndarray] = None
+    ) -> Optional[int]:
+        # Called under the store lock, so log order matches the order of mutations.
+        if self.log is None:
+            return None
+        return self.log.append(header, embeddings)
+
+    def _wait(self, sequence: Optional[int]) -> None:
+        # Called outside the store lock, so concurrent writers share an fsync.
+        if self.log is not None and sequence is not None:
+            self.log.wait(sequence)
+
+    def open_log(self, directory: str, model: str = "") -> None:
+        """Restores the store from ``directory`` and logs every later mutation there.
+
+        The newest checkpoint is bulk-loaded and only the mutations logged after it
+        are replayed, so recovery does not re-run embedding models. Raises ValueError
+        if the log holds embeddings of another ``model`` or dimension.
+        """
+        started: float = time.perf_counter()
+        log = MutationLog(
+            directory=directory, dimension=self.embedding_dim, model=model
+        )
+        segment: int = log.latest_checkpoint()[0]
+        for index, shards, batches in log.read_checkpoint():
+            self.shard_counts[index] = shards
+            for batch in batches:
+                self.write_documents(
+                    batch, index=index, duplicate_documents="overwrite"
+                )
+
+        records: int = 0
+        embedded: set = set()
+        for header, embeddings in log.replay(start=segment):
+            self._apply(header, embeddings)
+            if header["op"] == "embed":
+                embedded.add(header["index"])
+            records += 1
+        for index in embedded:
+            self.statistics[index].set_embeddings(
+                document
+                for shard in self._existing_shards(index)
+                for document in self.indexes[shard].values()
+            )
+
+        self.log = log
+        threading.Thread(
+            target=self._compact_periodically, name="wal-compaction", daemon=True
+        ).start()
+        logger.info(
+            f"Recovered {sum(self.statistics[i].count for i in self.logical_indexes())} "
+            f"documents and replayed {records} log records from {directory} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def _apply(self, header: dict, embeddings: Optional[np.ndarray]) -> None:
+        op, index = header["op"], header["index"]
+        if op == "write":
+            mode = header["duplicate_documents"]
+            self.write_documents(
+                written_documents(header, embeddings),
+                index=index,
+                duplicate_documents="skip" if mode == "fail" else mode,
+            )
+        elif op == "embed":
+            rows: Dict[str, np.ndarray] = dict(zip(header["ids"], embeddings))
+            with self._lock:
+                for document in self._stored_documents(ids=header["ids"], index=index):
+                    document.embedding = rows[document.id]
+                self._invalidate_embeddings(index)
+            self._changed(index)
+        elif op == "delete":
+            self.delete_documents(index=index, ids=header["ids"])
+        elif op == "delete_index":
+            self.delete_index(index=index)
+        elif op == "rebalance":
+            self.rebalance(index=index, shards=header["shards"])
+        else:
+            logger.warning(f"Skipping unknown log record: {op}")
+
+    def checkpoint(self) -> None:
+        """Folds the log into a new checkpoint and removes the segments it covers.
+
+        Only swapping segments and collecting document references happens under
+        the store lock; the checkpoint itself is written while writes continue.
+        """
+        if self.log is None:
+            return
+        with self._lock:
+            segment: int = self.log.rotate()
+            snapshot: Dict[str, tuple] = {
+                index: (
+                    [
+                        document
+                        for shard in self._existing_shards(index)
+                        for document in self.indexes[shard].values()
+                    ],
+                    self.shard_count(index),
+                )
+                for index in self.logical_indexes()
+            }
+        started: float = time.perf_counter()
+        self.log.write_checkpoint(
+            segment=segment, indexes=snapshot, similarity=self.similarity
+        )
+        logger.debug(
+            f"Wrote checkpoint {segment} of {len(snapshot)} index(es) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    def _compact_periodically(self) -> None:
+        while self.log is not None:
+            time.sleep(WAL_COMPACT_INTERVAL)
+            try:
+                if self.log.size() > WAL_COMPACT_BYTES:
+                    self.checkpoint()
+            except Exception as e:
+                logger.error(f"Unable to compact mutation log: {e}")
@@ -0,0 +1,188 @@
+import io
+import json
+import tarfile
+import time
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from haystack import Document
+
+ARCHIVE_VERSION: int = 1
+HEADER: str = "header.json"
+EMBEDDINGS: str = "embeddings.f32"
+DOCUMENTS: str = "documents.ndjson"
+IMPORT_BATCH: int = 10_000
+
+_UNREPRESENTABLE = object()
+
+
+def _add(archive: tarfile.TarFile, name: str, fileobj: IO[bytes], size: int) -> None:
+    info = tarfile.TarInfo(name=name)
+    info.size = size
+    info.mtime = int(time.time())
+    archive.addfile(info, fileobj)
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        items = [_json_value(item) for item in value]
+        if any(item is _UNREPRESENTABLE for item in items):
+            return _UNREPRESENTABLE
+        return items
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        fields = {key: _json_value(item) for key, item in value.items()}
+        if any(item is _UNREPRESENTABLE for item in fields.values()):
+            return _UNREPRESENTABLE
+        return fields
+    return _UNREPRESENTABLE
+
+
+def json_meta(meta: dict) -> dict:
+    """``meta`` with numpy values converted and values JSON cannot hold, such as open
+    files, left out."""
+    converted: dict = {}
+    for key, value in meta.items():
+        value = _json_value(value)
+        if value is not _UNREPRESENTABLE:
+            converted[key] = value
+    return converted
+
+
+def document_record(document: Document, embedded: Optional[bool] = None) -> dict:
+    """Serialisable fields of a document; the embedding itself is stored separately."""
+    return {
+        "id": document.id,
+        "content": document.content,
+        "content_type": document.content_type,
+        "meta": json_meta(document.meta),
+        "id_hash_keys": document.id_hash_keys,
+        "embedded": document.embedding is not None if embedded is None else embedded,
+    }
+
+
+def export_archive(
+    documents: List[Document],
+    fileobj: IO[bytes],
+    index: str,
+    dimension: int,
+    model: str,
+    similarity: str,
+) -> int:
+    """Writes ``documents`` to ``fileobj`` as an uncompressed tar stream.
+
+    The archive holds ``header.json``, a raw little-endian float32 block with one
+    ``dimension``-wide row per embedded document, then the documents as NDJSON in
+    the same order, so an import can map the block before reading any document.
+    """
+    # Read each embedding once: the documents may be live objects whose embeddings
+    # are replaced while the archive is written.
+    embeddings: List[Optional[np.ndarray]] = [d.embedding for d in documents]
+    embedded: List[np.ndarray] = [e for e in embeddings if e is not None]
+    header: Dict = {
+        "version": ARCHIVE_VERSION,
+        "index": index,
+        "documents": len(documents),
+        "embeddings": len(embedded),
+        "dim": dimension,
+        "dtype": "<f4",
+        "model": model,
+        "similarity": similarity,
+    }
+
+    with tarfile.open(fileobj=fileobj, mode="w|") as archive:
+        data = json.dumps(header).encode("utf-8")
+        _add(archive, HEADER, io.BytesIO(data), len(data))
+
+        with SpooledTemporaryFile(max_size=64 * 1024 * 1024) as block:
+            for embedding in embedded:
+                embedding = np.asarray(embedding, dtype="<f4")
+                if embedding.shape != (dimension,):
+                    raise ValueError(
+                        f"Found a {embedding.shape} embedding, expected ({dimension},)."
+                    )
+                block.write(embedding.tobytes())
+            size = block.tell()
+            block.seek(0)
+            _add(archive, EMBEDDINGS, block, size)
+
+        with SpooledTemporaryFile(max_size=64 * 1024 * 1024) as lines:
+            for document, embedding in zip(documents, embeddings):
+                record = document_record(document, embedded=embedding is not None)
+                lines.write(json.dumps(record, default=str).encode("utf-8"))
+                lines.write(b"\n")
+            size = lines.tell()
+            lines.seek(0)
+            _add(archive, DOCUMENTS, lines, size)
+
+    return len(documents)
+
+
+def read_archive(
+    fileobj: IO[bytes],
+    dimension: int,
+    model: Optional[str] = None,
+    similarity: Optional[str] = None,
+    batch_size: int = IMPORT_BATCH,
+) -> Iterable[List[dict]]:
+    """Yields batches of document dicts from an archive written by ``export_archive``.
+
+    Embeddings are views into a single array read straight from the archive; no
+    model is called. Raises ValueError if the archive was produced for a different
+    embedding dimension, model or similarity than the receiving store.
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|") as archive:
+        members = iter(archive)
+
+        member = next(members, None)
+        if member is None or member.name != HEADER:
+            raise ValueError(f"Archive does not start with {HEADER}.")
+        header: Dict = json.load(archive.extractfile(member))
+        if header.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version: {header.get('version')}")
+        if header["dim"] != dimension:
+            raise ValueError(
+                f"Archive embeddings have {header['dim']} dimensions, expected {dimension}."
+            )
+        if model and header["model"].split("/")[-1] != model.split("/")[-1]:
+            raise ValueError(
+                f"Archive was embedded with {header['model']}, expected {model}."
+            )
+        if similarity and header["similarity"] != similarity:
+            raise ValueError(
+                f"Archive uses {header['similarity']} similarity, expected {similarity}."
+            )
+
+        member = next(members, None)
+        if member is None or member.name != EMBEDDINGS:
+            raise ValueError(f"Archive has no {EMBEDDINGS} block.")
+        embeddings = np.frombuffer(
+            archive.extractfile(member).read(), dtype=header["dtype"]
+        ).reshape(-1, dimension)
+        if len(embeddings) != header["embeddings"]:
+            raise ValueError("Archive embedding block is truncated.")
+
+        member = next(members, None)
+        if member is None or member.name != DOCUMENTS:
+            raise ValueError(f"Archive has no {DOCUMENTS} member.")
+        row: int = 0
+        batch: List[dict] = []
+        for line in archive.extractfile(member):
+            if not line.strip():
+                continue
+            record: dict = json.loads(line)
+            if record.pop("embedded", False):
+                record["embedding"] = embeddings[row]
+                row += 1
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,37 @@
+from typing import List, Sequence
+
+
+def bucket_by_length(
+    lengths: Sequence[int], max_tokens: int, sort: bool = True
+) -> List[List[int]]:
+    """Groups positions into batches whose padded size stays within ``max_tokens``.
+
+    Models pad every member of a batch to its longest one, so positions are sorted by
+    length first and each batch only holds inputs of similar length. A batch always
+    takes at least one input, even one longer than the budget. With ``sort=False``
+    the original order is kept, which is what plain fixed-size batching does.
+    """
+    order: List[int] = list(range(len(lengths)))
+    if sort:
+        order.sort(key=lambda position: lengths[position])
+
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    longest: int = 0
+    for position in order:
+        padded_length = max(longest, lengths[position])
+        if batch and padded_length * (len(batch) + 1) > max_tokens:
+            batches.append(batch)
+            batch, padded_length = [], lengths[position]
+        batch.append(position)
+        longest = padded_length
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def padding_ratio(lengths: Sequence[int], padded_length: int) -> float:
+    """Share of a batch padded to ``padded_length`` that is padding."""
+    if not lengths or padded_length <= 0:
+        return 0.0
+    return 1.0 - sum(lengths) / (padded_length * len(lengths))
@@ -0,0 +1,211 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+import numpy as np
+
+# Cached responses live in this subdirectory of the configured directory, and only
+# files named like cache entries are ever removed from it.
+RESPONSE_CACHE_SUBDIRECTORY: str = "oracle-response-cache"
+ENTRY_NAME = re.compile(r"^[0-9a-f]{64}\.json(\.tmp)?$")
+
+
+@dataclass
+class SemanticCacheEntry:
+    key: Hashable
+    generation: int
+    embedding: np.ndarray
+    value: Any
+
+
+class SemanticCache:
+    """Bounded LRU cache of answers, matched on the cosine distance between query embeddings.
+
+    Entries are grouped by ``key`` (endpoint, index and parameters) and only match
+    lookups made against the same index generation.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_distance: float = 0.05) -> None:
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, SemanticCacheEntry]" = OrderedDict()
+        self._next_id: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+
+    def get(self, key: Hashable, generation: int, embedding: np.ndarray) -> Any:
+        query = self._normalize(embedding)
+        with self._lock:
+            candidates = [
+                (entry_id, entry)
+                for entry_id, entry in self._entries.items()
+                if entry.key == key and entry.generation == generation
+            ]
+            if not candidates:
+                return None
+
+            similarities = (
+                np.stack([entry.embedding for _, entry in candidates]) @ query
+            )
+            best = int(np.argmax(similarities))
+            if 1.0 - float(similarities[best]) > self.max_distance:
+                return None
+
+            entry_id, entry = candidates[best]
+            self._entries.move_to_end(entry_id)
+            return copy.deepcopy(entry.value)
+
+    def put(
+        self, key: Hashable, generation: int, embedding: np.ndarray, value: Any
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        entry = SemanticCacheEntry(
+            key=key,
+            generation=generation,
+            embedding=self._normalize(embedding),
+            value=copy.deepcopy(value),
+        )
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Optional[callable] = None) -> int:
+        """Drops every entry, or only those whose key satisfies ``predicate``."""
+        with self._lock:
+            stale = [
+                entry_id
+                for entry_id, entry in self._entries.items()
+                if predicate is None or predicate(entry.key)
+            ]
+            for entry_id in stale:
+                del self._entries[entry_id]
+            return len(stale)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+class ResponseCache:
+    """Bounded LRU cache of encoded responses, kept in memory or in a local directory.
+
+    Keys include the generation of every index a response was read from, so a
+    response is never served once any of them has changed; stale entries simply age
+    out. The key doubles as the response's ETag. Generations restart with the process
+    and count per replica, so keys also include an ``epoch`` drawn at startup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = (
+            os.path.join(directory, RESPONSE_CACHE_SUBDIRECTORY)
+            if directory is not None
+            else None
+        )
+        self._lock = threading.Lock()
+        # key -> (query, body) in memory, or key -> size on disk
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._bytes: int = 0
+        self.epoch: str = secrets.token_hex(8)
+        if self.directory is not None:
+            # Generations restart with the process, so earlier entries cannot be trusted.
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(self.directory):
+                if ENTRY_NAME.match(name):
+                    os.remove(os.path.join(self.directory, name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(
+        endpoint: str, query: str, params: Any, generation: Any, epoch: str = ""
+    ) -> str:
+        canonical = json.dumps(
+            [endpoint, normalize_query(query), params, generation, epoch],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """Returns the query the response was computed for and the encoded body."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            if self.directory is None:
+                return self._entries[key]
+        try:
+            with open(self._path(key), "rb") as file:
+                query, body = file.read().split(b"\n", 1)
+            return json.loads(query), body
+        except (OSError, ValueError):
+            with self._lock:
+                self._bytes -= self._entries.pop(key, 0)
+            return None
+
+    def put(self, key: str, query: str, body: bytes) -> None:
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        if self.directory is None:
+            entry: Any = (query, body)
+            size = len(body)
+        else:
+            data = json.dumps(query).encode("utf-8") + b"\n" + body
+            path = self._path(key)
+            with open(f"{path}.tmp", "wb") as file:
+                file.write(data)
+            os.replace(f"{path}.tmp", path)
+            entry = size = len(data)
+        with self._lock:
+            self._bytes -= self._size(self._entries.pop(key, None))
+            self._entries[key] = entry
+            self._bytes += size
+            self._evict()
+
+    def _size(self, entry: Any) -> int:
+        if entry is None:
+            return 0
+        return entry if self.directory is not None else len(entry[1])
+
+    def _evict(self) -> None:
+        # Called with the lock held, except from __init__.
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= self._size(entry)
+            if self.directory is not None:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
@@ -0,0 +1,83 @@
+import logging
+from typing import Optional
+
+import numpy as np
+
+from oracle_of_ammon.utils.logger import configure_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only columnar imports need it
+    pa = None
+
+logger: logging.Logger = configure_logger()
+
+COLUMNAR_EXTENSIONS: tuple = (".parquet", ".arrow", ".feather", ".ipc")
+EMBEDDING_COLUMN: str = "question_emb"
+# Schema or field metadata key naming the model that produced the embeddings.
+EMBEDDING_MODEL_KEY: bytes = b"embedding_model"
+
+
+def is_columnar(path: str) -> bool:
+    return path.lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def read_table(path: str) -> "pa.Table":
+    """Memory-maps a Parquet or Arrow IPC file."""
+    if pa is None:
+        raise ImportError("Reading Parquet or Arrow files requires pyarrow.")
+    if path.lower().endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+
+    source = pa.memory_map(path, "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def embedding_model(table: "pa.Table") -> Optional[str]:
+    for metadata in (
+        table.schema.field(EMBEDDING_COLUMN).metadata,
+        table.schema.metadata,
+    ):
+        if metadata and EMBEDDING_MODEL_KEY in metadata:
+            return metadata[EMBEDDING_MODEL_KEY].decode("utf-8")
+    return None
+
+
+def precomputed_embeddings(
+    table: "pa.Table", dimension: int, model: str
+) -> Optional[np.ndarray]:
+    """Returns the ``question_emb`` column as an ``(n, dimension)`` array, or None if unusable.
+
+    Embeddings are only reused when they are a fixed-size list of ``dimension``
+    values without nulls and are tagged with ``model``; a single-chunk float32
+    column is returned as a view of the file's memory.
+    """
+    if EMBEDDING_COLUMN not in table.column_names:
+        return None
+    column = table.column(EMBEDDING_COLUMN)
+    if (
+        not pa.types.is_fixed_size_list(column.type)
+        or column.type.list_size != dimension
+    ):
+        logger.debug(f"Ignoring '{EMBEDDING_COLUMN}': not a {dimension}-value list.")
+        return None
+    tag = embedding_model(table)
+    if tag is None or tag.split("/")[-1] != model.split("/")[-1]:
+        logger.debug(f"Ignoring '{EMBEDDING_COLUMN}': produced by {tag}, not {model}.")
+        return None
+    if column.null_count:
+        return None
+
+    arrays = [
+        chunk.flatten().to_numpy(zero_copy_only=False).reshape(-1, dimension)
+        for chunk in column.chunks
+    ]
+    if not arrays:
+        return np.empty((0, dimension), dtype=np.float32)
+    return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
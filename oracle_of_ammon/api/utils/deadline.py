@@ -0,0 +1,69 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Optional
+
+from starlette.requests import Request
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class Deadline:
+    """Time budget of a single request, shared between the event loop and the worker thread.
+
+    Inference checks the deadline between batches: once it has expired, the work done
+    so far is returned and marked as degraded; once the client is gone, the remaining
+    work is abandoned.
+    """
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.expires: Optional[float] = None
+        self.degraded: bool = False
+        self._cancelled = threading.Event()
+        self.shorten(timeout)
+
+    def shorten(self, timeout: Optional[float]) -> "Deadline":
+        if timeout is not None and timeout > 0:
+            expires = time.monotonic() + timeout
+            self.expires = (
+                expires if self.expires is None else min(self.expires, expires)
+            )
+        return self
+
+    def remaining(self) -> float:
+        if self.expires is None:
+            return math.inf
+        return max(0.0, self.expires - time.monotonic())
+
+    def allows(self, seconds: Optional[float]) -> bool:
+        """Whether work estimated to take ``seconds`` fits; unknown estimates always fit."""
+        return seconds is None or seconds <= self.remaining()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise RequestCancelled()
+
+
+async def watch_disconnect(
+    request: Request, deadline: Deadline, interval: float = 0.1
+) -> None:
+    """Cancels ``deadline`` as soon as the client disconnects."""
+    while not deadline.cancelled:
+        if await request.is_disconnected():
+            deadline.cancel()
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,313 @@
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from haystack import Document
+from haystack.nodes.base import BaseComponent
+
+from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+logger: logging.Logger = configure_logger()
+
+# "off" keeps every chunk. "link" stores near-duplicate chunks unembedded with
+# ``duplicate_of`` pointing at the kept chunk; "skip" drops them, and their text is
+# lost if the kept chunk's file is deleted.
+DEDUP_MODE: str = os.environ.get("DEDUP_MODE", "off").lower()
+# Estimated Jaccard similarity of word shingles above which chunks are duplicates.
+DEDUP_THRESHOLD: float = float(os.environ.get("DEDUP_THRESHOLD", 0.85))
+DEDUP_PERMUTATIONS: int = int(os.environ.get("DEDUP_PERMUTATIONS", 128))
+DEDUP_SHINGLE: int = int(os.environ.get("DEDUP_SHINGLE", 3))
+DEDUP_MODES: Tuple[str, ...] = ("skip", "link", "off")
+
+_PRIME: int = (1 << 61) - 1
+_MAX_HASH: int = (1 << 32) - 1
+
+
+def lsh_parameters(threshold: float, permutations: int) -> Tuple[int, int]:
+    """Bands and rows per band whose S-curve turns at about ``threshold``.
+
+    Pairs with similarity ``s`` share a bucket with probability
+    ``1 - (1 - s**rows)**bands``, which rises steeply near ``(1 / bands)**(1 / rows)``.
+    """
+    return min(
+        ((permutations // rows, rows) for rows in range(1, permutations + 1)),
+        key=lambda pair: abs((1 / pair[0]) ** (1 / pair[1]) - threshold),
+    )
+
+
+class MinHasher:
+    """MinHash signatures of the word shingles of a text."""
+
+    def __init__(
+        self,
+        permutations: int = DEDUP_PERMUTATIONS,
+        shingle: int = DEDUP_SHINGLE,
+        seed: int = 1,
+    ):
+        self.permutations = permutations
+        self.shingle = shingle
+        rng = np.random.default_rng(seed)
+        # a * h + b stays below 2**64 for 32-bit shingle hashes h.
+        self._a = rng.integers(1, 1 << 31, size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=permutations, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        words: List[str] = re.findall(r"\w+", text.lower())
+        grams = {
+            " ".join(words[i : i + self.shingle])
+            for i in range(max(1, len(words) - self.shingle + 1))
+        }
+        grams.discard("")
+        return np.fromiter(
+            (zlib.crc32(gram.encode("utf-8")) for gram in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        if not len(hashes):
+            return np.full(self.permutations, _MAX_HASH, dtype=np.uint32)
+        values = (np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME)
+        return (values & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return float(np.mean(first == second))
+
+
+class LSHIndex:
+    """Banded locality-sensitive hash of the signatures of one index."""
+
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self.buckets: List[Dict[bytes, List[str]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def _keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, id: str, signature: np.ndarray) -> None:
+        if id in self.signatures:
+            return
+        self.signatures[id] = signature
+        for bucket, key in zip(self.buckets, self._keys(signature)):
+            bucket[key].append(id)
+
+    def query(
+        self, signature: np.ndarray, threshold: float
+    ) -> Optional[Tuple[str, float]]:
+        """The most similar indexed id at or above ``threshold``, if any."""
+        candidates = {
+            id
+            for bucket, key in zip(self.buckets, self._keys(signature))
+            for id in bucket.get(key, ())
+        }
+        best: Optional[Tuple[str, float]] = None
+        for id in candidates:
+            score = similarity(signature, self.signatures[id])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (id, score)
+        return best
+
+
+class Deduplicator:
+    """Finds chunks that nearly repeat chunks already in a document store.
+
+    Signatures of an index are built from the store on first use and kept up to date
+    as chunks pass through ``filter``; ``forget`` drops them after deletes or imports.
+    Linked duplicates are never indexed, so they always point at a kept chunk.
+    """
+
+    def __init__(
+        self,
+        document_store,
+        mode: str = DEDUP_MODE,
+        threshold: float = DEDUP_THRESHOLD,
+        permutations: int = DEDUP_PERMUTATIONS,
+        shingle: int = DEDUP_SHINGLE,
+    ):
+        if mode not in DEDUP_MODES:
+            logger.warning(f"Unknown deduplication mode '{mode}', using 'off'.")
+            mode = "off"
+        self.document_store = document_store
+        self.mode = mode
+        self.threshold = threshold
+        self.hasher = MinHasher(permutations=permutations, shingle=shingle)
+        self.bands, self.rows = lsh_parameters(threshold, permutations)
+        self._indexes: Dict[str, LSHIndex] = {}
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+        # Chunks and seconds embedded so far, to price the chunks not embedded.
+        self._embedded: List[float] = [0, 0.0]
+
+    def _index(self, index: str) -> LSHIndex:
+        if index not in self._indexes:
+            lsh = LSHIndex(bands=self.bands, rows=self.rows)
+            for document in self.document_store.get_all_documents_generator(
+                index=index, return_embedding=False
+            ):
+                if isinstance(document.content, str) and not document.meta.get(
+                    "duplicate_of"
+                ):
+                    lsh.add(document.id, self.hasher.signature(document.content))
+            self._indexes[index] = lsh
+            logger.debug(
+                f"Built near-duplicate index of {len(lsh)} chunks for '{index}'"
+            )
+        return self._indexes[index]
+
+    def forget(self, index: str) -> None:
+        with self._lock:
+            self._indexes.pop(index, None)
+
+    def filter(self, documents: List[Document], index: str) -> List[Document]:
+        """Documents to write: near-duplicates are dropped, or marked in ``meta`` with
+        ``duplicate_of`` and ``similarity`` when linking."""
+        if self.mode == "off" or not documents:
+            return documents
+        kept: List[Document] = []
+        duplicates, saved_bytes = 0, 0
+        embedding_bytes: int = 4 * self.document_store.embedding_dim
+        with self._lock:
+            lsh = self._index(index)
+            for document in documents:
+                if not isinstance(document.content, str):
+                    kept.append(document)
+                    continue
+                signature = self.hasher.signature(document.content)
+                match = lsh.query(signature, self.threshold)
+                # Exact id collisions are left to the store's duplicate handling.
+                if match is None or match[0] == document.id:
+                    lsh.add(document.id, signature)
+                    kept.append(document)
+                    continue
+                duplicates += 1
+                saved_bytes += embedding_bytes
+                if self.mode == "link":
+                    document.meta["duplicate_of"] = match[0]
+                    document.meta["similarity"] = round(match[1], 3)
+                    kept.append(document)
+                else:
+                    saved_bytes += len(document.content.encode("utf-8"))
+            counts = self._counts[index]
+            counts["chunks"] += len(documents)
+            counts["duplicates"] += duplicates
+            counts["bytes_saved"] += saved_bytes
+        metrics.increment("dedup.chunks", len(documents))
+        metrics.increment("dedup.duplicates", duplicates)
+        if duplicates:
+            logger.debug(
+                f"{'Linked' if self.mode == 'link' else 'Skipped'} {duplicates} of "
+                f"{len(documents)} chunks as near-duplicates in '{index}'"
+            )
+        return kept
+
+    def promote(self, document_store, index: str, ids: List[str]) -> int:
+        """Replaces deleted chunks by the most similar chunk linked to each.
+
+        The promoted chunk is unlinked, so it is embedded in the deleted one's place,
+        and the other chunks linked to the deleted one are linked to it instead.
+        """
+        deleted = set(ids)
+        linked: Dict[str, List[Document]] = defaultdict(list)
+        for document in document_store.get_all_documents_generator(
+            index=index, return_embedding=False
+        ):
+            if document.meta.get("duplicate_of") in deleted:
+                linked[document.meta["duplicate_of"]].append(document)
+
+        changed: List[Document] = []
+        for duplicates in linked.values():
+            promoted = max(
+                duplicates, key=lambda document: document.meta.get("similarity", 0)
+            )
+            promoted.meta = {
+                key: value
+                for key, value in promoted.meta.items()
+                if key not in ("duplicate_of", "similarity")
+            }
+            changed.append(promoted)
+            signature = self.hasher.signature(promoted.content)
+            for document in duplicates:
+                if document is not promoted:
+                    document.meta["duplicate_of"] = promoted.id
+                    document.meta["similarity"] = round(
+                        similarity(signature, self.hasher.signature(document.content)),
+                        3,
+                    )
+                    changed.append(document)
+        if changed:
+            document_store.write_documents(
+                changed, index=index, duplicate_documents="overwrite"
+            )
+        return len(linked)
+
+    def observe_embedding(self, chunks: int, seconds: float) -> None:
+        with self._lock:
+            self._embedded[0] += chunks
+            self._embedded[1] += seconds
+
+    def report(self) -> dict:
+        with self._lock:
+            chunks, seconds = self._embedded
+            per_chunk: float = seconds / chunks if chunks else 0.0
+            return {
+                "mode": self.mode,
+                "threshold": self.threshold,
+                "indexes": {
+                    index: {
+                        "chunks": counts["chunks"],
+                        "duplicates": counts["duplicates"],
+                        "duplicate_ratio": counts["duplicates"] / counts["chunks"]
+                        if counts["chunks"]
+                        else 0.0,
+                        "bytes_saved": counts["bytes_saved"],
+                        "embedding_seconds_saved": counts["duplicates"] * per_chunk,
+                    }
+                    for index, counts in self._counts.items()
+                },
+            }
+
+
+class NearDuplicateFilter(BaseComponent):
+    """Pipeline node passing chunks through a ``Deduplicator`` before they are written."""
+
+    outgoing_edges = 1
+
+    def __init__(self, deduplicator: Deduplicator):
+        super().__init__()
+        self.deduplicator = deduplicator
+
+    def run(self, documents: List[Document], index: Optional[str] = None):  # type: ignore
+        index = index or self.deduplicator.document_store.index
+        return {
+            "documents": self.deduplicator.filter(documents=documents, index=index)
+        }, "output_1"
+
+    def run_batch(  # type: ignore
+        self,
+        documents: Union[List[Document], List[List[Document]]],
+        index: Optional[str] = None,
+    ):
+        if documents and isinstance(documents[0], Document):
+            return self.run(documents=documents, index=index)  # type: ignore
+        return {
+            "documents": [self.run(documents=d, index=index)[0]["documents"] for d in documents]  # type: ignore
+        }, "output_1"
@@ -0,0 +1,273 @@
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import psutil
+from haystack import Document
+
+from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+logger: logging.Logger = configure_logger()
+
+# Worker processes for bulk embedding; 1 embeds in the calling thread as before.
+EMBEDDING_WORKERS: int = int(
+    os.environ.get("EMBEDDING_WORKERS", max(1, (os.cpu_count() or 1) // 8))
+)
+# Cores (and torch threads) per worker; 0 splits the usable cores evenly.
+EMBEDDING_THREADS: int = int(os.environ.get("EMBEDDING_THREADS", 0))
+EMBEDDING_BATCH: int = int(os.environ.get("EMBEDDING_BATCH", 256))
+# Fewer pending chunks than this are not worth starting the workers for.
+MIN_PARALLEL_EMBEDDING: int = int(os.environ.get("MIN_PARALLEL_EMBEDDING", 2048))
+# Progress of full reindexes, so an interrupted one resumes; "" disables resuming.
+EMBEDDING_CHECKPOINT_DIR: str = os.environ.get(
+    "EMBEDDING_CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".oracle_of_ammon", "reindex"),
+)
+
+# EmbeddingRetriever arguments that determine the embeddings it produces.
+RETRIEVER_SETTINGS: Tuple[str, ...] = (
+    "embedding_model",
+    "model_version",
+    "model_format",
+    "batch_size",
+    "max_seq_len",
+    "pooling_strategy",
+    "emb_extraction_layer",
+    "embed_meta_fields",
+    "use_auth_token",
+)
+
+_worker_retriever: Any = None
+
+
+def available_cores() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_slices(
+    workers: int, threads: int = 0, cores: Optional[List[int]] = None
+) -> List[List[int]]:
+    """Splits ``cores`` into one slice of ``threads`` cores per worker.
+
+    With ``threads`` 0 the cores are shared out evenly. Slices wrap around, and so
+    overlap, when more cores are asked for than there are.
+    """
+    cores = cores if cores is not None else available_cores()
+    per_worker: int = threads or max(1, len(cores) // workers)
+    if workers * per_worker > len(cores):
+        logger.warning(
+            f"{workers} embedding workers with {per_worker} threads each "
+            f"oversubscribe {len(cores)} cores."
+        )
+    return [
+        [cores[(worker * per_worker + i) % len(cores)] for i in range(per_worker)]
+        for worker in range(workers)
+    ]
+
+
+def retriever_settings(retriever) -> Dict[str, Any]:
+    """Arguments that rebuild ``retriever``'s encoder in another process."""
+    return {
+        name: getattr(retriever, name)
+        for name in RETRIEVER_SETTINGS
+        if hasattr(retriever, name)
+    }
+
+
+def _init_worker(settings: dict, slices) -> None:
+    global _worker_retriever
+    try:
+        cores: Optional[List[int]] = slices.get_nowait()
+    except Exception:
+        # A replacement for a crashed worker finds the slices handed out already.
+        cores = None
+    if cores:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+        os.environ["OMP_NUM_THREADS"] = str(len(cores))
+        os.environ["MKL_NUM_THREADS"] = str(len(cores))
+
+    import torch
+    from haystack.nodes import EmbeddingRetriever
+
+    if cores:
+        torch.set_num_threads(len(cores))
+        torch.set_num_interop_threads(1)
+    _worker_retriever = EmbeddingRetriever(
+        **settings, use_gpu=False, progress_bar=False, scale_score=False
+    )
+
+
+def _embed_in_worker(documents: List[Document]) -> np.ndarray:
+    return _worker_retriever.embed_documents(documents)
+
+
+def batched(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class BulkEmbedder:
+    """Embeds documents in worker processes, each pinned to its own slice of cores.
+
+    Every worker loads its own copy of the retriever's model and runs torch with one
+    thread per core of its slice, so workers do not contend for cores. Batches are
+    yielded in submission order with at most ``2 * workers`` in flight, so callers
+    can write each batch as it arrives and memory does not grow with the index.
+    """
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        workers: int = EMBEDDING_WORKERS,
+        threads: int = EMBEDDING_THREADS,
+        batch_size: int = EMBEDDING_BATCH,
+    ):
+        self.settings = settings
+        self.workers = max(1, workers)
+        self.slices: List[List[int]] = core_slices(self.workers, threads)
+        self.batch_size = max(1, batch_size)
+        self.chunks: int = 0
+        self.seconds: float = 0.0
+        self.core_utilization: Optional[float] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Deque[Tuple[List[Document], Future]] = deque()
+
+    def __enter__(self) -> "BulkEmbedder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            slices = context.Queue()
+            for cores in self.slices:
+                slices.put(cores)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.settings, slices),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            # Batches not yet started are dropped rather than embedded for nobody.
+            for _, future in self._in_flight:
+                future.cancel()
+            self._in_flight.clear()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def embed(
+        self, documents: Iterable[Document]
+    ) -> Iterator[Tuple[List[Document], np.ndarray]]:
+        """Yields ``(batch, embeddings)`` in the order of ``documents``."""
+        executor = self._pool()
+        in_flight = self._in_flight
+        cores = sorted({core for cores in self.slices for core in cores})
+        psutil.cpu_percent(percpu=True)
+        started: float = time.perf_counter()
+
+        def collect() -> Tuple[List[Document], np.ndarray]:
+            batch, future = in_flight.popleft()
+            embeddings = np.asarray(future.result())
+            self.chunks += len(batch)
+            return batch, embeddings
+
+        try:
+            for batch in batched(documents, self.batch_size):
+                sent = [
+                    Document(
+                        content=document.content,
+                        content_type=document.content_type,
+                        id=document.id,
+                        meta=document.meta,
+                    )
+                    for document in batch
+                ]
+                in_flight.append((batch, executor.submit(_embed_in_worker, sent)))
+                if len(in_flight) >= 2 * self.workers:
+                    yield collect()
+            while in_flight:
+                yield collect()
+        finally:
+            self.seconds += time.perf_counter() - started
+            usage: List[float] = psutil.cpu_percent(percpu=True)
+            if usage and cores:
+                self.core_utilization = sum(
+                    usage[core] for core in cores if core < len(usage)
+                ) / (100 * len(cores))
+            if self.seconds:
+                metrics.observe("embedding.chunks_per_second", self.chunks_per_second)
+            if self.core_utilization is not None:
+                metrics.observe("embedding.core_utilization", self.core_utilization)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "threads_per_worker": len(self.slices[0]),
+            "chunks": self.chunks,
+            "seconds": self.seconds,
+            "chunks_per_second": self.chunks_per_second,
+            "core_utilization": self.core_utilization,
+        }
+
+
+class ReindexCheckpoint:
+    """Id of the last document a reindex wrote; documents are embedded in id order."""
+
+    def __init__(self, directory: Optional[str], name: str, model: str):
+        self.model = model
+        self.path: Optional[str] = (
+            os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]+", "--", name) + ".json")
+            if directory
+            else None
+        )
+
+    def load(self) -> Optional[str]:
+        """The id to resume after, unless the checkpoint is for another model."""
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as file:
+                state: dict = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable reindex checkpoint {self.path}: {e}")
+            return None
+        return state.get("after") if state.get("model") == self.model else None
+
+    def save(self, after: str) -> None:
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary: str = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"model": self.model, "after": after}, file)
+        os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
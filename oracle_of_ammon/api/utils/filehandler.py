@@ -45,7 +45,7 @@ class FileHandler:
 
             try:
                 meta: dict = {
-                    "filepath_or_buffer": filepath_or_buffer,
+                    "filepath_or_buffer": path,
                     "filename": filename,
                 }
                 return path, meta
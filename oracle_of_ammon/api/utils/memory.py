@@ -0,0 +1,173 @@
+import fnmatch
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from haystack import Document
+
+MAX_SNAPSHOTS: int = 16
+
+
+def deep_sizeof(value: Any, seen: Optional[set] = None) -> int:
+    """Approximate bytes held by ``value`` and the containers and strings inside it."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return array_bytes(value, seen)
+    size: int = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(item, seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+
+def array_bytes(array: np.ndarray, seen: set) -> int:
+    """Counts the buffer an array views only once, e.g. rows of an imported block."""
+    base = array
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    if base is not array:
+        if id(base) in seen:
+            return 0
+        seen.add(id(base))
+    return base.nbytes
+
+
+def documents_memory(documents: Iterable[Document]) -> Dict[str, int]:
+    seen: set = set()
+    usage: Dict[str, int] = {
+        "documents": 0,
+        "text_bytes": 0,
+        "meta_bytes": 0,
+        "embedding_bytes": 0,
+    }
+    for document in documents:
+        usage["documents"] += 1
+        usage["text_bytes"] += deep_sizeof(document.content, seen)
+        usage["meta_bytes"] += deep_sizeof(document.meta, seen)
+        if document.embedding is not None:
+            usage["embedding_bytes"] += deep_sizeof(document.embedding, seen)
+    usage["total_bytes"] = (
+        usage["text_bytes"] + usage["meta_bytes"] + usage["embedding_bytes"]
+    )
+    return usage
+
+
+def module_memory(module: Any) -> Dict[str, Any]:
+    """Parameter and buffer bytes of a torch module, or an empty dict for anything else."""
+    if not hasattr(module, "parameters") or not hasattr(module, "buffers"):
+        return {}
+    parameters = list(module.parameters())
+    buffers = list(module.buffers())
+    parameter_bytes = sum(p.numel() * p.element_size() for p in parameters)
+    buffer_bytes = sum(b.numel() * b.element_size() for b in buffers)
+    return {
+        "parameters": sum(p.numel() for p in parameters),
+        "parameter_bytes": parameter_bytes,
+        "buffer_bytes": buffer_bytes,
+        "total_bytes": parameter_bytes + buffer_bytes,
+        "device": str(parameters[0].device) if parameters else None,
+    }
+
+
+class AllocationProfiler:
+    """Named ``tracemalloc`` snapshots that can be diffed to attribute memory growth."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 25) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
+
+    def snapshot(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Allocation tracing is not running.")
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        entry = {
+            "id": uuid.uuid4().hex,
+            "taken": time.time(),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+        }
+        with self._lock:
+            self._snapshots[entry["id"]] = (entry, snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return entry
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [entry for entry, _ in self._snapshots.values()]
+
+    def diff(
+        self,
+        start: str,
+        end: str,
+        limit: int = 20,
+        path: Optional[str] = None,
+        group_by: str = "lineno",
+    ) -> List[Dict[str, Any]]:
+        """Top allocation changes from ``start`` to ``end``.
+
+        ``path`` keeps allocations with any frame in a matching file, e.g.
+        ``*oracle_of_ammon*``; grouping by ``traceback`` then shows the call path.
+        """
+        with self._lock:
+            if start not in self._snapshots or end not in self._snapshots:
+                raise KeyError("Unknown snapshot.")
+            before = self._snapshots[start][1]
+            after = self._snapshots[end][1]
+        if path:
+            filters = [tracemalloc.Filter(True, path, all_frames=True)]
+            before, after = before.filter_traces(filters), after.filter_traces(filters)
+
+        statistics = after.compare_to(before, group_by)
+        return [
+            {
+                "size_diff": statistic.size_diff,
+                "count_diff": statistic.count_diff,
+                "size": statistic.size,
+                "count": statistic.count,
+                "traceback": [
+                    f"{frame.filename}:{frame.lineno}"
+                    for frame in statistic.traceback
+                    if not path or fnmatch.fnmatch(frame.filename, path)
+                ]
+                or [
+                    f"{frame.filename}:{frame.lineno}" for frame in statistic.traceback
+                ],
+            }
+            for statistic in statistics[:limit]
+        ]
+
+
+profiler = AllocationProfiler()
@@ -0,0 +1,245 @@
+import logging
+import operator
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores.filter_utils import (
+    AndOperation,
+    EqOperation,
+    GteOperation,
+    GtOperation,
+    InOperation,
+    LteOperation,
+    LtOperation,
+    NeOperation,
+    NinOperation,
+    NotOperation,
+    OrOperation,
+)
+
+from oracle_of_ammon.utils.logger import configure_logger
+
+logger: logging.Logger = configure_logger()
+
+# Meta fields with inverted lists; "*" indexes every field. Filters on other fields
+# still work, by checking each document's meta.
+METADATA_INDEX_FIELDS: str = os.environ.get(
+    "METADATA_INDEX_FIELDS", "filename,page,sheet"
+)
+
+RANGES: Dict[type, Callable[[Any, Any], bool]] = {
+    GtOperation: operator.gt,
+    GteOperation: operator.ge,
+    LtOperation: operator.lt,
+    LteOperation: operator.le,
+}
+
+
+# Documents at build time, embedding matrix, row norms, rows with an embedding
+Matrix = Tuple[List[Document], np.ndarray, np.ndarray, np.ndarray]
+
+
+def parse_fields(value: str) -> Optional[FrozenSet[str]]:
+    """Parses ``"name,page"`` into a set of fields, or ``None`` for ``"*"``."""
+    if value.strip() == "*":
+        return None
+    return frozenset(field.strip() for field in value.split(",") if field.strip())
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def scale_scores(scores: np.ndarray, similarity: str) -> np.ndarray:
+    """Vectorized ``BaseDocumentStore.scale_to_unit_interval``."""
+    if similarity == "cosine":
+        return (scores + 1) / 2
+    return 1 / (1 + np.exp(-scores / 100))
+
+
+class MetadataIndex:
+    """Documents of one shard in row order, with inverted lists of their meta values.
+
+    Filters are evaluated to a boolean row mask with set lookups on indexed fields;
+    only unindexed fields and unhashable values are checked document by document.
+    The embedding matrix is built on the first query after a change, and documents
+    then keep views of its rows, so embeddings are not held twice.
+    """
+
+    def __init__(self, fields: Optional[FrozenSet[str]] = None):
+        self.fields = fields
+        self.documents: List[Document] = []
+        self.rows: Dict[str, int] = {}
+        # field -> value -> rows, and field -> rows whose value cannot be hashed
+        self.postings: Dict[str, Dict[Any, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self.unhashable: Dict[str, Set[int]] = defaultdict(set)
+        self._entries: List[List[Tuple[str, Any]]] = []
+        self._matrix: Optional[Matrix] = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _index(self, row: int) -> None:
+        meta: dict = self.documents[row].meta or {}
+        entries: List[Tuple[str, Any]] = [
+            (field, value)
+            for field, value in meta.items()
+            if self.fields is None or field in self.fields
+        ]
+        for field, value in entries:
+            if _hashable(value):
+                self.postings[field][value].add(row)
+            else:
+                self.unhashable[field].add(row)
+        self._entries[row] = entries
+
+    def _unindex(self, row: int) -> None:
+        for field, value in self._entries[row]:
+            if _hashable(value):
+                rows = self.postings[field][value]
+                rows.discard(row)
+                if not rows:
+                    del self.postings[field][value]
+            else:
+                self.unhashable[field].discard(row)
+        self._entries[row] = []
+
+    def add(self, documents: Iterable[Document]) -> None:
+        """Adds documents, replacing stored documents with the same id."""
+        for document in documents:
+            row = self.rows.get(document.id)
+            if row is None:
+                row = len(self.documents)
+                self.rows[document.id] = row
+                self.documents.append(document)
+                self._entries.append([])
+            else:
+                self._unindex(row)
+                self.documents[row] = document
+            self._index(row)
+        self._matrix = None
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Removes documents; the last row moves into each freed row."""
+        for id in ids:
+            row = self.rows.pop(id, None)
+            if row is None:
+                continue
+            self._unindex(row)
+            last: int = len(self.documents) - 1
+            if row != last:
+                self._unindex(last)
+                self.documents[row] = self.documents[last]
+                self.rows[self.documents[row].id] = row
+                self._index(row)
+            self.documents.pop()
+            self._entries.pop()
+        self._matrix = None
+
+    def invalidate(self) -> None:
+        """Drops the embedding matrix after embeddings were replaced in place."""
+        self._matrix = None
+
+    def matrix(self) -> Matrix:
+        """Documents, their float32 embedding matrix, its row norms and the rows embedded.
+
+        The result stays valid after later writes; callers must hold the store lock
+        while it is built, as documents are pointed at the new rows.
+        """
+        if self._matrix is None:
+            embeddings = [document.embedding for document in self.documents]
+            dimension: int = next(
+                (
+                    np.shape(e)[0]
+                    for e in embeddings
+                    if e is not None and np.ndim(e) == 1
+                ),
+                0,
+            )
+            matrix = np.zeros((len(embeddings), dimension), dtype=np.float32)
+            embedded = np.zeros(len(embeddings), dtype=bool)
+            for row, embedding in enumerate(embeddings):
+                if embedding is None:
+                    continue
+                if np.shape(embedding) != (dimension,):
+                    logger.warning(
+                        f"Skipping document {self.documents[row].id}: embedding "
+                        f"shape {np.shape(embedding)} differs from ({dimension},)"
+                    )
+                    continue
+                matrix[row] = embedding
+                embedded[row] = True
+                self.documents[row].embedding = matrix[row]
+            self._matrix = (
+                list(self.documents),
+                matrix,
+                np.linalg.norm(matrix, axis=1),
+                embedded,
+            )
+        return self._matrix
+
+    def mask(self, clause) -> np.ndarray:
+        """Rows matching a parsed haystack filter."""
+        if isinstance(clause, AndOperation):
+            mask = np.ones(len(self), dtype=bool)
+            for condition in clause.conditions:
+                mask &= self.mask(condition)
+            return mask
+        if isinstance(clause, (OrOperation, NotOperation)):
+            mask = np.zeros(len(self), dtype=bool)
+            for condition in clause.conditions:
+                mask |= self.mask(condition)
+            return ~mask if isinstance(clause, NotOperation) else mask
+        return self._comparison(clause)
+
+    def _rows(self, rows: Iterable[Set[int]]) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        for matched in rows:
+            mask[list(matched)] = True
+        return mask
+
+    def _scan(self, comparison) -> np.ndarray:
+        return np.fromiter(
+            (comparison.evaluate(document.meta) for document in self.documents),
+            dtype=bool,
+            count=len(self),
+        )
+
+    def _comparison(self, comparison) -> np.ndarray:
+        field: str = comparison.field_name
+        value: Any = comparison.comparison_value
+        if self.fields is not None and field not in self.fields:
+            return self._scan(comparison)
+
+        postings: Dict[Any, Set[int]] = self.postings.get(field, {})
+        if isinstance(comparison, (EqOperation, NeOperation)):
+            if not _hashable(value):
+                return self._scan(comparison)
+            mask = self._rows([postings.get(value, set())])
+        elif isinstance(comparison, (InOperation, NinOperation)):
+            if not all(_hashable(item) for item in value):
+                return self._scan(comparison)
+            mask = self._rows(postings.get(item, set()) for item in value)
+        elif type(comparison) in RANGES:
+            compare = RANGES[type(comparison)]
+            mask = self._rows(
+                rows for key, rows in postings.items() if compare(key, value)
+            )
+        else:
+            return self._scan(comparison)
+
+        if isinstance(comparison, (NeOperation, NinOperation)):
+            mask = self._rows(postings.values()) & ~mask
+        # Lists and dicts in meta are compared like InMemoryDocumentStore does.
+        for row in self.unhashable.get(field, ()):
+            mask[row] = comparison.evaluate(self.documents[row].meta)
+        return mask
@@ -0,0 +1,79 @@
+import base64
+import itertools
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from haystack import Document
+
+from oracle_of_ammon.api.utils.serialization import dumps
+
+FIELDS: Tuple[str, ...] = ("all", "content", "ids")
+
+
+def encode_cursor(shard: str, id: str) -> str:
+    payload = json.dumps({"shard": shard, "after": id}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+    """The ``(shard, id)`` to resume after, or None to start from the beginning."""
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        shard, after = payload["shard"], payload["after"]
+    except Exception:
+        raise ValueError("Invalid cursor.") from None
+    if not isinstance(shard, str) or not isinstance(after, str):
+        raise ValueError("Invalid cursor.")
+    return shard, after
+
+
+def paginate(
+    documents: Iterable[Tuple[str, Document]], page_size: Optional[int]
+) -> Tuple[Iterator[Document], Optional[str]]:
+    """Returns up to ``page_size`` documents plus the cursor of the last one.
+
+    ``documents`` are ``(shard, document)`` pairs in keyset order, already resumed
+    after the requested cursor. Without a page size they are returned lazily.
+    """
+    if page_size is None:
+        return (document for _, document in documents), None
+
+    page: List[Tuple[str, Document]] = list(itertools.islice(documents, page_size + 1))
+    next_cursor: Optional[str] = None
+    if len(page) > page_size:
+        shard, last = page[page_size - 1]
+        next_cursor = encode_cursor(shard, last.id)
+    return (document for _, document in page[:page_size]), next_cursor
+
+
+def project(document: Document, fields: str = "all") -> dict:
+    """Shapes a document for listing responses; embeddings only come with ``all``."""
+    if fields == "ids":
+        return {"id": document.id}
+    projected: dict = {
+        "id": document.id,
+        "content": document.content,
+        "content_type": document.content_type,
+    }
+    if fields == "all":
+        projected["meta"] = document.meta
+        projected["score"] = document.score
+        if document.embedding is not None:
+            projected["embedding"] = document.embedding
+    return projected
+
+
+def stream_json(
+    documents: Iterable[Document], fields: str, next_cursor: Optional[str]
+) -> Iterator[bytes]:
+    yield b'{"documents": ['
+    for position, document in enumerate(documents):
+        yield (b"," if position else b"") + dumps(project(document, fields))
+    yield b'], "next_cursor": ' + dumps(next_cursor) + b"}"
+
+
+def stream_ndjson(documents: Iterable[Document], fields: str) -> Iterator[bytes]:
+    for document in documents:
+        yield dumps(project(document, fields)) + b"\n"
@@ -0,0 +1,271 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from haystack import Document
+from haystack.modeling.data_handler.samples import (
+    Sample,
+    SampleBasket,
+    get_passage_offsets,
+)
+
+from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+logger: logging.Logger = configure_logger()
+
+MAX_WINDOW_LAYOUTS: int = 8
+
+
+class TokenizedPassage:
+    """A document tokenized the way ``SquadProcessor`` does, and its sliding windows."""
+
+    def __init__(self, text: str, encoding: Any):
+        self.text = text
+        self.tokens: List[int] = encoding.ids
+        self.offsets: np.ndarray = np.asarray(
+            [offset[0] for offset in encoding.offsets], dtype="int16"
+        )
+        self.start_of_word: list = [1] + list(
+            np.ediff1d(np.asarray(encoding.word_ids, dtype="int16"))
+        )
+        self.token_strings: List[str] = encoding.tokens
+        # (doc_stride, passage length in tokens) -> windows
+        self.windows: "OrderedDict[Tuple[int, int], List[dict]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def passages(self, doc_stride: int, passage_len_t: int) -> List[dict]:
+        # A passage that fits in one window is windowed the same for any length.
+        key = (
+            (0, len(self))
+            if 0 < len(self) <= passage_len_t
+            else (doc_stride, passage_len_t)
+        )
+        if key in self.windows:
+            self.windows.move_to_end(key)
+        else:
+            self.windows[key] = [
+                {
+                    "passage_id": span["passage_id"],
+                    "passage_start_t": span["passage_start_t"],
+                    "passage_start_c": span["passage_start_c"],
+                    "passage_text": self.text[
+                        span["passage_start_c"] : span["passage_end_c"]
+                    ],
+                    "passage_tokens": self.tokens[
+                        span["passage_start_t"] : span["passage_end_t"]
+                    ],
+                    "passage_start_of_word": self.start_of_word[
+                        span["passage_start_t"] : span["passage_end_t"]
+                    ],
+                }
+                for span in get_passage_offsets(
+                    self.offsets, doc_stride, passage_len_t, self.text
+                )
+            ]
+            # Question lengths vary, so only the most recent layouts are kept.
+            while len(self.windows) > MAX_WINDOW_LAYOUTS:
+                self.windows.popitem(last=False)
+        return self.windows[key]
+
+
+class PassageCache:
+    """Bounded LRU of reader tokenizations, keyed by document id and content hash.
+
+    ``install`` routes a ``SquadProcessor``'s inference path through the cache, so a
+    retrieved chunk is tokenized and windowed once per ``max_seq_len`` and
+    ``doc_stride``; per request only the question is tokenized and joined with the
+    cached windows. Training data still goes through the processor unchanged.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], TokenizedPassage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(id: Optional[str], text: str) -> Tuple[str, str]:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return (id or "", digest)
+
+    def get(
+        self, tokenizer, texts: List[str], ids: List[Optional[str]]
+    ) -> List[TokenizedPassage]:
+        """Tokenizations of ``texts``; misses are tokenized together in one batch."""
+        keys = [self.key(id, text) for id, text in zip(ids, texts)]
+        with self._lock:
+            found: Dict[Tuple[str, str], TokenizedPassage] = {}
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        missing: Dict[Tuple[str, str], str] = {
+            key: text for key, text in zip(keys, texts) if key not in found
+        }
+        metrics.increment("passage_cache.hits", len(keys) - len(missing))
+        metrics.increment("passage_cache.misses", len(missing))
+        if missing:
+            tokenized = tokenizer(
+                text=list(missing.values()),
+                return_offsets_mapping=True,
+                return_special_tokens_mask=True,
+                add_special_tokens=False,
+                verbose=False,
+            )
+            for key, text, encoding in zip(
+                missing.keys(), missing.values(), tokenized.encodings
+            ):
+                found[key] = TokenizedPassage(text=text, encoding=encoding)
+            if self.max_entries > 0:
+                with self._lock:
+                    for key in missing:
+                        self._entries[key] = found[key]
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        return [found[key] for key in keys]
+
+    def token_counts(self, tokenizer, documents: List[Document]) -> List[int]:
+        passages = self.get(
+            tokenizer,
+            [document.content for document in documents],
+            [document.id for document in documents],
+        )
+        return [len(passage) for passage in passages]
+
+    def install(self, processor) -> None:
+        """Serves ``processor.dataset_from_dicts`` at inference time from the cache."""
+        processor.dataset_from_dicts = partial(
+            self.dataset_from_dicts, processor, type(processor).dataset_from_dicts
+        )
+
+    def dataset_from_dicts(
+        self,
+        processor,
+        uncached,
+        dicts: List[dict],
+        indices: List[int] = [],
+        return_baskets: bool = False,
+        debug: bool = False,
+    ):
+        if not return_baskets:
+            return uncached(processor, dicts, indices, return_baskets, debug)
+
+        pre_baskets = [processor.convert_qa_input_dict(d) for d in dicts]
+        indices = indices or list(range(len(pre_baskets)))
+        passages = self.get(
+            processor.tokenizer,
+            [pre_basket["context"] for pre_basket in pre_baskets],
+            [
+                pre_basket["qas"][0].get("id") if pre_basket["qas"] else None
+                for pre_basket in pre_baskets
+            ],
+        )
+        questions: Dict[str, Any] = {}
+        n_special_tokens: int = processor.tokenizer.num_special_tokens_to_add(pair=True)
+
+        baskets: List[SampleBasket] = []
+        for position, (pre_basket, passage) in enumerate(zip(pre_baskets, passages)):
+            for i_q, qa in enumerate(pre_basket["qas"]):
+                if qa["question"] not in questions:
+                    questions[qa["question"]] = processor.tokenizer(
+                        qa["question"],
+                        return_offsets_mapping=True,
+                        return_special_tokens_mask=True,
+                        add_special_tokens=False,
+                    ).encodings[0]
+                basket = self._basket(
+                    processor=processor,
+                    passage=passage,
+                    question=qa["question"],
+                    encoding=questions[qa["question"]],
+                    id_internal=f"{indices[position]}-{i_q}",
+                    id_external=qa["id"],
+                    n_special_tokens=n_special_tokens,
+                )
+                baskets.append(basket)
+
+        baskets = processor._passages_to_pytorch_features(baskets, return_baskets)
+        dataset, tensor_names, baskets = processor._create_dataset(baskets)
+        return dataset, tensor_names, processor.problematic_sample_ids, baskets
+
+    @staticmethod
+    def _basket(
+        processor,
+        passage: TokenizedPassage,
+        question: str,
+        encoding: Any,
+        id_internal: str,
+        id_external: Optional[str],
+        n_special_tokens: int,
+    ) -> SampleBasket:
+        """What ``tokenize_batch_question_answering`` and ``_split_docs_into_passages`` build."""
+        question_tokens = encoding.ids
+        question_offsets = [offset[0] for offset in encoding.offsets]
+        question_start_of_word = [1] + list(
+            np.ediff1d(np.asarray(encoding.word_ids, dtype="int16"))
+        )
+        raw = {
+            "document_text": passage.text,
+            "document_tokens": passage.tokens,
+            "document_offsets": passage.offsets,
+            "document_start_of_word": passage.start_of_word,
+            "question_text": question,
+            "question_tokens": question_tokens,
+            "question_offsets": question_offsets,
+            "question_start_of_word": question_start_of_word,
+            "answers": [],
+            "document_tokens_strings": passage.token_strings,
+            "question_tokens_strings": encoding.tokens,
+        }
+        basket = SampleBasket(
+            raw=raw, id_internal=id_internal, id_external=id_external, samples=None
+        )
+        if passage.text == "":
+            logger.warning("Ignoring sample with empty context")
+            basket.samples = []
+            return basket
+
+        max_query_length: int = processor.max_query_length
+        passage_len_t: int = (
+            processor.max_seq_len
+            - len(question_tokens[:max_query_length])
+            - n_special_tokens
+        )
+        try:
+            windows = passage.passages(processor.doc_stride, passage_len_t)
+        except Exception as e:
+            logger.warning(
+                f"Could not divide document into passages. Document: "
+                f"{passage.text[:200]}\nWith error: {e}"
+            )
+            windows = []
+        basket.samples = [
+            Sample(
+                id=f"{id_internal}-{window['passage_id']}",
+                clear_text={
+                    "passage_text": window["passage_text"],
+                    "question_text": question,
+                    "passage_id": window["passage_id"],
+                },
+                tokenized={
+                    "passage_start_t": window["passage_start_t"],
+                    "passage_start_c": window["passage_start_c"],
+                    "passage_tokens": window["passage_tokens"],
+                    "passage_start_of_word": window["passage_start_of_word"],
+                    "question_tokens": question_tokens[:max_query_length],
+                    "question_offsets": question_offsets[:max_query_length],
+                    "question_start_of_word": question_start_of_word[:max_query_length],
+                },
+            )
+            for window in windows
+        ]
+        return basket
@@ -0,0 +1,154 @@
+import logging
+import os
+import re
+import subprocess  # nosec
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import reduce
+from typing import Deque, Iterator, List, Optional, Set, Tuple
+
+from oracle_of_ammon.utils.logger import configure_logger
+
+logger: logging.Logger = configure_logger()
+
+PDF_PAGES_PER_BATCH: int = int(os.environ.get("PDF_PAGES_PER_BATCH", 16))
+# Concurrent pdftotext processes across all uploads.
+PDF_WORKERS: int = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    # Threads only wait on pdftotext, so one shared pool bounds the processes.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, PDF_WORKERS), thread_name_prefix="pdf"
+            )
+        return _executor
+
+
+def count_pages(path: str) -> int:
+    """Reads the page count of a PDF with poppler's ``pdfinfo``."""
+    output: str = subprocess.run(
+        ["pdfinfo", path], capture_output=True, check=True, text=True
+    ).stdout
+    match = re.search(r"^Pages:\s+(\d+)", output, flags=re.MULTILINE)
+    if match is None:
+        raise ValueError(f"Unable to read page count of {path}")
+    return int(match.group(1))
+
+
+def extract_pages(
+    path: str, first_page: int, last_page: int, encoding: str = "UTF-8"
+) -> List[str]:
+    """Extracts pages ``first_page`` through ``last_page`` (1-based, inclusive) with ``pdftotext``.
+
+    Pages are read in content stream order and their lines rejoined, as
+    ``PDFToTextConverter`` does.
+    """
+    output: bytes = subprocess.run(
+        [
+            "pdftotext",
+            "-enc",
+            encoding,
+            "-raw",
+            "-f",
+            str(first_page),
+            "-l",
+            str(last_page),
+            path,
+            "-",
+        ],
+        capture_output=True,
+        check=True,
+    ).stdout
+    pages: List[str] = output.decode(encoding, errors="ignore").split("\f")
+    # pdftotext terminates every page with a form feed
+    return [
+        "\n".join(page.splitlines()) for page in pages[: last_page - first_page + 1]
+    ]
+
+
+def _ngrams(text: str, min_ngram: int, max_ngram: int) -> Set[str]:
+    # Newlines and tabs count as words but keep their place in the text.
+    words: List[str] = text.replace("\n", " \n").replace("\t", " \t").split(" ")
+    return {
+        " ".join(words[i : i + n]).replace(" \n", "\n").replace(" \t", "\t")
+        for n in range(min_ngram, max_ngram)
+        for i in range(len(words) - n + 1)
+    }
+
+
+def longest_common_ngram(
+    texts: List[str], min_ngram: int = 3, max_ngram: int = 30
+) -> Optional[str]:
+    """The longest run of words that occurs in every non-empty text, if any."""
+    texts = [text for text in texts if text]
+    if not texts:
+        return None
+    common: Set[str] = reduce(
+        set.intersection, (_ngrams(text, min_ngram, max_ngram) for text in texts)
+    )
+    return max(common, key=len) if common else None
+
+
+def remove_header_footer(
+    pages: List[str],
+    n_chars: int = 300,
+    n_first_pages_to_ignore: int = 1,
+    n_last_pages_to_ignore: int = 1,
+) -> List[str]:
+    """Removes the longest text repeated at the start and at the end of the pages.
+
+    Only the first and last ``n_chars`` of each page are searched, and the first and
+    last pages, often a title or an index, are not required to repeat it.
+    """
+    considered: List[str] = pages[
+        n_first_pages_to_ignore : len(pages) - n_last_pages_to_ignore
+    ]
+    header = longest_common_ngram([page[:n_chars] for page in considered])
+    if header:
+        pages = [page.replace(header, "") for page in pages]
+        considered = [page.replace(header, "") for page in considered]
+    footer = longest_common_ngram([page[-n_chars:] for page in considered])
+    if footer:
+        pages = [page.replace(footer, "") for page in pages]
+    logger.debug(f"Removed header '{header}' and footer '{footer}' from PDF pages")
+    return pages
+
+
+def iter_page_batches(
+    path: str,
+    pages_per_batch: int = PDF_PAGES_PER_BATCH,
+    workers: int = PDF_WORKERS,
+) -> Iterator[Tuple[int, List[str]]]:
+    """Yields ``(first_page, pages)`` in page order while later batches are extracted.
+
+    At most ``2 * workers`` batches are in flight, so memory is bounded by the batch
+    size rather than the size of the document.
+    """
+    page_count: int = count_pages(path)
+    ranges = (
+        (first, min(first + pages_per_batch - 1, page_count))
+        for first in range(1, page_count + 1, pages_per_batch)
+    )
+    executor: ThreadPoolExecutor = _pool()
+    in_flight: Deque[Tuple[int, Future]] = deque()
+    try:
+        for first, last in ranges:
+            in_flight.append((first, executor.submit(extract_pages, path, first, last)))
+            if len(in_flight) >= 2 * max(1, workers):
+                first_page, future = in_flight.popleft()
+                yield first_page, future.result()
+
+        while in_flight:
+            first_page, future = in_flight.popleft()
+            yield first_page, future.result()
+    finally:
+        # Batches nobody will read are not extracted.
+        for _, future in in_flight:
+            future.cancel()
@@ -0,0 +1,120 @@
+import copy
+import logging
+import math
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Union
+
+from haystack import Document
+from haystack.nodes import PreProcessor
+from haystack.nodes.preprocessor.preprocessor import iso639_to_nltk
+
+from oracle_of_ammon.utils.logger import configure_logger
+
+logger: logging.Logger = configure_logger()
+
+# Same adjustment haystack applies to punkt's period context so that whitespace
+# after a sentence is kept with it and splits can be rejoined losslessly.
+PERIOD_CONTEXT_FMT: str = r"""
+    %(SentEndChars)s             # a potential sentence ending
+    \s*                          # match potential whitespace (is originally in lookahead assertion)
+    (?=(?P<after_tok>
+        %(NonWord)s              # either other punctuation
+        |
+        (?P<next_tok>\S+)        # or some other token - original version: \s+(?P<next_tok>\S+)
+    ))"""
+
+_worker_preprocessor: Optional["FastPreProcessor"] = None
+
+
+def _init_worker(params: dict) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = FastPreProcessor(workers=1, **params)
+
+
+def _process_in_worker(
+    documents: List[Document], id_hash_keys: Optional[List[str]], kwargs: dict
+) -> List[Document]:
+    return _worker_preprocessor._process_batch(
+        documents, id_hash_keys=id_hash_keys, **kwargs
+    )
+
+
+class FastPreProcessor(PreProcessor):
+    """Drop-in PreProcessor that produces the same documents, faster.
+
+    The punkt sentence tokenizer and its period-context pattern are compiled once per
+    instance instead of on every document, and batches of at least
+    ``min_parallel_documents`` documents are cleaned and split in a process pool.
+    """
+
+    def __init__(
+        self,
+        workers: int = int(os.environ.get("PREPROCESS_WORKERS", os.cpu_count() or 1)),
+        min_parallel_documents: int = 8,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.workers = max(1, workers)
+        self.min_parallel_documents = min_parallel_documents
+        self._params: dict = kwargs
+        self._sentence_tokenizer = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def _split_sentences(self, text: str) -> List[str]:
+        if self._sentence_tokenizer is None:
+            tokenizer = copy.deepcopy(
+                self._load_sentence_tokenizer(iso639_to_nltk.get(self.language))
+            )
+            tokenizer._lang_vars._re_period_context = re.compile(
+                PERIOD_CONTEXT_FMT
+                % {
+                    "NonWord": tokenizer._lang_vars._re_non_word_chars,
+                    "SentEndChars": tokenizer._lang_vars._re_sent_end_chars,
+                },
+                re.UNICODE | re.VERBOSE,
+            )
+            self._sentence_tokenizer = tokenizer
+        return self._sentence_tokenizer.tokenize(text)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._params,),
+            )
+        return self._executor
+
+    def _process_batch(
+        self,
+        documents: List[Union[dict, Document]],
+        id_hash_keys: Optional[List[str]] = None,
+        **kwargs,
+    ) -> List[Document]:
+        if self.workers == 1 or len(documents) < self.min_parallel_documents:
+            return super()._process_batch(
+                documents=documents, id_hash_keys=id_hash_keys, **kwargs
+            )
+
+        size: int = math.ceil(len(documents) / (self.workers * 4))
+        batches = [documents[i : i + size] for i in range(0, len(documents), size)]
+        try:
+            results = self._pool().map(
+                _process_in_worker, batches, repeat(id_hash_keys), repeat(kwargs)
+            )
+            return [document for batch in results for document in batch]
+        except Exception as e:
+            logger.warning(f"Parallel preprocessing failed, continuing serially: {e}")
+            return super()._process_batch(
+                documents=documents, id_hash_keys=id_hash_keys, **kwargs
+            )
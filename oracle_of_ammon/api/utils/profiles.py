@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional
+
+from oracle_of_ammon.utils.logger import configure_logger
+
+logger: logging.Logger = configure_logger()
+
+# Profiles loaded at startup; the first serves requests that do not name one.
+MODEL_PROFILES: str = os.environ.get("MODEL_PROFILES", "balanced")
+# JSON object of profile name -> fields, layered over the built-in profiles.
+MODEL_PROFILES_FILE: str = os.environ.get("MODEL_PROFILES_FILE", "")
+# Bytes of model weights all loaded profiles may hold together; 0 for no limit.
+MODEL_MEMORY_BUDGET: int = int(os.environ.get("MODEL_MEMORY_BUDGET", 0))
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """Models behind one tier. Profiles naming the same model share one instance,
+    and profiles with the same retriever share its indexes."""
+
+    name: str
+    faq_retriever: str = "sentence-transformers/all-MiniLM-L6-v2"
+    faq_embedding_dim: int = 384
+    semantic_retriever: str = "sentence-transformers/multi-qa-mpnet-base-dot-v1"
+    semantic_embedding_dim: int = 768
+    reader: str = "deepset/roberta-base-squad2"
+    summarizer: str = "facebook/bart-large-cnn"
+
+
+BUILTIN_PROFILES: Dict[str, ModelProfile] = {
+    "fast": ModelProfile(
+        name="fast",
+        semantic_retriever="sentence-transformers/multi-qa-MiniLM-L6-cos-v1",
+        semantic_embedding_dim=384,
+        reader="deepset/tinyroberta-squad2",
+        summarizer="sshleifer/distilbart-cnn-12-6",
+    ),
+    "balanced": ModelProfile(name="balanced"),
+    "accurate": ModelProfile(name="accurate", reader="deepset/roberta-large-squad2"),
+}
+
+
+def read_profiles(path: Optional[str] = None) -> Dict[str, ModelProfile]:
+    """Built-in profiles, overridden or extended by the JSON file at ``path``."""
+    profiles: Dict[str, ModelProfile] = dict(BUILTIN_PROFILES)
+    if not path:
+        return profiles
+    try:
+        with open(path) as file:
+            configured: dict = json.load(file)
+    except (OSError, ValueError) as e:
+        logger.error(f"Unable to read model profiles from {path}: {e}")
+        return profiles
+
+    known = {field.name for field in fields(ModelProfile)} - {"name"}
+    for name, settings in configured.items():
+        unknown = set(settings) - known
+        if unknown:
+            logger.warning(f"Ignoring profile '{name}' with unknown fields: {unknown}")
+            continue
+        base = profiles.get(name, ModelProfile(name=name))
+        profiles[name] = replace(base, **settings)
+    return profiles
+
+
+def select_profiles(
+    value: Optional[str], available: Dict[str, ModelProfile]
+) -> List[ModelProfile]:
+    """Parses ``"fast,balanced"`` into profiles, keeping the order; the first is the default."""
+    selected: List[ModelProfile] = []
+    for name in (value or "").split(","):
+        name = name.strip()
+        if not name or any(profile.name == name for profile in selected):
+            continue
+        if name not in available:
+            logger.warning(f"Ignoring unknown model profile: {name}")
+            continue
+        selected.append(available[name])
+    return selected or [available.get("balanced", BUILTIN_PROFILES["balanced"])]
+
+
+def requested_profile(params: dict) -> Optional[str]:
+    """Profile named by ``params["Profile"]["name"]``, if any."""
+    profile = params.get("Profile") or {}
+    return profile.get("name") if isinstance(profile, dict) else None
+
+
+def directory_name(kind: str, model: str) -> str:
+    """File-system safe name for the log of a ``kind`` store embedded with ``model``."""
+    return f"{kind}-{re.sub(r'[^A-Za-z0-9_.-]+', '--', model)}"
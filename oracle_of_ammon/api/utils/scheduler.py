@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from oracle_of_ammon.api.utils.stats import QuantileSketch
+from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+logger: logging.Logger = configure_logger()
+
+SCHEDULER_WORKERS: int = int(os.environ.get("SCHEDULER_WORKERS", os.cpu_count() or 1))
+
+
+@dataclass
+class PriorityClass:
+    """Share of the workers a class gets while others are busy, and its own cap."""
+
+    weight: float
+    concurrency: int
+
+
+# Endpoint -> (priority class, relative cost). Costs are rough CPU time ratios:
+# an FAQ lookup embeds one sentence, a summary runs BART over every document.
+WORKLOADS: Dict[str, Tuple[str, float]] = {
+    "faq-search": ("interactive", 1),
+    "document-search": ("interactive", 1),
+    "ask": ("interactive", 4),
+    "extractive-search": ("search", 10),
+    "search-summarization": ("search", 50),
+    "search-span-summarization": ("search", 50),
+    "document-summarization": ("bulk", 100),
+    "ingestion": ("bulk", 100),
+}
+
+
+def default_classes(workers: int = SCHEDULER_WORKERS) -> Dict[str, PriorityClass]:
+    return {
+        "interactive": PriorityClass(weight=8, concurrency=workers),
+        "search": PriorityClass(weight=4, concurrency=max(1, workers // 2)),
+        "bulk": PriorityClass(weight=1, concurrency=max(1, workers // 4)),
+    }
+
+
+def parse_classes(
+    value: Union[str, None], workers: int = SCHEDULER_WORKERS
+) -> Dict[str, PriorityClass]:
+    """Parses ``"name:weight:concurrency,..."`` on top of the default classes."""
+    classes = default_classes(workers)
+    if not value:
+        return classes
+    for item in value.split(","):
+        try:
+            name, weight, concurrency = item.split(":")
+            classes[name.strip()] = PriorityClass(
+                weight=float(weight), concurrency=int(concurrency)
+            )
+        except ValueError:
+            logger.warning(f"Ignoring malformed priority class: {item}")
+    return classes
+
+
+@dataclass
+class _Waiter:
+    name: str
+    finish: float
+    grant: Callable[[], None]
+    queued: float = field(default_factory=time.perf_counter)
+    granted: bool = False
+
+
+class Scheduler:
+    """Weighted fair queueing of requests over a fixed number of worker slots.
+
+    Every request is tagged with a virtual finish time of ``cost / weight`` after the
+    later of the scheduler's virtual clock and the previous request of its class, and
+    free slots go to the smallest tag among classes below their concurrency cap. A
+    class with a higher weight thus gets proportionally more of the workers under
+    load, and a backlog of costly bulk requests cannot delay a cheap lookup by more
+    than one bulk request's share.
+    """
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, PriorityClass]] = None,
+        workers: int = SCHEDULER_WORKERS,
+        workloads: Optional[Dict[str, Tuple[str, float]]] = None,
+    ):
+        self.workers = max(1, workers)
+        self.classes: Dict[str, PriorityClass] = (
+            classes
+            if classes is not None
+            else parse_classes(os.environ.get("SCHEDULER_CLASSES"), self.workers)
+        )
+        self.workloads = workloads if workloads is not None else dict(WORKLOADS)
+        self._lock = threading.Lock()
+        self._virtual_time: float = 0.0
+        self._last_finish: Dict[str, float] = {name: 0.0 for name in self.classes}
+        self._queues: Dict[str, Deque[_Waiter]] = {
+            name: deque() for name in self.classes
+        }
+        self._running: Dict[str, int] = {name: 0 for name in self.classes}
+        self._waits: Dict[str, QuantileSketch] = {
+            name: QuantileSketch() for name in self.classes
+        }
+
+    def resolve(
+        self, workload: str, requested: Optional[str] = None
+    ) -> Tuple[str, float]:
+        """Priority class and cost of ``workload``; callers may only lower the class."""
+        name, cost = self.workloads.get(workload, ("bulk", 1))
+        if (
+            requested in self.classes
+            and self.classes[requested].weight <= self.classes[name].weight
+        ):
+            name = requested
+        return name, cost
+
+    def _enqueue(self, name: str, cost: float, grant: Callable[[], None]) -> _Waiter:
+        with self._lock:
+            start = max(self._virtual_time, self._last_finish[name])
+            waiter = _Waiter(
+                name=name,
+                finish=start + cost / self.classes[name].weight,
+                grant=grant,
+            )
+            self._last_finish[name] = waiter.finish
+            self._queues[name].append(waiter)
+            self._dispatch()
+            return waiter
+
+    def _dispatch(self) -> None:
+        # Called with the lock held.
+        while sum(self._running.values()) < self.workers:
+            eligible = [
+                queue[0]
+                for name, queue in self._queues.items()
+                if queue and self._running[name] < self.classes[name].concurrency
+            ]
+            if not eligible:
+                return
+            waiter = min(eligible, key=lambda waiter: waiter.finish)
+            self._queues[waiter.name].popleft()
+            self._running[waiter.name] += 1
+            self._virtual_time = max(self._virtual_time, waiter.finish)
+            waiter.granted = True
+
+            wait: float = time.perf_counter() - waiter.queued
+            self._waits[waiter.name].add(wait)
+            metrics.observe(f"scheduler.{waiter.name}.wait_seconds", wait)
+            waiter.grant()
+
+    def _release(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self._running[waiter.name] -= 1
+            else:
+                self._queues[waiter.name].remove(waiter)
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, workload: str, requested: Optional[str] = None) -> Iterator[str]:
+        """Blocks the calling thread until ``workload`` may run."""
+        name, cost = self.resolve(workload, requested)
+        granted = threading.Event()
+        waiter = self._enqueue(name, cost, granted.set)
+        try:
+            granted.wait()
+            yield name
+        finally:
+            self._release(waiter)
+
+    @asynccontextmanager
+    async def aslot(
+        self, workload: str, requested: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Waits on the event loop, without holding a thread, until ``workload`` may run."""
+        name, cost = self.resolve(workload, requested)
+        loop = asyncio.get_running_loop()
+        granted: asyncio.Future = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(
+                lambda: granted.done() or granted.set_result(None)
+            )
+
+        waiter = self._enqueue(name, cost, grant)
+        try:
+            await granted
+            yield name
+        finally:
+            self._release(waiter)
+
+    def call(self, workload: str, function: Callable, *args, **kwargs):
+        with self.slot(workload):
+            return function(*args, **kwargs)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "weight": priority.weight,
+                    "concurrency": priority.concurrency,
+                    "queued": len(self._queues[name]),
+                    "running": self._running[name],
+                    "dispatched": self._waits[name].count,
+                    "wait_p50_seconds": self._waits[name].quantile(0.5),
+                    "wait_p99_seconds": self._waits[name].quantile(0.99),
+                }
+                for name, priority in self.classes.items()
+            }
@@ -0,0 +1,104 @@
+import json
+from typing import Any, Dict, Optional, Type
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from haystack import Answer, Document
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard encoder is used without it
+    orjson = None
+
+SPAN_FIELDS = ("start", "end")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def document_dict(document: Document, embedding: bool = False) -> Dict[str, Any]:
+    """Shapes a document like the ``Document`` schema; the embedding is null unless asked for."""
+    return {
+        "content": document.content,
+        "content_type": document.content_type,
+        "id": document.id,
+        "meta": document.meta,
+        "id_hash_keys": document.id_hash_keys,
+        "score": document.score,
+        "embedding": document.embedding if embedding else None,
+    }
+
+
+def _spans(spans: Optional[list]) -> Optional[list]:
+    if spans is None:
+        return None
+    return [{field: getattr(span, field) for field in SPAN_FIELDS} for span in spans]
+
+
+def answer_dict(answer: Answer) -> Dict[str, Any]:
+    return {
+        "answer": answer.answer,
+        "type": answer.type,
+        "score": answer.score,
+        "context": answer.context,
+        "offsets_in_document": _spans(answer.offsets_in_document),
+        "offsets_in_context": _spans(answer.offsets_in_context),
+        "document_id": answer.document_id,
+        "meta": answer.meta,
+    }
+
+
+def to_jsonable(value: Any, embedding: bool = False) -> Any:
+    if isinstance(value, Document):
+        return document_dict(value, embedding=embedding)
+    if isinstance(value, Answer):
+        return answer_dict(value)
+    if isinstance(value, dict):
+        return {key: to_jsonable(item, embedding) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item, embedding) for item in value]
+    return value
+
+
+def shape(
+    result: dict, model: Type[BaseModel], embedding: bool = False
+) -> Dict[str, Any]:
+    """Keeps the fields of ``model``, filling defaults, as ``response_model`` would.
+
+    Unlike ``response_model``, nothing is validated or copied: pipeline output is
+    trusted and converted in one pass.
+    """
+    shaped: Dict[str, Any] = {}
+    for name, field in model.__fields__.items():
+        if name in result:
+            shaped[name] = to_jsonable(result[name], embedding=embedding)
+        elif not field.required:
+            shaped[name] = field.get_default()
+    return shaped
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed; numpy values are supported."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from haystack import Document
+
+
+class QuantileSketch:
+    """DDSketch-style quantile sketch over non-negative values that supports deletion.
+
+    Values are counted in logarithmic buckets, so every quantile estimate is within
+    ``relative_accuracy`` of the true value and memory grows with the logarithm of
+    the largest value rather than with the number of values.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma: float = math.log(self.gamma)
+        self._buckets: Counter = Counter()
+        self._zeros: int = 0
+        self.count: int = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float) -> None:
+        if value <= 0:
+            self._zeros += 1
+        else:
+            self._buckets[self._key(value)] += 1
+        self.count += 1
+
+    def remove(self, value: float) -> None:
+        if value <= 0:
+            if not self._zeros:
+                return
+            self._zeros -= 1
+        else:
+            key = self._key(value)
+            if not self._buckets.get(key):
+                return
+            self._buckets[key] -= 1
+            if not self._buckets[key]:
+                del self._buckets[key]
+        self.count -= 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank: float = q * (self.count - 1)
+        seen: int = self._zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if rank < seen:
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self._buckets) / (self.gamma + 1)
+
+
+class IndexStatistics:
+    """Running document statistics for one index, updated as documents come and go.
+
+    Count, mean, min and max are exact; the median comes from a ``QuantileSketch``.
+    Reading the statistics does not touch the documents.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lengths: Counter = Counter()
+        self._files: Counter = Counter()
+        self._sketch = QuantileSketch()
+        self._min: Optional[int] = None
+        self._max: Optional[int] = None
+        self.count: int = 0
+        self.chars: int = 0
+        self.embeddings: int = 0
+        self.embedding_bytes: int = 0
+        self.last_write: Optional[float] = None
+
+    @staticmethod
+    def _length(document: Document) -> int:
+        return len(document.content) if isinstance(document.content, str) else 0
+
+    @staticmethod
+    def _embedding_bytes(document: Document) -> int:
+        return int(getattr(document.embedding, "nbytes", 0) or 0)
+
+    def add(self, documents: Iterable[Document]) -> None:
+        with self._lock:
+            for document in documents:
+                length = self._length(document)
+                self._lengths[length] += 1
+                self._sketch.add(length)
+                self._files[document.meta.get("filename")] += 1
+                self._min = length if self._min is None else min(self._min, length)
+                self._max = length if self._max is None else max(self._max, length)
+                self.count += 1
+                self.chars += length
+                if document.embedding is not None:
+                    self.embeddings += 1
+                    self.embedding_bytes += self._embedding_bytes(document)
+            self.last_write = time.time()
+
+    def remove(self, documents: Iterable[Document]) -> None:
+        with self._lock:
+            for document in documents:
+                length = self._length(document)
+                if not self._lengths[length]:
+                    continue
+                self._lengths[length] -= 1
+                if not self._lengths[length]:
+                    del self._lengths[length]
+                self._sketch.remove(length)
+                name = document.meta.get("filename")
+                self._files[name] -= 1
+                if not self._files[name]:
+                    del self._files[name]
+                self.count -= 1
+                self.chars -= length
+                if document.embedding is not None:
+                    self.embeddings -= 1
+                    self.embedding_bytes -= self._embedding_bytes(document)
+            # Extremes only need a rescan once the last document of that length is gone.
+            if self._min not in self._lengths:
+                self._min = min(self._lengths) if self._lengths else None
+            if self._max not in self._lengths:
+                self._max = max(self._lengths) if self._lengths else None
+            self.last_write = time.time()
+
+    def set_embeddings(self, documents: Iterable[Document]) -> None:
+        """Recounts embeddings after they were replaced in place."""
+        embeddings, embedding_bytes = 0, 0
+        for document in documents:
+            if document.embedding is not None:
+                embeddings += 1
+                embedding_bytes += self._embedding_bytes(document)
+        with self._lock:
+            self.embeddings, self.embedding_bytes = embeddings, embedding_bytes
+            self.last_write = time.time()
+
+    def replace_embeddings(self, changes: Iterable[tuple]) -> None:
+        """Counts ``(old, new)`` embedding replacements without a rescan."""
+        with self._lock:
+            for old, new in changes:
+                if old is not None:
+                    self.embeddings -= 1
+                    self.embedding_bytes -= int(getattr(old, "nbytes", 0) or 0)
+                if new is not None:
+                    self.embeddings += 1
+                    self.embedding_bytes += int(getattr(new, "nbytes", 0) or 0)
+            self.last_write = time.time()
+
+    def describe(self) -> Dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "chars_mean": self.chars / self.count if self.count else 0.0,
+                "chars_max": self._max or 0,
+                "chars_min": self._min or 0,
+                "chars_median": round(self._sketch.quantile(0.5)),
+                "files": len(self._files) - (None in self._files),
+                "embeddings": self.embeddings,
+                "embedding_bytes": self.embedding_bytes,
+                "last_write": self.last_write,
+            }
@@ -0,0 +1,301 @@
+import json
+import logging
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+import zlib
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from haystack import Document
+
+from oracle_of_ammon.api.utils.archive import (
+    document_record,
+    export_archive,
+    read_archive,
+)
+from oracle_of_ammon.utils.logger import configure_logger
+from oracle_of_ammon.utils.metrics import metrics
+
+logger: logging.Logger = configure_logger()
+
+WAL_SYNC_INTERVAL: float = float(os.environ.get("WAL_SYNC_INTERVAL", 0.05))
+FRAME = struct.Struct("<II")  # payload length, crc32 of payload
+HEADER_LENGTH = struct.Struct("<I")
+SEGMENT = re.compile(r"^log-(\d{8})\.wal$")
+CHECKPOINT = re.compile(r"^checkpoint-(\d{8})$")
+MANIFEST: str = "manifest.json"
+# Model and dimension of the embeddings a log holds, next to its segments.
+LOG_MANIFEST: str = "log.json"
+
+Record = Tuple[dict, Optional[np.ndarray]]
+
+
+def encode(header: dict, embeddings: Optional[np.ndarray] = None) -> bytes:
+    """Frames a JSON header followed by an optional raw float32 block.
+
+    Raises TypeError for values JSON cannot represent, rather than logging a string
+    that would replay as a different value.
+    """
+    data = json.dumps(header).encode("utf-8")
+    block = b"" if embeddings is None else np.asarray(embeddings, "<f4").tobytes()
+    payload = HEADER_LENGTH.pack(len(data)) + data + block
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode(payload: bytes, dimension: int) -> Record:
+    (length,) = HEADER_LENGTH.unpack_from(payload)
+    start = HEADER_LENGTH.size
+    header: dict = json.loads(payload[start : start + length])
+    block = payload[start + length :]
+    embeddings = (
+        np.frombuffer(block, dtype="<f4").reshape(-1, dimension) if block else None
+    )
+    return header, embeddings
+
+
+def write_record(documents: List[Document], **header) -> Record:
+    """Builds a ``write`` record; embeddings go into the raw block, not the JSON."""
+    records: List[dict] = [document_record(document) for document in documents]
+    embedded = [d.embedding for d in documents if d.embedding is not None]
+    return (
+        {"op": "write", "documents": records, **header},
+        np.stack(embedded) if embedded else None,
+    )
+
+
+def written_documents(header: dict, embeddings: Optional[np.ndarray]) -> List[dict]:
+    """Inverse of ``write_record``: document dicts with their embedding rows."""
+    row: int = 0
+    documents: List[dict] = []
+    for record in header["documents"]:
+        record = dict(record)
+        if record.pop("embedded", False):
+            record["embedding"] = embeddings[row]
+            row += 1
+        documents.append(record)
+    return documents
+
+
+class MutationLog:
+    """Append-only, checksummed log of document store mutations with checkpoints.
+
+    Records are appended to numbered segments and fsynced in groups by a background
+    thread: ``append`` returns a sequence number and ``wait`` blocks until it is on
+    disk, so concurrent writers share one fsync. A checkpoint made when segment ``n``
+    starts holds everything logged before it; recovery loads the newest checkpoint
+    and replays only the segments from ``n`` on.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dimension: int,
+        model: str = "",
+        sync_interval: float = WAL_SYNC_INTERVAL,
+    ):
+        self.directory = directory
+        self.dimension = dimension
+        self.model = model
+        self.sync_interval = sync_interval
+        os.makedirs(self.directory, exist_ok=True)
+        self._check_manifest()
+
+        self._lock = threading.Lock()
+        self._synced = threading.Condition(self._lock)
+        self._sequence: int = 0
+        self._synced_sequence: int = 0
+        self._closed: bool = False
+        self.segment: int = max(self.segments(), default=0) + 1
+        self._file: IO[bytes] = self._open(self.segment)
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="wal-sync", daemon=True
+        )
+        self._flusher.start()
+
+    def _check_manifest(self) -> None:
+        """Raises ValueError if the log was written for another model or dimension."""
+        path = os.path.join(self.directory, LOG_MANIFEST)
+        expected: dict = {"model": self.model, "dimension": self.dimension}
+        if not os.path.exists(path):
+            with open(path, "w") as file:
+                json.dump(expected, file)
+            return
+        with open(path) as file:
+            found: dict = json.load(file)
+        if found != expected:
+            raise ValueError(
+                f"Refusing to replay {self.directory}: it was logged for model "
+                f"'{found.get('model')}' with dimension {found.get('dimension')}, not "
+                f"'{self.model}' with dimension {self.dimension}."
+            )
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"log-{segment:08d}.wal")
+
+    def _open(self, segment: int) -> IO[bytes]:
+        return open(self._path(segment), "ab", buffering=0)
+
+    def segments(self) -> List[int]:
+        return sorted(
+            int(match.group(1))
+            for match in map(SEGMENT.match, os.listdir(self.directory))
+            if match
+        )
+
+    def size(self) -> int:
+        """Bytes logged since the latest checkpoint."""
+        checkpoint: int = self.latest_checkpoint()[0]
+        return sum(
+            os.path.getsize(self._path(segment))
+            for segment in self.segments()
+            if segment >= checkpoint
+        )
+
+    def append(self, header: dict, embeddings: Optional[np.ndarray] = None) -> int:
+        data = encode(header, embeddings)
+        with self._lock:
+            self._file.write(data)
+            self._sequence += 1
+            self._synced.notify_all()
+            metrics.increment("wal.records")
+            metrics.increment("wal.bytes", len(data))
+            return self._sequence
+
+    def wait(self, sequence: int) -> None:
+        """Blocks until the record ``sequence`` has been fsynced."""
+        with self._synced:
+            while self._synced_sequence < sequence and not self._closed:
+                self._synced.wait()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            with self._synced:
+                self._synced.wait_for(
+                    lambda: self._closed or self._sequence > self._synced_sequence
+                )
+                if self._closed:
+                    return
+            # Give concurrent writers time to join this fsync.
+            time.sleep(self.sync_interval)
+            with self._lock:
+                sequence, file = self._sequence, self._file
+            try:
+                os.fsync(file.fileno())
+            except (OSError, ValueError):
+                pass  # rotated or closed meanwhile, which fsyncs as well
+            with self._synced:
+                self._synced_sequence = max(self._synced_sequence, sequence)
+                metrics.increment("wal.fsyncs")
+                self._synced.notify_all()
+
+    def rotate(self) -> int:
+        """Starts a new segment and returns its number; earlier segments are final."""
+        with self._lock:
+            os.fsync(self._file.fileno())
+            self._synced_sequence = self._sequence
+            self._synced.notify_all()
+            self._file.close()
+            self.segment += 1
+            self._file = self._open(self.segment)
+            return self.segment
+
+    def replay(self, start: int) -> Iterator[Record]:
+        """Yields the records of segments ``start`` and later, stopping at a torn write."""
+        for segment in self.segments():
+            if segment < start:
+                continue
+            path = self._path(segment)
+            with open(path, "rb") as log:
+                data = log.read()
+            offset: int = 0
+            while offset + FRAME.size <= len(data):
+                length, checksum = FRAME.unpack_from(data, offset)
+                payload = data[offset + FRAME.size : offset + FRAME.size + length]
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                yield decode(payload, self.dimension)
+                offset += FRAME.size + length
+            if offset < len(data):
+                logger.warning(
+                    f"Discarding {len(data) - offset} bytes of a torn write in {path}"
+                )
+                with open(path, "r+b") as log:
+                    log.truncate(offset)
+
+    def latest_checkpoint(self) -> Tuple[int, Optional[str]]:
+        """Returns the segment the newest complete checkpoint covers up to, and its path."""
+        checkpoints = sorted(
+            (int(match.group(1)), os.path.join(self.directory, match.group(0)))
+            for match in map(CHECKPOINT.match, os.listdir(self.directory))
+            if match
+            and os.path.exists(os.path.join(self.directory, match.group(0), MANIFEST))
+        )
+        return checkpoints[-1] if checkpoints else (0, None)
+
+    def write_checkpoint(
+        self,
+        segment: int,
+        indexes: Dict[str, Tuple[List[Document], int]],
+        similarity: str,
+    ) -> None:
+        """Writes ``{index: (documents, shards)}`` as the checkpoint before ``segment``.
+
+        The manifest is written last, so a checkpoint interrupted halfway is ignored.
+        Older checkpoints and the segments it covers are removed afterwards.
+        """
+        path = os.path.join(self.directory, f"checkpoint-{segment:08d}")
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        manifest: Dict[str, dict] = {}
+        for number, (index, (documents, shards)) in enumerate(indexes.items()):
+            name = f"{number}.tar"
+            with open(os.path.join(path, name), "wb") as archive:
+                export_archive(
+                    documents=documents,
+                    fileobj=archive,
+                    index=index,
+                    dimension=self.dimension,
+                    model=self.model,
+                    similarity=similarity,
+                )
+                archive.flush()
+                os.fsync(archive.fileno())
+            manifest[index] = {"file": name, "shards": shards}
+        with open(os.path.join(path, MANIFEST), "w") as file:
+            json.dump({"segment": segment, "indexes": manifest}, file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        for match in map(CHECKPOINT.match, os.listdir(self.directory)):
+            if match and int(match.group(1)) < segment:
+                shutil.rmtree(os.path.join(self.directory, match.group(0)))
+        for old in self.segments():
+            if old < segment:
+                os.remove(self._path(old))
+
+    def read_checkpoint(self) -> Iterator[Tuple[str, int, Iterator[List[dict]]]]:
+        """Yields ``(index, shards, batches)`` for every index of the newest checkpoint."""
+        path = self.latest_checkpoint()[1]
+        if path is None:
+            return
+        with open(os.path.join(path, MANIFEST)) as file:
+            manifest: dict = json.load(file)
+        for index, entry in manifest["indexes"].items():
+            with open(os.path.join(path, entry["file"]), "rb") as archive:
+                yield index, entry["shards"], read_archive(
+                    fileobj=archive, dimension=self.dimension, model=self.model
+                )
+
+    def close(self) -> None:
+        with self._synced:
+            if self._closed:
+                return
+            os.fsync(self._file.fileno())
+            self._synced_sequence = self._sequence
+            self._closed = True
+            self._file.close()
+            self._synced.notify_all()
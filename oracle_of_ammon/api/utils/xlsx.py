@@ -0,0 +1,82 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+
+from oracle_of_ammon.utils.logger import configure_logger
+
+logger: logging.Logger = configure_logger()
+
+FAQ_COLUMNS: Tuple[str, ...] = ("question", "answer")
+
+
+def sheet_names(path: str) -> List[str]:
+    workbook = load_workbook(filename=path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def read_sheet(
+    path: str, sheet_name: str, columns: Sequence[str] = FAQ_COLUMNS
+) -> List[dict]:
+    """Streams one sheet row by row and keeps only ``columns``, located by the header row."""
+    workbook = load_workbook(filename=path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        names = [
+            str(cell).strip().lower() if cell is not None else "" for cell in header
+        ]
+        missing = [column for column in columns if column not in names]
+        if missing:
+            logger.warning(
+                f"Sheet '{sheet_name}' has no {missing} column(s), skipping."
+            )
+            return []
+
+        positions = [names.index(column) for column in columns]
+        records: List[dict] = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in positions]
+            if all(value is None for value in values):
+                continue
+            records.append(dict(zip(columns, values)))
+        return records
+    finally:
+        workbook.close()
+
+
+def iter_sheets(
+    path: str,
+    sheet_name: Optional[List[str]] = None,
+    workers: int = int(os.environ.get("XLSX_WORKERS", os.cpu_count() or 1)),
+) -> Iterator[Tuple[str, List[dict]]]:
+    """Yields ``(sheet, records)`` in workbook order while later sheets parse in a process pool.
+
+    At most ``2 * workers`` sheets are held in memory at once, however many the
+    workbook has.
+    """
+    available: List[str] = sheet_names(path)
+    if sheet_name is None:
+        selected = available
+    else:
+        selected = [name for name in sheet_name if name in available]
+        for name in set(sheet_name) - set(available):
+            logger.warning(f"Sheet '{name}' not found in workbook.")
+
+    in_flight: Deque[Tuple[str, Future]] = deque()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        for name in selected:
+            in_flight.append((name, executor.submit(read_sheet, path, name)))
+            if len(in_flight) >= 2 * max(1, workers):
+                name, future = in_flight.popleft()
+                yield name, future.result()
+
+        while in_flight:
+            name, future = in_flight.popleft()
+            yield name, future.result()
@@ -0,0 +1,92 @@
+"""Compares reader and summarizer throughput with and without length bucketing.
+
+Run with ``python -m oracle_of_ammon.benchmarks.batching``. Passages are the FAQ
+answers and document chunks indexed at startup, so short and long inputs are mixed.
+"""
+import os
+import time
+from typing import List
+
+from haystack import Document
+
+import oracle_of_ammon.api.oracle as oracle_module
+from oracle_of_ammon.api.oracle import Oracle
+from oracle_of_ammon.api.utils.deadline import Deadline
+from oracle_of_ammon.utils.metrics import metrics
+
+QUERY: str = "How far is Siwa from Memphis?"
+ROUNDS: int = int(os.environ.get("BENCHMARK_ROUNDS", 3))
+
+
+def passages(oracle: Oracle) -> List[Document]:
+    faq = [
+        Document(content=document.meta.get("answer", document.content))
+        for document in oracle.faq_document_store.get_all_documents()
+    ]
+    semantic = oracle.semantic_document_store.get_all_documents()
+    # Interleave short and long inputs, as retrieval across both stores does.
+    mixed = [document for pair in zip(faq, semantic) for document in pair]
+    return mixed + faq[len(semantic) :] + semantic[len(faq) :]
+
+
+def mean_since(before: dict, name: str) -> float:
+    after = metrics.snapshot()["summaries"][name]
+    previous = before.get(name, {"sum": 0.0, "count": 0})
+    return (after["sum"] - previous["sum"]) / (after["count"] - previous["count"])
+
+
+def run(oracle: Oracle, documents: List[Document], bucket: bool) -> dict:
+    oracle_module.BUCKET_BY_LENGTH = bucket
+    tier = oracle.resolve_tier({})
+    results: dict = {}
+    for component, call in (
+        (
+            "reader",
+            lambda: oracle._read(
+                query=QUERY,
+                documents=documents,
+                top_k=3,
+                deadline=Deadline(),
+                tier=tier,
+            ),
+        ),
+        (
+            "summarizer",
+            lambda: oracle._summarize(
+                documents=[Document(content=d.content) for d in documents],
+                deadline=Deadline(),
+                tier=tier,
+            ),
+        ),
+    ):
+        before = metrics.snapshot()["summaries"]
+        started = time.perf_counter()
+        for _ in range(ROUNDS):
+            call()
+        results[component] = {
+            "seconds": (time.perf_counter() - started) / ROUNDS,
+            "tokens_per_second": mean_since(before, f"{component}.tokens_per_second"),
+            "padding_ratio": mean_since(before, f"{component}.padding_ratio"),
+        }
+    return results
+
+
+def main() -> None:
+    oracle = Oracle()
+    documents = passages(oracle)
+    before = run(oracle, documents, bucket=False)
+    after = run(oracle, documents, bucket=True)
+    print(f"{len(documents)} passages, {ROUNDS} round(s)")
+    for component in ("reader", "summarizer"):
+        for label, result in (("fixed", before), ("bucketed", after)):
+            stats = result[component]
+            print(
+                f"{component:<10} {label:<8} "
+                f"{stats['seconds']:8.2f}s "
+                f"{stats['tokens_per_second']:10.1f} tokens/s "
+                f"{stats['padding_ratio']:6.1%} padding"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compares embedding throughput in this process with the multi-process embedder.
+
+Run with ``python -m oracle_of_ammon.benchmarks.embedding``. The semantic chunks
+indexed at startup are repeated up to ``BENCHMARK_CHUNKS`` and re-embedded both
+ways with the default profile's retriever; set ``EMBEDDING_WORKERS`` and
+``EMBEDDING_THREADS`` to try other layouts.
+"""
+import os
+import time
+from typing import List
+
+from haystack import Document
+
+from oracle_of_ammon.api.oracle import Oracle
+from oracle_of_ammon.api.utils.embedding import (
+    EMBEDDING_WORKERS,
+    BulkEmbedder,
+    batched,
+    retriever_settings,
+)
+
+CHUNKS: int = int(os.environ.get("BENCHMARK_CHUNKS", 8192))
+
+
+def chunks(oracle: Oracle) -> List[Document]:
+    documents = oracle.semantic_document_store.get_all_documents()
+    return [
+        Document(content=documents[i % len(documents)].content, id=str(i))
+        for i in range(CHUNKS)
+    ]
+
+
+def main() -> None:
+    oracle = Oracle()
+    documents = chunks(oracle)
+    retriever = oracle.semantic_retriever
+
+    started = time.perf_counter()
+    for batch in batched(documents, 256):
+        retriever.embed_documents(batch)
+    serial = len(documents) / (time.perf_counter() - started)
+
+    with BulkEmbedder(
+        settings=retriever_settings(retriever), workers=EMBEDDING_WORKERS
+    ) as embedder:
+        for _ in embedder.embed(documents):
+            pass
+        report = embedder.report()
+
+    print(f"{len(documents)} chunks, {retriever.embedding_model}")
+    print(f"in-process: {serial:.1f} chunks/s")
+    print(
+        f"{report['workers']} workers x {report['threads_per_worker']} threads: "
+        f"{report['chunks_per_second']:.1f} chunks/s, "
+        f"core utilization {report['core_utilization']:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
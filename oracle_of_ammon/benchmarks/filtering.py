@@ -0,0 +1,79 @@
+"""Compares filtered retrieval in ``InMemoryDocumentStore`` and ``ShardedDocumentStore``.
+
+Run with ``python -m oracle_of_ammon.benchmarks.filtering``. No models are loaded;
+documents get random embeddings and spread over ``BENCHMARK_FILES`` file names.
+"""
+import os
+import time
+from typing import Callable, List
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores import InMemoryDocumentStore
+
+from oracle_of_ammon.api.store import ShardedDocumentStore
+
+ROUNDS: int = int(os.environ.get("BENCHMARK_ROUNDS", 20))
+DOCUMENTS: int = int(os.environ.get("BENCHMARK_DOCUMENTS", 50_000))
+FILES: int = int(os.environ.get("BENCHMARK_FILES", 100))
+DIMENSION: int = 768
+
+
+def documents() -> List[Document]:
+    rng = np.random.default_rng(0)
+    embeddings = rng.random((DOCUMENTS, DIMENSION), dtype=np.float32)
+    return [
+        Document(
+            content=f"passage {i}",
+            meta={"filename": f"file-{i % FILES}.txt", "page": i % 50},
+            embedding=embeddings[i],
+        )
+        for i in range(DOCUMENTS)
+    ]
+
+
+def measure(query: Callable[[], list]) -> float:
+    query()
+    started: float = time.perf_counter()
+    for _ in range(ROUNDS):
+        query()
+    return 1e3 * (time.perf_counter() - started) / ROUNDS
+
+
+def main() -> None:
+    corpus = documents()
+    query_emb = np.random.default_rng(1).random(DIMENSION, dtype=np.float32)
+    stores = {
+        "InMemoryDocumentStore": InMemoryDocumentStore(
+            embedding_dim=DIMENSION, similarity="cosine"
+        ),
+        "ShardedDocumentStore": ShardedDocumentStore(
+            embedding_dim=DIMENSION, similarity="cosine"
+        ),
+    }
+    for store in stores.values():
+        store.write_documents(corpus)
+
+    cases = {
+        "unfiltered": None,
+        "one file": {"filename": "file-7.txt"},
+        "one file, pages 10-19": {
+            "filename": "file-7.txt",
+            "page": {"$gte": 10, "$lt": 20},
+        },
+    }
+    for case, filters in cases.items():
+        timings = {
+            name: measure(
+                lambda: store.query_by_embedding(query_emb, filters=filters, top_k=10)
+            )
+            for name, store in stores.items()
+        }
+        print(
+            f"{case}: "
+            + ", ".join(f"{name} {ms:.1f}ms" for name, ms in timings.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
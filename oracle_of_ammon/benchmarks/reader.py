@@ -0,0 +1,65 @@
+"""Measures FARMReader latency with and without the tokenized passage cache.
+
+Run with ``python -m oracle_of_ammon.benchmarks.reader``. Loads the reader model used by
+the Oracle; passages are synthetic and every round asks a different question about
+the same ``BENCHMARK_TOP_K`` passages, as repeated searches over popular chunks do.
+"""
+import os
+import time
+from typing import List
+
+from haystack import Document
+from haystack.nodes import FARMReader
+from torch.cuda import is_available
+
+from oracle_of_ammon.api.utils.passages import PassageCache
+
+ROUNDS: int = int(os.environ.get("BENCHMARK_ROUNDS", 10))
+TOP_K: int = int(os.environ.get("BENCHMARK_TOP_K", 10))
+WORDS: str = (
+    "The Oracle of Ammon was located in the Siwa Oasis in the Western Desert of "
+    "Egypt. Pilgrims crossed the desert to consult the oracle, and Alexander the "
+    "Great visited it in 331 BC on his way back from the Mediterranean coast. "
+)
+QUESTIONS: List[str] = [
+    "Where was the Oracle of Ammon?",
+    "Who visited the oracle?",
+    "When did Alexander visit the oracle?",
+    "Which desert did pilgrims cross?",
+]
+
+
+def documents() -> List[Document]:
+    return [Document(content=WORDS * (2 + i % 6)) for i in range(TOP_K)]
+
+
+def measure(reader: FARMReader, passages: List[Document]) -> float:
+    reader.predict(query=QUESTIONS[0], documents=passages, top_k=3)
+    started: float = time.perf_counter()
+    for i in range(ROUNDS):
+        reader.predict(query=QUESTIONS[i % len(QUESTIONS)], documents=passages, top_k=3)
+    return 1e3 * (time.perf_counter() - started) / ROUNDS
+
+
+def main() -> None:
+    reader = FARMReader(
+        model_name_or_path="deepset/roberta-base-squad2",
+        use_gpu=is_available(),
+        max_seq_len=386,
+        doc_stride=128,
+        batch_size=96,
+        progress_bar=False,
+    )
+    passages = documents()
+    uncached: float = measure(reader, passages)
+    cache = PassageCache()
+    cache.install(reader.inferencer.processor)
+    cached: float = measure(reader, passages)
+    print(
+        f"reader top_k={TOP_K}: uncached {uncached:.0f}ms, cached {cached:.0f}ms "
+        f"per request ({len(cache)} passages cached)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compares the cost of encoding search responses through ``response_model`` and ``respond``.
+
+Run with ``python -m oracle_of_ammon.benchmarks.serialization``. No models are
+loaded; responses are built from synthetic documents and answers.
+"""
+import asyncio
+import os
+import time
+from typing import Callable, List, Type
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from haystack import Answer, Document, Span
+from pydantic import BaseModel
+
+from oracle_of_ammon.api.models import Documents, SearchResponse
+from oracle_of_ammon.api.utils.serialization import FastJSONResponse, shape
+
+ROUNDS: int = int(os.environ.get("BENCHMARK_ROUNDS", 200))
+TOP_K: int = int(os.environ.get("BENCHMARK_TOP_K", 50))
+WORDS: str = "the oracle of ammon stood in the siwa oasis of the western desert "
+
+
+def documents(count: int, embedding_dim: int = 0) -> List[Document]:
+    return [
+        Document(
+            content=WORDS * 20,
+            meta={"name": f"file-{i}.txt", "page": i, "_split_id": i},
+            score=1.0 / (i + 1),
+            embedding=(
+                np.random.rand(embedding_dim).astype(np.float32)
+                if embedding_dim
+                else None
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def answers(count: int) -> List[Answer]:
+    return [
+        Answer(
+            answer="the siwa oasis",
+            score=1.0 / (i + 1),
+            context=WORDS * 5,
+            offsets_in_document=[Span(start=i, end=i + 14)],
+            offsets_in_context=[Span(start=14, end=28)],
+            document_id=str(i),
+            meta={"name": f"file-{i}.txt"},
+        )
+        for i in range(count)
+    ]
+
+
+def response_model(model: Type[BaseModel]) -> Callable[[dict], bytes]:
+    """What FastAPI does when an endpoint returns a dict with ``response_model``."""
+    field = create_response_field(name=f"Response_{model.__name__}", type_=model)
+    loop = asyncio.new_event_loop()
+
+    def encode(result: dict) -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=result)
+        )
+        return JSONResponse(content=content).body
+
+    return encode
+
+
+def fast(model: Type[BaseModel]) -> Callable[[dict], bytes]:
+    return lambda result: FastJSONResponse(content=shape(result, model)).body
+
+
+def measure(encode: Callable[[dict], bytes], result: dict) -> dict:
+    encode(result)
+    started: float = time.perf_counter()
+    for _ in range(ROUNDS):
+        body = encode(result)
+    return {
+        "microseconds": 1e6 * (time.perf_counter() - started) / ROUNDS,
+        "bytes": len(body),
+    }
+
+
+def main() -> None:
+    cases = {
+        f"document-search top_k={TOP_K}": (
+            Documents,
+            {"query": "Where?", "documents": documents(TOP_K)},
+        ),
+        f"document-search top_k={TOP_K}, embeddings attached": (
+            Documents,
+            {"query": "Where?", "documents": documents(TOP_K, embedding_dim=768)},
+        ),
+        f"extractive-search top_k={TOP_K}": (
+            SearchResponse,
+            {"query": "Where?", "answers": answers(TOP_K), "no_ans_gap": 0.0},
+        ),
+    }
+    for name, (model, result) in cases.items():
+        after = measure(fast(model), result)
+        try:
+            before = measure(response_model(model), result)
+        except ValueError:
+            # jsonable_encoder cannot encode numpy arrays.
+            print(
+                f"{name}: response_model fails, respond "
+                f"{after['microseconds']:.0f}us ({after['bytes']} bytes)"
+            )
+            continue
+        print(
+            f"{name}: response_model {before['microseconds']:.0f}us "
+            f"({before['bytes']} bytes), respond {after['microseconds']:.0f}us "
+            f"({after['bytes']} bytes), "
+            f"{before['microseconds'] / after['microseconds']:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
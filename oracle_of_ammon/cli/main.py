@@ -4,6 +4,7 @@ import pathlib
 import subprocess  # nosec
 from typing import Union
 
+import requests
 import typer
 
 from oracle_of_ammon.utils.logger import configure_logger
@@ -79,3 +80,54 @@ def locust() -> None:
         env=os.environ,
         shell=False,
     )
+
+
+@app.command(name="export")
+def export_index(
+    index: str = typer.Argument(..., help="Name of the index to export."),
+    output: pathlib.Path = typer.Option(
+        None, help="Archive path. Defaults to <index>.tar."
+    ),
+    faq: bool = typer.Option(default=False, help="Export from the FAQ store."),
+    url: str = typer.Option(
+        default="http://localhost:8000", help="Base URL of the running API."
+    ),
+) -> None:
+    """
+    Download an index, including its embeddings, from a running Oracle.
+    """
+    output = output or pathlib.Path(f"{index}.tar")
+    with requests.get(
+        f"{url}/indexes/{index}/export",
+        params={"is_faq": faq},
+        stream=True,
+        timeout=None,
+    ) as response:
+        response.raise_for_status()
+        with open(output, "wb") as archive:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                archive.write(chunk)
+    logger.debug(f"Exported '{index}' to {output}")
+
+
+@app.command(name="import")
+def import_index(
+    path: pathlib.Path = typer.Argument(..., help="Archive created by export."),
+    index: str = typer.Option(..., help="Index to load the archive into."),
+    faq: bool = typer.Option(default=False, help="Import into the FAQ store."),
+    url: str = typer.Option(
+        default="http://localhost:8000", help="Base URL of the running API."
+    ),
+) -> None:
+    """
+    Load an exported index into a running Oracle without re-embedding it.
+    """
+    with open(path, "rb") as archive:
+        response = requests.post(
+            f"{url}/indexes/{index}/import",
+            params={"is_faq": faq},
+            files={"file": (path.name, archive, "application/x-tar")},
+            timeout=None,
+        )
+    response.raise_for_status()
+    logger.debug(response.json()["message"])
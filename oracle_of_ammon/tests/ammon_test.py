@@ -1,16 +1,23 @@
 import logging
 import os
 import pathlib
+import time
 
+import pytest
 from fastapi.testclient import TestClient
 from httpx import Response
 from pydantic import parse_obj_as
 
 from oracle_of_ammon.api.ammon import app
 from oracle_of_ammon.api.models import (
+    AskResponse,
     Documents,
     HealthResponse,
     HTTPError,
+    Job,
+    Jobs,
+    MetricsResponse,
+    ReadyResponse,
     SearchResponse,
     SearchSummary,
     Summary,
@@ -22,6 +29,23 @@ logger: logging.Logger = configure_logger()
 client = TestClient(app)
 
 
+@pytest.fixture(scope="module", autouse=True)
+def lifespan():
+    # Entering the client runs the startup hook that builds the Oracle.
+    with client:
+        yield
+
+
+def wait_for_job(job_id: str, timeout: float = 600) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed", "cancelled"):
+            return job
+        time.sleep(0.5)
+    raise TimeoutError(f"Job {job_id} did not finish.")
+
+
 def test_root():
     response: Response = client.get("/")
     assert response.status_code == 200
@@ -51,6 +75,7 @@ def test_faq_upload():
         json={"index": "document", "is_faq": True},
     )
     assert response.status_code == 201
+    wait_for_job(response.json()["job_id"])
     file.close()
 
 
@@ -65,9 +90,24 @@ def test_semantic_upload():
         json={"index": "document", "is_faq": False},
     )
     assert response.status_code == 201
+    assert wait_for_job(response.json()["job_id"])["status"] == "completed"
     file.close()
 
 
+def test_list_jobs():
+    response: Response = client.get("/jobs", params={"limit": 5})
+    assert response.status_code == 200
+    assert parse_obj_as(Jobs, response.json())
+    assert parse_obj_as(
+        Job, client.get(f"/jobs/{response.json()['jobs'][0]['id']}").json()
+    )
+
+
+def test_unknown_job():
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.delete("/jobs/unknown").status_code == 404
+
+
 def test_get_faq():
     response: Response = client.post(
         "/get-documents", json={"index": "document", "is_faq": True}
@@ -84,6 +124,38 @@ def test_get_documents():
     assert parse_obj_as(Documents, response.json())
 
 
+def test_get_documents_paginated():
+    response: Response = client.post(
+        "/get-documents",
+        json={"index": "document", "is_faq": False, "page_size": 1, "fields": "ids"},
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["documents"]) == 1
+    assert set(page["documents"][0]) == {"id"}
+
+    if page["next_cursor"]:
+        response = client.post(
+            "/get-documents",
+            json={
+                "index": "document",
+                "is_faq": False,
+                "page_size": 1,
+                "cursor": page["next_cursor"],
+                "format": "ndjson",
+            },
+        )
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == 1
+
+
+def test_get_documents_invalid_cursor():
+    response: Response = client.post(
+        "/get-documents", json={"index": "document", "cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
 def test_semantic_summary():
     response: Response = client.post(
         "/summary", json={"index": "document", "is_faq": False}
@@ -140,6 +212,20 @@ def test_search_summarization():
     assert parse_obj_as(SearchSummary, response.json())
 
 
+def test_search_summarization_degrades_under_deadline():
+    response: Response = client.post(
+        "/search-summarization",
+        json={
+            "query": "What is the climate of Siwa?",
+            "params": {"Retriever": {"top_k": 3, "index": "document"}},
+        },
+        headers={"X-Request-Timeout": "0.001"},
+    )
+    assert response.status_code == 200
+    assert response.json()["degraded"]
+    assert all("summary" not in doc["meta"] for doc in response.json()["documents"])
+
+
 def test_document_summarization():
     file = open(
         file=pathlib.Path(os.getcwd(), "oracle_of_ammon", "data", "semantic.txt"),
@@ -165,3 +251,34 @@ def test_search_span_summarization():
     )
     assert response.status_code == 200
     assert parse_obj_as(Documents, response.json())
+
+
+def test_ask():
+    response: Response = client.post(
+        "/ask",
+        json={
+            "query": "Why are duplicate answers being returned?",
+            "params": {"Retriever": {"top_k": 3, "index": "document"}},
+        },
+    )
+    assert response.status_code == 200
+    assert parse_obj_as(AskResponse, response.json())
+    assert response.json()["tier"] in ("faq", "extractive")
+
+
+def test_ready():
+    deadline = time.time() + 600
+    response: Response = client.get("/ready")
+    while response.status_code == 503 and time.time() < deadline:
+        time.sleep(1)
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert parse_obj_as(ReadyResponse, response.json())
+    assert "reader" in response.json()["startup_seconds"]
+
+
+def test_metrics():
+    response: Response = client.get("/metrics")
+    assert response.status_code == 200
+    assert parse_obj_as(MetricsResponse, response.json())
+    assert "ask.requests" in response.json()["counters"]
@@ -0,0 +1,110 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from oracle_of_ammon.api.ammon import create_app
+from oracle_of_ammon.api.config import OracleConfig
+
+
+class StandInOracle:
+    def __init__(self, config: OracleConfig):
+        self.index = config.index
+        self.ready = threading.Event()
+        self.startup_seconds = {"ready": 0.0}
+
+    def warm_up(self):
+        self.ready.set()
+
+    def index_documents(self, **kwargs):
+        pass
+
+    def response_generation(self, endpoint: str, params: dict):
+        return [0]
+
+    def faq_search(self, query: str, params: dict):
+        return {"query": query, "answers": []}
+
+    def profiles(self):
+        return {
+            "default": "balanced",
+            "model_bytes": 0,
+            "profiles": {
+                "balanced": {
+                    "models": {"reader": "deepset/roberta-base-squad2"},
+                    "model_bytes": 0,
+                    "endpoints": {
+                        "faq_search": {
+                            "requests": 1,
+                            "latency_p50_seconds": 0.1,
+                            "latency_p99_seconds": 0.2,
+                        }
+                    },
+                }
+            },
+        }
+
+
+def test_create_app_builds_oracle_on_startup(tmp_path):
+    app = create_app(
+        OracleConfig(oracle=StandInOracle, warm_up=False, jobs_directory=str(tmp_path))
+    )
+    assert not hasattr(app.state, "oracle")
+
+    with TestClient(app) as client:
+        assert isinstance(app.state.oracle, StandInOracle)
+        assert client.get("/ready").status_code == 200
+        response = client.post("/faq-search", json={"query": "Where is Siwa?"})
+        assert response.status_code == 200
+        assert response.json()["answers"] == []
+
+
+def test_search_responses_are_cached_until_the_index_changes(tmp_path):
+    app = create_app(
+        OracleConfig(oracle=StandInOracle, warm_up=False, jobs_directory=str(tmp_path))
+    )
+    with TestClient(app) as client:
+        oracle = app.state.oracle
+        calls = []
+        oracle.faq_search = lambda query, params: calls.append(query) or {
+            "query": query,
+            "answers": [],
+        }
+        generation = [0]
+        oracle.response_generation = lambda endpoint, params: list(generation)
+
+        first = client.post("/faq-search", json={"query": "Where is Siwa?"})
+        etag = first.headers["ETag"]
+        second = client.post("/faq-search", json={"query": "where is  siwa?"})
+        assert calls == ["Where is Siwa?"]
+        assert second.json()["query"] == "where is  siwa?"
+        assert second.headers["ETag"] == etag
+
+        unchanged = client.post(
+            "/faq-search",
+            json={"query": "Where is Siwa?"},
+            headers={"If-None-Match": etag},
+        )
+        assert unchanged.status_code == 304
+
+        generation[0] += 1
+        changed = client.post(
+            "/faq-search",
+            json={"query": "Where is Siwa?"},
+            headers={"If-None-Match": etag},
+        )
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert len(calls) == 2
+
+
+def test_profiles_report_models_and_latency_per_profile(tmp_path):
+    app = create_app(
+        OracleConfig(oracle=StandInOracle, warm_up=False, jobs_directory=str(tmp_path))
+    )
+    with TestClient(app) as client:
+        response = client.get("/profiles")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["default"] == "balanced"
+        assert body["budget_bytes"] == 0
+        assert body["profiles"]["balanced"]["endpoints"]["faq_search"]["requests"] == 1
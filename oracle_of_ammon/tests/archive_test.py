@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+from haystack import Document
+
+from oracle_of_ammon.api.utils.archive import export_archive, read_archive
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def export(documents) -> io.BytesIO:
+    archive = io.BytesIO()
+    export_archive(
+        documents=documents,
+        fileobj=archive,
+        index="document",
+        dimension=4,
+        model=MODEL,
+        similarity="cosine",
+    )
+    archive.seek(0)
+    return archive
+
+
+def test_archive_round_trip_keeps_ids_meta_and_embeddings():
+    documents = [
+        Document(
+            content=f"text {i}",
+            meta={"name": f"{i}.txt"},
+            embedding=np.full(4, i, dtype=np.float32) if i % 2 else None,
+        )
+        for i in range(5)
+    ]
+
+    batches = list(
+        read_archive(export(documents), dimension=4, model=MODEL, batch_size=2)
+    )
+    records = [record for batch in batches for record in batch]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [record["id"] for record in records] == [d.id for d in documents]
+    assert records[3]["meta"] == {"name": "3.txt"}
+    assert "embedding" not in records[2]
+    np.testing.assert_array_equal(records[3]["embedding"], np.full(4, 3))
+
+
+def test_archive_rejects_other_models_and_dimensions():
+    documents = [Document(content="text", embedding=np.ones(4, dtype=np.float32))]
+    with pytest.raises(ValueError):
+        list(read_archive(export(documents), dimension=8))
+    with pytest.raises(ValueError):
+        list(read_archive(export(documents), dimension=4, model="other-model"))
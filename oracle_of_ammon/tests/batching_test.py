@@ -0,0 +1,31 @@
+from oracle_of_ammon.api.utils.batching import bucket_by_length, padding_ratio
+
+
+def test_bucket_by_length_respects_token_budget():
+    lengths = [300, 20, 310, 25, 30, 320]
+    batches = bucket_by_length(lengths, max_tokens=640)
+    assert sorted(position for batch in batches for position in batch) == list(
+        range(len(lengths))
+    )
+    assert batches[0] == [1, 3, 4]
+    for batch in batches:
+        assert max(lengths[i] for i in batch) * len(batch) <= 640
+
+
+def test_bucketing_reduces_padding():
+    lengths = [300, 20, 310, 25, 30, 320]
+
+    def padding(batches):
+        return sum(
+            padding_ratio([lengths[i] for i in batch], max(lengths[i] for i in batch))
+            * len(batch)
+            for batch in batches
+        ) / len(lengths)
+
+    bucketed = bucket_by_length(lengths, max_tokens=640)
+    fixed = bucket_by_length(lengths, max_tokens=640, sort=False)
+    assert padding(bucketed) < padding(fixed)
+
+
+def test_oversized_input_gets_its_own_batch():
+    assert bucket_by_length([1000, 10], max_tokens=100) == [[1], [0]]
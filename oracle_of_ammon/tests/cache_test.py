@@ -0,0 +1,83 @@
+import numpy as np
+
+from oracle_of_ammon.api.utils.cache import (
+    RESPONSE_CACHE_SUBDIRECTORY,
+    ResponseCache,
+    SemanticCache,
+)
+
+
+def test_semantic_cache_matches_nearby_embedding():
+    cache = SemanticCache(max_entries=2, max_distance=0.05)
+    cache.put("key", 0, np.array([1.0, 0.0]), {"answers": ["a"]})
+    assert cache.get("key", 0, np.array([0.99, 0.05])) == {"answers": ["a"]}
+    assert cache.get("key", 0, np.array([0.0, 1.0])) is None
+
+
+def test_semantic_cache_respects_generation_and_key():
+    cache = SemanticCache(max_entries=2, max_distance=0.05)
+    cache.put("key", 0, np.array([1.0, 0.0]), "cached")
+    assert cache.get("key", 1, np.array([1.0, 0.0])) is None
+    assert cache.get("other", 0, np.array([1.0, 0.0])) is None
+
+
+def test_semantic_cache_is_bounded():
+    cache = SemanticCache(max_entries=2, max_distance=0.05)
+    for i in range(3):
+        cache.put("key", 0, np.eye(3)[i], i)
+    assert len(cache) == 2
+    assert cache.get("key", 0, np.eye(3)[0]) is None
+    assert cache.invalidate(lambda key: key == "key") == 2
+
+
+def test_response_cache_key_normalizes_query_and_params():
+    key = ResponseCache.key("faq-search", "Where is  Siwa?", {"a": 1, "b": 2}, [3])
+    assert key == ResponseCache.key(
+        "faq-search", " where is siwa?", {"b": 2, "a": 1}, [3]
+    )
+    assert key != ResponseCache.key(
+        "faq-search", "Where is Siwa?", {"a": 1, "b": 2}, [4]
+    )
+    assert key != ResponseCache.key("ask", "Where is Siwa?", {"a": 1, "b": 2}, [3])
+
+
+def test_response_cache_keys_differ_across_restarts():
+    first, second = ResponseCache(), ResponseCache()
+    assert first.epoch != second.epoch
+    assert ResponseCache.key(
+        "ask", "Where?", {}, [0], epoch=first.epoch
+    ) != ResponseCache.key("ask", "Where?", {}, [0], epoch=second.epoch)
+
+
+def test_response_cache_is_bounded_in_memory():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put("a", "q", b"1234")
+    cache.put("b", "q", b"5678")
+    assert cache.get("a") == ("q", b"1234")
+    cache.put("c", "q", b"90")
+    assert cache.get("b") is None
+    cache.put("d", "q", b"123456")
+    assert cache.get("a") is None
+    assert cache.get("c") == ("q", b"90") and cache.get("d") == ("q", b"123456")
+
+
+def test_response_cache_on_disk(tmp_path):
+    a, b, stale = "a" * 64, "b" * 64, "c" * 64
+    directory = tmp_path / RESPONSE_CACHE_SUBDIRECTORY
+    directory.mkdir()
+    (directory / f"{stale}.json").write_bytes(b'"q"\n{}')
+    (directory / "notes.json").write_bytes(b"{}")
+    (tmp_path / f"{stale}.json").write_bytes(b"{}")
+
+    cache = ResponseCache(max_entries=1, directory=str(tmp_path))
+    assert not (directory / f"{stale}.json").exists()
+    assert (directory / "notes.json").exists()
+    assert (tmp_path / f"{stale}.json").exists()
+    cache.put(a, "Where?", b'{"answers":[]}')
+    assert cache.get(a) == ("Where?", b'{"answers":[]}')
+    cache.put(b, "Where?", b"{}")
+    assert cache.get(a) is None
+    assert sorted(path.name for path in directory.iterdir()) == [
+        f"{b}.json",
+        "notes.json",
+    ]
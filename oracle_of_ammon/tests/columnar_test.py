@@ -0,0 +1,39 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from oracle_of_ammon.api.utils.columnar import precomputed_embeddings, read_table
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def write_parquet(path: str, dimension: int = 4, model: str = MODEL) -> np.ndarray:
+    embeddings = np.arange(3 * dimension, dtype=np.float32).reshape(3, dimension)
+    column = pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), dimension)
+    table = pa.table(
+        {
+            "question": ["a?", "b?", "c?"],
+            "answer": ["a", "b", "c"],
+            "question_emb": column,
+        }
+    ).replace_schema_metadata({"embedding_model": model})
+    pq.write_table(table, path)
+    return embeddings
+
+
+def test_precomputed_embeddings_are_reused(tmp_path):
+    path = str(tmp_path / "faq.parquet")
+    expected = write_parquet(path)
+
+    embeddings = precomputed_embeddings(
+        read_table(path), dimension=4, model="all-MiniLM-L6-v2"
+    )
+    assert embeddings.shape == (3, 4)
+    np.testing.assert_array_equal(embeddings, expected)
+
+
+def test_precomputed_embeddings_ignored_on_mismatch(tmp_path):
+    path = str(tmp_path / "faq.parquet")
+    write_parquet(path, model="other/model")
+    assert precomputed_embeddings(read_table(path), dimension=4, model=MODEL) is None
+    assert precomputed_embeddings(read_table(path), dimension=8, model=MODEL) is None
@@ -0,0 +1,23 @@
+import time
+
+import pytest
+
+from oracle_of_ammon.api.utils.deadline import Deadline, RequestCancelled
+
+
+def test_deadline_keeps_the_tighter_budget():
+    deadline = Deadline(timeout=10).shorten(0.05).shorten(5)
+    assert deadline.remaining() <= 0.05
+    assert deadline.allows(None)
+    assert not deadline.allows(1)
+    time.sleep(0.06)
+    assert deadline.expired
+
+
+def test_unbounded_deadline_is_cancellable():
+    deadline = Deadline()
+    assert not deadline.expired
+    deadline.check()
+    deadline.cancel()
+    with pytest.raises(RequestCancelled):
+        deadline.check()
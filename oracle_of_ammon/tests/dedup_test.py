@@ -0,0 +1,112 @@
+import random
+
+from haystack import Document
+
+from oracle_of_ammon.api.store import ShardedDocumentStore
+from oracle_of_ammon.api.utils.dedup import Deduplicator, MinHasher, similarity
+
+random.seed(7)
+WORDS = [f"word{i}" for i in range(500)]
+
+
+def text(length: int = 200) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(length))
+
+
+def edited(original: str, changes: int = 2) -> str:
+    words = original.split()
+    for position in random.sample(range(len(words)), changes):
+        words[position] = "changed"
+    return " ".join(words)
+
+
+def test_signatures_estimate_jaccard_similarity():
+    hasher = MinHasher(permutations=256)
+    original = text()
+    assert similarity(hasher.signature(original), hasher.signature(original)) == 1
+    assert (
+        similarity(hasher.signature(original), hasher.signature(edited(original)))
+        > 0.85
+    )
+    assert similarity(hasher.signature(original), hasher.signature(text())) < 0.2
+
+
+def test_near_duplicates_are_skipped_across_batches():
+    store = ShardedDocumentStore(embedding_dim=4)
+    disclaimer = text()
+    store.write_documents([Document(content=disclaimer)], index="document")
+    deduplicator = Deduplicator(document_store=store, mode="skip")
+
+    distinct = Document(content=text())
+    kept = deduplicator.filter(
+        [
+            Document(content=edited(disclaimer)),
+            distinct,
+            Document(content=edited(distinct.content)),
+        ],
+        index="document",
+    )
+    assert kept == [distinct]
+    report = deduplicator.report()["indexes"]["document"]
+    assert report["chunks"] == 3
+    assert report["duplicates"] == 2
+    assert report["bytes_saved"] > 2 * 16
+
+
+def test_linked_duplicates_keep_provenance():
+    store = ShardedDocumentStore(embedding_dim=4)
+    original = Document(content=text())
+    store.write_documents([original], index="document")
+    deduplicator = Deduplicator(document_store=store, mode="link")
+
+    [duplicate] = deduplicator.filter(
+        [Document(content=edited(original.content))], index="document"
+    )
+    assert duplicate.meta["duplicate_of"] == original.id
+    assert duplicate.meta["similarity"] >= 0.85
+
+    store.delete_documents(index="document", ids=[original.id])
+    deduplicator.forget("document")
+    assert (
+        deduplicator.filter([Document(content=original.content)], index="document")[
+            0
+        ].meta
+        == {}
+    )
+
+
+def test_deduplication_is_off_by_default():
+    store = ShardedDocumentStore(embedding_dim=4)
+    original = Document(content=text())
+    store.write_documents([original], index="document")
+    deduplicator = Deduplicator(document_store=store)
+    assert deduplicator.mode == "off"
+    [duplicate] = deduplicator.filter(
+        [Document(content=edited(original.content))], index="document"
+    )
+    assert "duplicate_of" not in duplicate.meta
+
+
+def test_deleting_a_kept_chunk_promotes_its_closest_duplicate():
+    store = ShardedDocumentStore(embedding_dim=4)
+    original = Document(content=text())
+    store.write_documents([original], index="document")
+    deduplicator = Deduplicator(document_store=store, mode="link")
+
+    duplicates = [
+        Document(
+            content=edited(original.content, changes),
+            meta={"duplicate_of": original.id, "similarity": score},
+        )
+        for changes, score in ((3, 0.9), (1, 0.97), (2, 0.93))
+    ]
+    closest = duplicates[1]
+    store.write_documents(duplicates, index="document")
+
+    store.delete_documents(index="document", ids=[original.id])
+    deduplicator.forget("document")
+    assert deduplicator.promote(store, index="document", ids=[original.id]) == 1
+    documents = {d.id: d for d in store.get_all_documents(index="document")}
+    assert "duplicate_of" not in documents[closest.id].meta
+    for duplicate in (duplicates[0], duplicates[2]):
+        assert documents[duplicate.id].meta["duplicate_of"] == closest.id
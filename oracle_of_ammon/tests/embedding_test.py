@@ -0,0 +1,32 @@
+from oracle_of_ammon.api.utils.embedding import (
+    ReindexCheckpoint,
+    batched,
+    core_slices,
+)
+
+
+def test_core_slices_pin_each_worker_to_its_own_cores():
+    assert core_slices(workers=2, cores=[0, 1, 2, 3, 4]) == [[0, 1], [2, 3]]
+    assert core_slices(workers=2, threads=3, cores=[0, 1, 2, 3]) == [
+        [0, 1, 2],
+        [3, 0, 1],
+    ]
+
+
+def test_batched_keeps_order():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_reindex_checkpoint_resumes_only_the_same_model(tmp_path):
+    checkpoint = ReindexCheckpoint(str(tmp_path), "semantic-model/a-document", "a")
+    assert checkpoint.load() is None
+    checkpoint.save(after="0042")
+    assert checkpoint.load() == "0042"
+    assert (
+        ReindexCheckpoint(str(tmp_path), "semantic-model/a-document", "b").load()
+        is None
+    )
+
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    assert ReindexCheckpoint(None, "semantic", "a").load() is None
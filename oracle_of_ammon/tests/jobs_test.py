@@ -0,0 +1,27 @@
+import io
+import os
+import threading
+
+from oracle_of_ammon.api.jobs import CANCELLED, COMPLETED, JobQueue
+
+
+def test_cancelling_a_queued_job_removes_its_spooled_files(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def index_file(**kwargs):
+        started.set()
+        release.wait(timeout=10)
+
+    jobs = JobQueue(index_file=index_file, directory=str(tmp_path), workers=1)
+    running = jobs.submit(files=[("a.txt", io.BytesIO(b"a"))], index="document")
+    assert started.wait(timeout=10)
+    queued = jobs.submit(files=[("b.txt", io.BytesIO(b"b"))], index="document")
+    assert os.path.isdir(tmp_path / queued["id"])
+
+    assert jobs.cancel(queued["id"])["status"] == CANCELLED
+    assert not os.path.exists(tmp_path / queued["id"])
+
+    release.set()
+    jobs._queue.join()
+    assert jobs.get(running["id"])["status"] == COMPLETED
+    assert jobs.get(queued["id"])["status"] == CANCELLED
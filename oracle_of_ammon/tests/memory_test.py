@@ -0,0 +1,33 @@
+import numpy as np
+from haystack import Document
+
+from oracle_of_ammon.api.utils.memory import AllocationProfiler, documents_memory
+
+
+def test_documents_memory_counts_shared_embedding_block_once():
+    block = np.ones((10, 4), dtype=np.float32)
+    documents = [
+        Document(content=f"text {i}", meta={"name": "a.txt"}, embedding=block[i])
+        for i in range(10)
+    ]
+    usage = documents_memory(documents)
+    assert usage["documents"] == 10
+    assert usage["embedding_bytes"] == block.nbytes
+    assert usage["total_bytes"] == (
+        usage["text_bytes"] + usage["meta_bytes"] + usage["embedding_bytes"]
+    )
+
+
+def test_allocation_diff_attributes_growth_to_allocating_line():
+    profiler = AllocationProfiler()
+    profiler.start(frames=5)
+    try:
+        start = profiler.snapshot()["id"]
+        retained = [bytearray(1024) for _ in range(1000)]
+        end = profiler.snapshot()["id"]
+        allocations = profiler.diff(start=start, end=end, path="*memory_test*")
+        assert allocations[0]["size_diff"] >= 1000 * 1024
+        assert "memory_test.py" in allocations[0]["traceback"][0]
+        assert retained
+    finally:
+        profiler.stop()
@@ -0,0 +1,108 @@
+import numpy as np
+from haystack import Document
+from haystack.document_stores.filter_utils import LogicalFilterClause
+
+from oracle_of_ammon.api.store import ShardedDocumentStore
+from oracle_of_ammon.api.utils.metaindex import MetadataIndex
+
+FILTERS = [
+    {"filename": "a.txt"},
+    {"filename": ["a.txt", "c.txt"], "page": {"$gte": 2}},
+    {"$or": {"filename": {"$ne": "a.txt"}, "page": {"$lt": 1}}},
+    {"$not": {"filename": {"$nin": ["b.txt"]}}},
+    {"tags": ["x", "y"]},
+    {"tags": {"$eq": ["x", "y"]}},
+    {"lang": "en", "page": {"$gt": 0, "$lte": 3}},
+]
+
+
+def documents(count: int = 40):
+    rng = np.random.default_rng(0)
+    return [
+        Document(
+            content=f"document {i}",
+            meta={
+                "filename": f"{'abc'[i % 3]}.txt",
+                "page": i % 5,
+                "lang": "en" if i % 2 else "de",
+                "tags": ["x", "y"] if i % 4 == 0 else "x",
+            },
+            embedding=rng.random(4, dtype=np.float32),
+        )
+        for i in range(count)
+    ]
+
+
+def expected(index: MetadataIndex, filters: dict) -> list:
+    clause = LogicalFilterClause.parse(filters)
+    return [clause.evaluate(document.meta) for document in index.documents]
+
+
+def test_mask_matches_filter_evaluation():
+    for fields in (frozenset({"filename", "page", "tags"}), None):
+        index = MetadataIndex(fields=fields)
+        index.add(documents())
+        for filters in FILTERS:
+            mask = index.mask(LogicalFilterClause.parse(filters))
+            assert mask.tolist() == expected(index, filters), filters
+
+
+def test_mask_follows_removal_and_overwrite():
+    index = MetadataIndex(fields=frozenset({"filename", "page"}))
+    index.add(documents())
+    index.remove([index.documents[0].id, index.documents[5].id, "missing"])
+    replaced = index.documents[3]
+    index.add(
+        [Document(content=replaced.content, id=replaced.id, meta={"filename": "d.txt"})]
+    )
+    assert len(index) == 38
+    assert all(index.rows[d.id] == row for row, d in enumerate(index.documents))
+    for filters in FILTERS + [{"filename": "d.txt"}]:
+        mask = index.mask(LogicalFilterClause.parse(filters))
+        assert mask.tolist() == expected(index, filters), filters
+
+
+def test_filtered_query_scores_only_matching_documents():
+    store = ShardedDocumentStore(
+        shards=3, similarity="cosine", embedding_dim=4, metadata_fields="filename"
+    )
+    store.write_documents(documents())
+    query = np.array([1.0, 0.5, 0.0, 0.25], dtype=np.float32)
+    filters = {"filename": "b.txt", "page": {"$gte": 1}}
+
+    results = store.query_by_embedding(query, filters=filters, top_k=5)
+    clause = LogicalFilterClause.parse(filters)
+    candidates = [d for d in documents() if clause.evaluate(d.meta)]
+    scores = sorted(
+        (
+            (
+                d.embedding
+                @ query
+                / np.linalg.norm(d.embedding)
+                / np.linalg.norm(query)
+                + 1
+            )
+            / 2
+            for d in candidates
+        ),
+        reverse=True,
+    )[:5]
+    assert [d.meta["filename"] for d in results] == ["b.txt"] * 5
+    assert np.allclose([d.score for d in results], scores)
+    assert all(d.embedding is None for d in results)
+
+    store.delete_documents(ids=[results[0].id])
+    assert results[0].id not in {
+        d.id for d in store.query_by_embedding(query, filters=filters, top_k=40)
+    }
+    assert store.get_document_count(filters={"filename": "b.txt"}) == 12
+
+
+def test_documents_by_id_are_copies():
+    store = ShardedDocumentStore(embedding_dim=4, shards=2)
+    store.write_documents(documents(6))
+    [document] = store.get_documents_by_id(ids=[store.get_all_documents()[0].id])
+    filename = document.meta["filename"]
+    document.meta["filename"] = "changed.txt"
+    assert not store.get_all_documents(filters={"filename": "changed.txt"})
+    assert store.get_document_by_id(document.id).meta["filename"] == filename
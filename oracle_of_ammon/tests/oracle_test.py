@@ -1,9 +1,19 @@
 import os
 import pathlib
+import subprocess
 
+import pytest
 from fastapi import UploadFile
+from haystack import Document
+from openpyxl import Workbook
 
-from oracle_of_ammon.api.oracle import Oracle
+from oracle_of_ammon.api.oracle import (
+    ASK_MAX_PASSAGES,
+    ASK_MIN_PASSAGES,
+    Oracle,
+    ask_budget,
+)
+from oracle_of_ammon.api.utils.pdf import extract_pages
 
 oracle = Oracle()
 
@@ -15,7 +25,6 @@ def test_oracle_init():
     assert hasattr(oracle, "faq_retriever")
     assert hasattr(oracle, "semantic_retriever")
     assert hasattr(oracle, "faq_pipeline")
-    assert hasattr(oracle, "extractive_pipeline")
     assert hasattr(oracle, "document_search_pipeline")
     assert hasattr(oracle, "reader")
     assert hasattr(oracle, "summarizer")
@@ -24,8 +33,6 @@ def test_oracle_init():
     assert hasattr(oracle, "pdf_converter")
     assert hasattr(oracle, "markdown_converter")
     assert hasattr(oracle, "docx_converter")
-    assert hasattr(oracle, "search_summarization_pipeline")
-    assert hasattr(oracle, "span_summarizer_pipeline")
     assert hasattr(oracle, "indexing_pipeline")
 
 
@@ -72,3 +79,136 @@ def test_document_summarization():
 
 def test_search_span_summarization():
     assert oracle.search_span_summarization(query="Who is Ammon?")
+
+
+def test_ask():
+    result = oracle.ask(query="Why are duplicate questions being returned?")
+    assert result["tier"] in ("faq", "extractive")
+
+
+def test_ask_budget_grows_past_faq_top_k():
+    assert ask_budget(faq_score=0.0, threshold=0.8) == (ASK_MAX_PASSAGES, 3)
+    assert ask_budget(faq_score=0.0, threshold=0.8, max_passages=6)[0] == 6
+    assert ask_budget(faq_score=0.8, threshold=0.8)[0] == ASK_MIN_PASSAGES
+    assert 3 < ask_budget(faq_score=0.3, threshold=0.8)[0] < ASK_MAX_PASSAGES
+
+
+def test_ask_retrieves_more_passages_than_faq_top_k(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        oracle,
+        "extractive_search",
+        lambda query, params, deadline: calls.append(params) or {"answers": []},
+    )
+    oracle.ask(
+        query="How far is Siwa from Memphis?",
+        params={
+            "Retriever": {"top_k": 3, "index": "document"},
+            "Cascade": {"threshold": 10.0},
+        },
+    )
+    assert calls[0]["Retriever"]["top_k"] > 3
+
+
+def test_rebalance_index():
+    store = oracle.semantic_document_store
+    count = store.get_document_count(index="document")
+    oracle.rebalance_index(shards=4, index="document")
+    assert store.get_document_count(index="document") == count
+    assert len(store.shard_names("document")) == 4
+    assert oracle.document_search(query="Climate of Siwa?")
+
+
+def test_passage_cache_matches_uncached_reader():
+    processor = oracle.reader.inferencer.processor
+    documents = [
+        Document(content="The Oracle of Ammon was located in the Siwa Oasis. " * n)
+        for n in (1, 40)
+    ]
+    query = "Where was the Oracle of Ammon?"
+    cached = oracle.reader.predict(query=query, documents=documents, top_k=3)
+    assert len(oracle.passage_cache) >= len(documents)
+    # Without the instance attribute the processor's own method runs again.
+    del processor.dataset_from_dicts
+    try:
+        uncached = oracle.reader.predict(query=query, documents=documents, top_k=3)
+    finally:
+        oracle.passage_cache.install(processor)
+    assert [
+        (a.answer, a.document_id, a.offsets_in_document) for a in cached["answers"]
+    ] == [(a.answer, a.document_id, a.offsets_in_document) for a in uncached["answers"]]
+    assert [a.score for a in cached["answers"]] == pytest.approx(
+        [a.score for a in uncached["answers"]]
+    )
+
+
+def test_sized_readers_share_the_model_but_not_the_processor():
+    tier = oracle.tiers[oracle.profile.name]
+    reader = tier.sized_reader(128)
+    assert reader is tier.sized_reader(128)
+    assert reader.inferencer.model is oracle.reader.inferencer.model
+    assert reader.inferencer.processor.max_seq_len == 128
+    assert oracle.reader.inferencer.processor.max_seq_len == tier.reader_max_seq_len
+    answers = reader.predict(
+        query="Where was the Oracle of Ammon?",
+        documents=[Document(content="The Oracle of Ammon was in the Siwa Oasis.")],
+        top_k=1,
+    )["answers"]
+    assert answers
+
+
+def test_index_pdf_keeps_page_numbers(monkeypatch):
+    pages = [
+        "The Oracle of Ammon was located in the Siwa Oasis.",
+        "Alexander the Great visited the oracle in 331 BC.",
+        "Pilgrims crossed the Western Desert to consult it.",
+    ]
+    monkeypatch.setattr(
+        "oracle_of_ammon.api.oracle.iter_page_batches",
+        lambda path: iter([(1, pages[:2]), (3, pages[2:])]),
+    )
+    oracle.index_pdf(path="siwa.pdf", meta={"filename": "siwa.pdf"}, index="pdf")
+    documents = oracle.semantic_document_store.get_all_documents(index="pdf")
+    assert {d.meta["page"] for d in documents} == {1, 2, 3}
+    assert all(d.meta["filename"] == "siwa.pdf" for d in documents)
+    for document in documents:
+        assert document.content.strip() in pages[document.meta["page"] - 1]
+
+
+def test_pdf_pages_agree_with_converter(monkeypatch, tmp_path):
+    output = b"Siwa Oasis\r\nWestern Desert\n\fTemple of Ammon\n\f"
+    commands: list = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout=output)
+
+    monkeypatch.setattr(subprocess, "run", run)
+    path = tmp_path / "siwa.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    [converted] = oracle.pdf_converter.convert(file_path=path, meta=None)
+    assert extract_pages(str(path), 1, 2) == converted.content.split("\f")
+    converter_command, extract_command = commands
+    assert [part for part in extract_command if part not in ("-f", "-l", "1", "2")] == [
+        str(part) for part in converter_command
+    ]
+
+
+def test_faq_xlsx_rows_can_be_filtered_by_sheet(tmp_path):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet in ("oasis", "temple"):
+        worksheet = workbook.create_sheet(title=sheet)
+        worksheet.append(["Question", "Answer"])
+        for row in range(3):
+            worksheet.append([f"{sheet} question {row}?", f"{sheet} answer {row}"])
+    path = str(tmp_path / "faq.xlsx")
+    workbook.save(path)
+
+    oracle.index_faq_xlsx(path=path, index="sheets")
+    documents = oracle.faq_document_store.get_all_documents(
+        index="sheets", filters={"sheet": "temple"}
+    )
+    assert sorted(d.content for d in documents) == [
+        f"temple question {row}?" for row in range(3)
+    ]
@@ -0,0 +1,77 @@
+import pytest
+from haystack import Document
+
+from oracle_of_ammon.api.store import ShardedDocumentStore
+from oracle_of_ammon.api.utils.metaindex import MetadataIndex
+from oracle_of_ammon.api.utils.pagination import decode_cursor, paginate
+
+
+def store(count: int = 50) -> ShardedDocumentStore:
+    document_store = ShardedDocumentStore(embedding_dim=4, shards=3)
+    document_store.write_documents(
+        [Document(content=f"document {i}", meta={"page": i % 2}) for i in range(count)]
+    )
+    return document_store
+
+
+def pages(document_store: ShardedDocumentStore, page_size: int, **kwargs):
+    cursor = None
+    while True:
+        documents = document_store.get_documents_after(
+            after=decode_cursor(cursor), **kwargs
+        )
+        page, cursor = paginate(documents=documents, page_size=page_size)
+        yield [document.id for document in page]
+        if cursor is None:
+            return
+
+
+def test_pages_cover_every_document_once():
+    document_store = store()
+    ids = [id for page in pages(document_store, page_size=7) for id in page]
+    assert sorted(ids) == sorted(d.id for d in document_store.get_all_documents())
+    assert len(ids) == len(set(ids))
+
+
+def test_pages_respect_filters():
+    document_store = store()
+    ids = [id for page in pages(document_store, 4, filters={"page": 1}) for id in page]
+    expected = document_store.get_all_documents(filters={"page": 1})
+    assert sorted(ids) == sorted(document.id for document in expected)
+
+
+def test_writes_between_pages_neither_repeat_nor_skip_documents():
+    document_store = store()
+    original = {document.id for document in document_store.get_all_documents()}
+    seen, deleted = [], set()
+    for number, page in enumerate(pages(document_store, page_size=5)):
+        seen.extend(page)
+        if number == 1:
+            # Deleting documents already returned used to shift the offset forward.
+            deleted = set(seen[:5])
+            document_store.delete_documents(ids=list(deleted))
+            document_store.write_documents([Document(content="written later")])
+    assert len(seen) == len(set(seen))
+    assert original - deleted <= set(seen)
+
+
+def test_cursor_of_a_removed_shard_is_rejected():
+    document_store = store()
+    _, cursor = paginate(document_store.get_documents_after(), page_size=1)
+    document_store.rebalance(document_store.index, shards=1)
+    with pytest.raises(ValueError):
+        document_store.get_documents_after(after=decode_cursor(cursor))
+
+
+def test_filtered_pages_match_each_shard_once(monkeypatch):
+    document_store = store()
+    masks: list = []
+    mask = MetadataIndex.mask
+    monkeypatch.setattr(
+        MetadataIndex,
+        "mask",
+        lambda self, clause: masks.append(1) or mask(self, clause),
+    )
+    ids = [id for page in pages(document_store, 2, filters={"page": 0}) for id in page]
+    assert len(ids) == 25
+    assert len(masks) == 3
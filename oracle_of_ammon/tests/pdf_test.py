@@ -0,0 +1,66 @@
+import subprocess
+import threading
+
+from oracle_of_ammon.api.utils import pdf
+
+
+def fake_pdf(monkeypatch, page_count: int) -> list:
+    """Replaces poppler with ``page_count`` generated pages; returns the extractions."""
+    calls: list = []
+    lock = threading.Lock()
+
+    def extract_pages(path, first_page, last_page):
+        with lock:
+            calls.append(first_page)
+        return [f"page {n}" for n in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(pdf, "count_pages", lambda path: page_count)
+    monkeypatch.setattr(pdf, "extract_pages", extract_pages)
+    return calls
+
+
+def test_batches_come_in_page_order(monkeypatch):
+    fake_pdf(monkeypatch, page_count=23)
+    batches = list(pdf.iter_page_batches("doc.pdf", pages_per_batch=5, workers=2))
+    assert [first for first, _ in batches] == [1, 6, 11, 16, 21]
+    pages = [page for _, batch in batches for page in batch]
+    assert pages == [f"page {n}" for n in range(1, 24)]
+
+
+def test_batches_in_flight_are_bounded(monkeypatch):
+    calls = fake_pdf(monkeypatch, page_count=100)
+    batches = pdf.iter_page_batches("doc.pdf", pages_per_batch=1, workers=2)
+    for read, _ in enumerate(batches, 1):
+        assert len(calls) <= read + 2 * 2
+        if read == 10:
+            break
+    batches.close()
+    assert len(calls) < 100
+
+
+def test_pages_are_extracted_in_stream_order(monkeypatch):
+    commands: list = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(
+            command, 0, stdout=b"one\r\ntwo\n\fthree\n\f"
+        )
+
+    monkeypatch.setattr(pdf.subprocess, "run", run)
+    assert pdf.extract_pages("doc.pdf", 4, 5) == ["one\ntwo", "three"]
+    assert "-raw" in commands[0] and "-layout" not in commands[0]
+    assert commands[0][commands[0].index("-f") + 1] == "4"
+
+
+def test_repeated_headers_and_footers_are_removed():
+    words = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    pages = [
+        f"Annual report of the oracle\n{word} stands alone on this page.\n"
+        f"Copyright 2023 Temple of Ammon"
+        for word in words
+    ]
+    cleaned = pdf.remove_header_footer(pages)
+    assert all("Annual report of the oracle" not in page for page in cleaned)
+    assert all("Copyright 2023 Temple of Ammon" not in page for page in cleaned)
+    assert all(word in page for word, page in zip(words, cleaned))
@@ -0,0 +1,46 @@
+import os
+import pathlib
+
+from haystack import Document
+from haystack.nodes import PreProcessor
+
+from oracle_of_ammon.api.utils.preprocessor import FastPreProcessor
+
+PARAMS: dict = {
+    "clean_empty_lines": True,
+    "clean_whitespace": True,
+    "clean_header_footer": True,
+    "split_by": "word",
+    "split_length": 200,
+    "split_respect_sentence_boundary": True,
+    "split_overlap": 0,
+}
+
+
+def golden_documents() -> list:
+    data = pathlib.Path(os.getcwd(), "oracle_of_ammon", "data")
+    text = (data / "semantic.txt").read_text()
+    paragraphs = [p for p in text.split("\n\n") if p.strip()]
+    return [
+        Document(content=text, meta={"filename": "semantic.txt"}),
+        Document(content="\f".join(paragraphs), meta={"filename": "pages.txt"}),
+        Document(content=(data / "faq.txt").read_text(), meta={"filename": "faq.txt"}),
+    ] + [
+        Document(content=paragraph, meta={"filename": f"paragraph-{i}.txt"})
+        for i, paragraph in enumerate(paragraphs)
+    ]
+
+
+def as_dicts(documents: list) -> list:
+    return [(d.id, d.content, d.meta) for d in documents]
+
+
+def test_fast_preprocessor_matches_preprocessor():
+    expected = PreProcessor(**PARAMS).process(golden_documents())
+    serial = FastPreProcessor(workers=1, **PARAMS).process(golden_documents())
+    parallel = FastPreProcessor(workers=2, min_parallel_documents=1, **PARAMS).process(
+        golden_documents()
+    )
+
+    assert as_dicts(serial) == as_dicts(expected)
+    assert as_dicts(parallel) == as_dicts(expected)
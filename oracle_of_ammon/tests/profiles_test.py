@@ -0,0 +1,48 @@
+import json
+
+from oracle_of_ammon.api.utils.profiles import (
+    BUILTIN_PROFILES,
+    directory_name,
+    read_profiles,
+    requested_profile,
+    select_profiles,
+)
+
+
+def test_profile_file_overrides_and_extends_builtin_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(
+        json.dumps(
+            {
+                "fast": {"reader": "deepset/minilm-uncased-squad2"},
+                "multilingual": {"reader": "deepset/xlm-roberta-base-squad2"},
+                "broken": {"retriever": "typo"},
+            }
+        )
+    )
+    profiles = read_profiles(str(path))
+
+    assert profiles["fast"].reader == "deepset/minilm-uncased-squad2"
+    assert profiles["fast"].summarizer == BUILTIN_PROFILES["fast"].summarizer
+    assert profiles["multilingual"].name == "multilingual"
+    assert profiles["multilingual"].summarizer == "facebook/bart-large-cnn"
+    assert "broken" not in profiles
+    assert read_profiles(str(tmp_path / "missing.json")) == BUILTIN_PROFILES
+
+
+def test_select_profiles_keeps_order_and_skips_unknown_names():
+    selected = select_profiles(" fast, nope,balanced,fast", BUILTIN_PROFILES)
+    assert [profile.name for profile in selected] == ["fast", "balanced"]
+    assert [profile.name for profile in select_profiles("", BUILTIN_PROFILES)] == [
+        "balanced"
+    ]
+
+
+def test_requested_profile_and_log_directory_names():
+    assert requested_profile({"Profile": {"name": "fast"}}) == "fast"
+    assert requested_profile({"Retriever": {"top_k": 3}}) is None
+    assert requested_profile({"Profile": "fast"}) is None
+    assert (
+        directory_name("semantic", "sentence-transformers/multi-qa-MiniLM-L6-cos-v1")
+        == "semantic-sentence-transformers--multi-qa-MiniLM-L6-cos-v1"
+    )
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from oracle_of_ammon.api.utils.scheduler import PriorityClass, Scheduler
+
+
+def make_scheduler() -> Scheduler:
+    return Scheduler(
+        classes={
+            "interactive": PriorityClass(weight=8, concurrency=1),
+            "bulk": PriorityClass(weight=1, concurrency=1),
+        },
+        workers=1,
+        workloads={"lookup": ("interactive", 1), "summary": ("bulk", 100)},
+    )
+
+
+def test_interactive_requests_overtake_queued_bulk_requests():
+    scheduler = make_scheduler()
+    order = []
+    release = threading.Event()
+
+    def run(workload: str) -> None:
+        with scheduler.slot(workload):
+            order.append(workload)
+            release.wait()
+
+    first = threading.Thread(target=run, args=("summary",))
+    first.start()
+    while not order:
+        time.sleep(0.01)
+    threads = [threading.Thread(target=run, args=("summary",)) for _ in range(3)]
+    threads.append(threading.Thread(target=run, args=("lookup",)))
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+
+    assert scheduler.snapshot()["bulk"]["queued"] == 3
+    release.set()
+    for thread in [first, *threads]:
+        thread.join()
+    assert order == ["summary", "lookup", "summary", "summary", "summary"]
+    assert scheduler.snapshot()["interactive"]["dispatched"] == 1
+
+
+def test_callers_can_only_lower_their_priority_class():
+    scheduler = make_scheduler()
+    assert scheduler.resolve("lookup", requested="bulk") == ("bulk", 1)
+    assert scheduler.resolve("summary", requested="interactive") == ("bulk", 100)
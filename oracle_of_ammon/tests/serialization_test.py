@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+from haystack import Answer, Document
+
+from oracle_of_ammon.api.models import Documents, SearchResponse
+from oracle_of_ammon.api.utils.serialization import FastJSONResponse, shape
+
+
+def test_shape_keeps_model_fields_and_drops_embeddings():
+    document = Document(content="text", embedding=np.ones(4, dtype=np.float32))
+    result = {"query": "q", "documents": [document], "root_node": "Query"}
+
+    shaped = shape(result, Documents)
+    assert list(shaped) == ["documents"]
+    assert shaped["documents"][0]["id"] == document.id
+    assert shaped["documents"][0]["embedding"] is None
+    assert (
+        shape(result, Documents, embedding=True)["documents"][0]["embedding"]
+        is not None
+    )
+
+
+def test_fast_json_response_encodes_answers_and_numpy_scores():
+    result = {
+        "query": "q",
+        "answers": [Answer(answer="a", score=np.float32(0.5), meta={})],
+        "no_ans_gap": 1.0,
+    }
+    body = json.loads(FastJSONResponse(content=shape(result, SearchResponse)).body)
+    assert body == {
+        "query": "q",
+        "answers": [
+            {
+                "answer": "a",
+                "type": "extractive",
+                "score": 0.5,
+                "context": None,
+                "offsets_in_document": None,
+                "offsets_in_context": None,
+                "document_id": None,
+                "meta": {},
+            }
+        ],
+        "degraded": False,
+    }
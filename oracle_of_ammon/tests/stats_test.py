@@ -0,0 +1,42 @@
+import random
+import statistics
+
+from haystack import Document
+
+from oracle_of_ammon.api.utils.stats import IndexStatistics, QuantileSketch
+
+
+def test_quantile_sketch_median_is_within_relative_accuracy():
+    values = [random.randint(1, 10_000) for _ in range(5_000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    for value in values[:2_500]:
+        sketch.remove(value)
+    median = statistics.median_low(values[2_500:])
+    assert abs(sketch.quantile(0.5) - median) <= 0.02 * median
+
+
+def test_index_statistics_track_additions_and_removals():
+    documents = [
+        Document(
+            content="x" * length,
+            meta={
+                "filepath_or_buffer": f"/tmp/file-{length % 2}.txt",
+                "filename": f"file-{length % 2}.txt",
+            },
+        )
+        for length in range(1, 11)
+    ]
+    index_statistics = IndexStatistics()
+    index_statistics.add(documents)
+    index_statistics.remove(documents[:2] + documents[-1:])
+
+    summary = index_statistics.describe()
+    assert summary["count"] == 7
+    assert summary["chars_min"] == 3
+    assert summary["chars_max"] == 9
+    assert summary["chars_mean"] == 6
+    assert summary["chars_median"] == 6
+    assert summary["files"] == 2
+    assert summary["last_write"] is not None
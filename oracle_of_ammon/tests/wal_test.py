@@ -0,0 +1,137 @@
+import os
+from tempfile import SpooledTemporaryFile
+
+import numpy as np
+import pytest
+
+from oracle_of_ammon.api.store import ShardedDocumentStore
+from oracle_of_ammon.api.utils.wal import MutationLog
+
+
+def open_store(directory: str) -> ShardedDocumentStore:
+    store = ShardedDocumentStore(embedding_dim=4, shards=2)
+    store.open_log(directory=directory)
+    return store
+
+
+def documents(start: int, stop: int) -> list:
+    return [
+        {"content": f"text {i}", "embedding": np.full(4, i, dtype=np.float32)}
+        for i in range(start, stop)
+    ]
+
+
+def contents(store: ShardedDocumentStore, index: str = "document") -> list:
+    return sorted(d.content for d in store.get_all_documents(index=index))
+
+
+def test_mutations_are_replayed_after_restart(tmp_path):
+    store = open_store(str(tmp_path))
+    store.write_documents(documents(0, 5), index="document")
+    store.write_documents(documents(0, 2), index="other")
+    store.delete_documents(
+        index="document",
+        ids=[d.id for d in store.get_all_documents(index="document")][:2],
+    )
+    store.delete_index(index="other")
+    store.rebalance(index="document", shards=3)
+    store.log.close()
+
+    recovered = open_store(str(tmp_path))
+    assert contents(recovered) == contents(store)
+    assert recovered.shard_count("document") == 3
+    assert not recovered.has_index("other")
+    assert recovered.describe_documents(index="document")["embeddings"] == 3
+    document = recovered.get_all_documents(index="document", return_embedding=True)[0]
+    assert document.embedding[0] == int(document.content.split()[-1])
+
+
+def test_written_embeddings_are_replayed_after_restart(tmp_path):
+    store = open_store(str(tmp_path))
+    store.write_documents(
+        [{"content": f"text {i}"} for i in range(3)], index="document"
+    )
+    ids = sorted(d.id for d in store.get_all_documents(index="document"))
+    written = store.write_embeddings(
+        index="document", ids=ids + ["missing"], embeddings=np.ones((4, 4))
+    )
+    assert written == 3
+    assert store.describe_documents(index="document")["embeddings"] == 3
+    store.log.close()
+
+    recovered = open_store(str(tmp_path))
+    assert recovered.describe_documents(index="document")["embeddings"] == 3
+    assert all(
+        d.embedding.sum() == 4
+        for d in recovered.get_all_documents(index="document", return_embedding=True)
+    )
+
+
+def test_checkpoint_folds_log_and_replays_only_newer_records(tmp_path):
+    store = open_store(str(tmp_path))
+    store.write_documents(documents(0, 10), index="document")
+    store.checkpoint()
+    store.write_documents(documents(10, 12), index="document")
+    store.log.close()
+
+    assert MutationLog(str(tmp_path), dimension=4).latest_checkpoint()[0] == 2
+    recovered = open_store(str(tmp_path))
+    assert len(contents(recovered)) == 12
+
+
+def test_torn_write_is_discarded(tmp_path):
+    store = open_store(str(tmp_path))
+    store.write_documents(documents(0, 3), index="document")
+    store.log.close()
+    path = os.path.join(str(tmp_path), "log-00000001.wal")
+    with open(path, "ab") as log:
+        log.write(b"\x10\x00\x00\x00partial")
+
+    recovered = open_store(str(tmp_path))
+    assert len(contents(recovered)) == 3
+
+
+def test_only_written_documents_are_logged(tmp_path):
+    store = open_store(str(tmp_path))
+    store.write_documents(documents(0, 3), index="document")
+    for _ in range(2):
+        store.write_documents(
+            documents(0, 5), index="document", duplicate_documents="skip"
+        )
+    store.log.close()
+
+    records = [header for header, _ in MutationLog(str(tmp_path), 4).replay(0)]
+    assert [len(header["documents"]) for header in records] == [3, 2]
+
+
+def test_meta_json_cannot_hold_is_left_out_of_the_log(tmp_path):
+    store = open_store(str(tmp_path))
+    with SpooledTemporaryFile() as upload:
+        store.write_documents(
+            [
+                {
+                    "content": "text",
+                    "meta": {"upload": upload, "page": np.int64(3), "tags": ["a"]},
+                }
+            ],
+            index="document",
+        )
+    store.log.close()
+
+    [document] = open_store(str(tmp_path)).get_all_documents(index="document")
+    assert document.meta == {"page": 3, "tags": ["a"]}
+
+
+def test_log_of_another_model_or_dimension_is_not_replayed(tmp_path):
+    store = ShardedDocumentStore(embedding_dim=4)
+    store.open_log(directory=str(tmp_path), model="small")
+    store.write_documents(documents(0, 2), index="document")
+    store.log.close()
+
+    with pytest.raises(ValueError):
+        ShardedDocumentStore(embedding_dim=4).open_log(str(tmp_path), model="large")
+    with pytest.raises(ValueError):
+        ShardedDocumentStore(embedding_dim=8).open_log(str(tmp_path), model="small")
+    recovered = ShardedDocumentStore(embedding_dim=4)
+    recovered.open_log(directory=str(tmp_path), model="small")
+    assert len(contents(recovered)) == 2
@@ -0,0 +1,36 @@
+from openpyxl import Workbook
+
+from oracle_of_ammon.api.utils.xlsx import iter_sheets
+
+
+def write_workbook(path: str) -> None:
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet in range(3):
+        worksheet = workbook.create_sheet(title=f"sheet-{sheet}")
+        worksheet.append(["Category", "Question", "Answer"])
+        for row in range(5):
+            worksheet.append(
+                ["misc", f"question {sheet}-{row}", f"answer {sheet}-{row}"]
+            )
+        worksheet.append([None, None, None])
+    workbook.create_sheet(title="notes").append(["free text"])
+    workbook.save(path)
+
+
+def test_iter_sheets_streams_question_answer_columns(tmp_path):
+    path = str(tmp_path / "faq.xlsx")
+    write_workbook(path)
+
+    sheets = list(iter_sheets(path=path, workers=2))
+    assert [name for name, _ in sheets] == ["sheet-0", "sheet-1", "sheet-2", "notes"]
+    assert sheets[1][1][0] == {"question": "question 1-0", "answer": "answer 1-0"}
+    assert [len(records) for _, records in sheets] == [5, 5, 5, 0]
+
+
+def test_iter_sheets_selects_sheets(tmp_path):
+    path = str(tmp_path / "faq.xlsx")
+    write_workbook(path)
+
+    sheets = list(iter_sheets(path=path, sheet_name=["sheet-2", "missing"], workers=1))
+    assert [name for name, _ in sheets] == ["sheet-2"]
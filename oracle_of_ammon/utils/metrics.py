@@ -0,0 +1,62 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+
+class Metrics:
+    """Thread-safe, in-process counters, gauges and summaries."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, dict] = {}
+
+    def increment(self, name: str, value: float = 1.0) -> float:
+        with self._lock:
+            self._counters[name] += value
+            return self._counters[name]
+
+    def set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {
+                    "count": 1,
+                    "sum": value,
+                    "min": value,
+                    "max": value,
+                }
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0.0)
+
+    def mean(self, name: str) -> Optional[float]:
+        with self._lock:
+            summary = self._summaries.get(name)
+            return summary["sum"] / summary["count"] if summary else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            summaries = {
+                name: {**summary, "mean": summary["sum"] / summary["count"]}
+                for name, summary in self._summaries.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": summaries,
+            }
+
+
+metrics = Metrics()